@@ -10,7 +10,9 @@
 
 #include <X11/Xlib.h>
 
+#include <array>
 #include <chrono>
+#include <cstddef>
 #include <cstdint>
 #include <optional>
 #include <string>
@@ -78,6 +80,12 @@ public:
    */
   void pump_events();
 
+  /**
+   * @brief fd соединения с X-сервером (для poll() в main loop)
+   * @return fd или -1, если соединение не открыто
+   */
+  [[nodiscard]] int connection_fd() const noexcept;
+
   /**
    * @brief Читает текст из selection
    * @param sel Тип selection (Primary или Clipboard)
@@ -85,6 +93,15 @@ public:
    */
   [[nodiscard]] std::optional<std::string> get_text(Selection sel);
 
+  /**
+   * @brief Читает текст из selection с явным таймаутом
+   * @param sel Тип selection (Primary или Clipboard)
+   * @param timeout Максимальное ожидание ответа владельца selection
+   * @return Текст или nullopt при ошибке/таймауте
+   */
+  [[nodiscard]] std::optional<std::string>
+  get_text(Selection sel, std::chrono::milliseconds timeout);
+
   /**
    * @brief Записывает текст в selection
    * @param sel Тип selection
@@ -114,6 +131,9 @@ private:
    */
   Atom get_selection_atom(Selection sel) const;
 
+  /// Текст selection, которым владеет punto (nullptr если не владеем).
+  [[nodiscard]] const std::string *owned_text(Selection sel) const noexcept;
+
   /// Обрабатывает SelectionRequest (когда другое приложение запрашивает данные).
   void handle_selection_request(const XSelectionRequestEvent &req);
 
@@ -121,7 +141,8 @@ private:
   void handle_selection_clear(const XSelectionClearEvent &ev);
 
   /// Ожидание SelectionNotify события (для get_text).
-  bool wait_for_selection_notify(Atom property);
+  bool wait_for_selection_notify(Atom property,
+                                 std::chrono::milliseconds timeout);
 
 
   X11Session &session_;
@@ -137,6 +158,25 @@ private:
   Atom atom_targets_ = None;
   Atom atom_text_plain_ = None;
   Atom atom_text_plain_utf8_ = None;
+  /// Property окна для приёма get_text() используются по кругу: поздний
+  /// SelectionNotify на запрос, прерванный по таймауту, приходит с другой
+  /// property и не принимается за ответ на следующий запрос.
+  static constexpr std::size_t kSelectionPropertyCount = 4;
+  std::array<Atom, kSelectionPropertyCount> atom_punto_sel_{};
+  std::size_t next_sel_property_ = 0;
+  Atom atom_net_active_window_ = None;
+
+  Window root_ = None;
+
+  // Результат is_active_window_terminal() для последнего активного окна и
+  // WM_CLASS, по которому он получен, вместе с окном-носителем WM_CLASS и его
+  // глубиной над активным (для перепроверки при переиспользовании id окна).
+  Window cached_active_window_ = None;
+  std::string cached_wm_class_;
+  std::string cached_wm_instance_;
+  Window cached_class_window_ = None;
+  int cached_class_depth_ = 0;
+  bool cached_active_is_terminal_ = false;
 
   // Данные selection, которыми владеет punto (X11 selection owner).
   // Важно: пустая строка — валидное значение (можно "очистить" selection).
@@ -30,6 +30,16 @@ public:
     cv_.notify_one();
   }
 
+  /// Заменяет всё содержимое очереди одним элементом (устаревшие отбрасываются).
+  void replace(T value) {
+    {
+      std::lock_guard<std::mutex> lock(mu_);
+      q_.clear();
+      q_.push_back(std::move(value));
+    }
+    cv_.notify_one();
+  }
+
   [[nodiscard]] bool try_pop(T &out) {
     std::lock_guard<std::mutex> lock(mu_);
     if (q_.empty()) {
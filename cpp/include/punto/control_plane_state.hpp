@@ -5,6 +5,8 @@
 
 #pragma once
 
+#include "punto/file_stamp.hpp"
+
 #include <cerrno>
 #include <charconv>
 #include <cstdint>
@@ -127,6 +129,13 @@ private:
   bool primary_ = false;
 };
 
+/// Дешёвый stat() вместо полного чтения: nullopt если файла нет. Writer
+/// всегда делает атомарный rename, поэтому любая запись меняет отпечаток.
+inline std::optional<FileStamp> stat_shared_control_plane_state(
+    const std::string &path = std::string{kControlPlaneStatePath}) {
+  return stat_file_stamp(path);
+}
+
 inline bool read_shared_control_plane_state(
     SharedControlPlaneState &out,
     const std::string &path = std::string{kControlPlaneStatePath}) {
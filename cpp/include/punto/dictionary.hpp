@@ -8,6 +8,8 @@
 
 #pragma once
 
+#include <array>
+#include <cstdint>
 #include <memory>
 #include <mutex>
 #include <span>
@@ -64,14 +66,14 @@ public:
    * @brief Возвращает размер EN словаря
    */
   [[nodiscard]] std::size_t en_size() const noexcept {
-    return en_hashes_.size();
+    return en_word_count_;
   }
 
   /**
    * @brief Возвращает размер RU словаря
    */
   [[nodiscard]] std::size_t ru_size() const noexcept {
-    return ru_hashes_.size();
+    return ru_word_count_;
   }
 
   [[nodiscard]] double en_bloom_fill() const noexcept {
@@ -116,14 +118,20 @@ public:
 
 private:
   /**
-   * @brief Проверяет наличие хеша в отсортированном векторе
+   * @brief Поиск по уже готовому lowercase ASCII слову (без кеша)
+   * @param ascii_word Слово (QWERTY, нижний регистр)
+   * @param h1, h2 Hasher::hash_string_double(ascii_word)
+   */
+  [[nodiscard]] DictResult lookup_ascii(const std::string &ascii_word,
+                                        std::uint64_t h1,
+                                        std::uint64_t h2) const;
+
+  /**
+   * @brief Ищет хеш в объединённом EN+RU векторе
    * @param hash Хеш слова
-   * @param hashes Отсортированный вектор хешей
-   * @return true если найден
+   * @return Биты языков (kHashLangEn | kHashLangRu), 0 если хеша нет
    */
-  [[nodiscard]] static bool
-  hash_exists(std::uint64_t hash,
-              const std::vector<std::uint64_t> &hashes) noexcept;
+  [[nodiscard]] std::uint8_t find_hash_langs(std::uint64_t hash) const noexcept;
 
   /**
    * @brief Загружает английский словарь из hunspell
@@ -175,10 +183,18 @@ private:
   BloomFilter en_bloom_;
   BloomFilter ru_bloom_;
 
-  // Отсортированные векторы хешей (Level 1-2) — резервный метод
+  // Хеши слов на время загрузки; finalize_hashes() сливает их в hashes_
   std::vector<std::uint64_t> en_hashes_;
   std::vector<std::uint64_t> ru_hashes_;
 
+  // Единый отсортированный вектор хешей EN+RU (Level 1-2) — резервный метод.
+  // hash_langs_[i] — биты языков для hashes_[i]: один бинарный поиск на
+  // слово вместо двух.
+  std::vector<std::uint64_t> hashes_;
+  std::vector<std::uint8_t> hash_langs_;
+  std::size_t en_word_count_ = 0;
+  std::size_t ru_word_count_ = 0;
+
 #ifdef HAVE_HUNSPELL
   // Hunspell для проверки словоформ
   std::unique_ptr<Hunspell> hunspell_en_;
@@ -188,6 +204,18 @@ private:
   // Hunspell не потокобезопасен — защищаем вызовы spell/suggest.
   mutable std::mutex hunspell_mutex_;
 
+  // Кеш вердиктов lookup(): словари после initialize() не меняются, а одни и
+  // те же слова набираются постоянно. Direct-mapped по хешу слова; при
+  // попадании не нужны ни hunspell (под общим mutex), ни bloom/хеши.
+  struct LookupCacheSlot {
+    std::uint64_t hash = 0;
+    std::string word;
+    DictResult result = DictResult::Unknown;
+  };
+  static constexpr std::size_t kLookupCacheSize = 1024; // степень двойки
+  mutable std::array<LookupCacheSlot, kLookupCacheSize> lookup_cache_{};
+  mutable std::mutex lookup_cache_mutex_;
+
   bool initialized_ = false;
   bool hunspell_available_ = false;
 };
@@ -99,6 +99,10 @@ private:
   /// Passthrough в stdout с трекингом состояния клавиш (key down/up).
   void emit_passthrough_event(const input_event &ev);
 
+  /// Обрабатывает следующее событие из stdin_batch_. Подряд идущие не-EV_KEY
+  /// события (SYN_REPORT + MSC_SCAN следующей клавиши) уходят одним write().
+  void handle_next_batched_event();
+
   /// Обновляет состояние модификаторов
   void update_modifier_state(ScanCode code, bool pressed);
 
@@ -242,17 +246,31 @@ private:
   /// коррекции
   void process_ready_results();
 
+  /// Таймаут poll() главного цикла: короткий тик, пока есть незавершённая
+  /// работа (задачи анализа, restore буфера обмена, X11 refresh), иначе
+  /// длинный — ввод, сигнал остановки и X11 события будят poll через fd.
+  [[nodiscard]] int main_loop_poll_timeout_ms() const noexcept;
+
   /// Сбрасывает async state и выставляет новый barrier для task_id.
   void reset_async_state(bool bump_task_barrier = true);
 
   void sync_current_layout_from_os(std::string_view reason);
   void mark_layout_desynced(std::string_view reason);
-  [[nodiscard]] bool is_configured_layout_hotkey_press(ScanCode code,
-                                                       bool is_press) const;
-  [[nodiscard]] bool is_configured_layout_hotkey_release(ScanCode code,
-                                                         bool is_release) const;
-  void maybe_complete_external_layout_hotkey(ScanCode code, bool is_release);
+  /// Проверки пользовательского hotkey получают уже загруженный снимок
+  /// конфига: повторный atomic_load(shared_ptr) на каждое событие не нужен.
+  [[nodiscard]] bool
+  is_configured_layout_hotkey_press(const HotkeyConfig &hotkey, ScanCode code,
+                                    bool is_press) const;
+  [[nodiscard]] bool
+  is_configured_layout_hotkey_release(const HotkeyConfig &hotkey, ScanCode code,
+                                      bool is_release) const;
+  void maybe_complete_external_layout_hotkey(const HotkeyConfig &hotkey,
+                                             ScanCode code, bool is_release);
+  /// Обновляет main_config_/main_injector_, если были опубликованы новые.
+  void refresh_main_snapshots();
   void maybe_handle_injector_failure(std::string_view context);
+  void maybe_handle_injector_failure(const KeyInjector &injector,
+                                     std::string_view context);
   void maybe_promote_to_control_plane_primary();
   void sync_control_plane_from_shared_state(bool force);
   void publish_control_plane_state(bool bump_config_generation,
@@ -297,6 +315,15 @@ private:
   std::shared_ptr<const LayoutAnalyzer> analyzer_;
   std::shared_ptr<const KeyInjector> injector_;
 
+  /// Поколение снапшотов выше: растёт после каждой их публикации.
+  std::atomic<std::uint64_t> snapshot_generation_{0};
+
+  // Копии снапшотов для main thread. Горячий путь (каждое событие) берёт их
+  // отсюда и делает atomic_load только когда snapshot_generation_ сменилось.
+  std::uint64_t main_snapshot_generation_ = ~std::uint64_t{0};
+  std::shared_ptr<const Config> main_config_;
+  std::shared_ptr<const KeyInjector> main_injector_;
+
   ModifierState modifiers_;
   InputBuffer buffer_;
   Dictionary dict_;
@@ -377,6 +404,13 @@ private:
   /// Очередь событий, накопленных во время выполнения макроса коррекции
   std::deque<input_event> pending_events_;
 
+  /// Пакет событий, прочитанных из stdin одним read(): на одно нажатие
+  /// приходит MSC_SCAN + EV_KEY + SYN_REPORT. Необработанный хвост
+  /// [stdin_batch_pos_, stdin_batch_len_) идёт раньше следующего чтения.
+  std::array<input_event, 64> stdin_batch_{};
+  std::size_t stdin_batch_pos_ = 0;
+  std::size_t stdin_batch_len_ = 0;
+
   // Best-effort трекер «какие клавиши сейчас зажаты» с точки зрения приложения.
   // Нужен, чтобы безопасно форвардить release-события во время макросов,
   // даже если они пришли в одном SYN-фрейме вместе с press других клавиш.
@@ -432,6 +466,8 @@ private:
   std::unique_ptr<IpcServer> ipc_server_;
   ControlPlaneLease control_plane_lease_{};
   SharedControlPlaneState shared_control_plane_state_{};
+  /// Отпечаток последнего применённого файла состояния (пропуск перечитывания).
+  std::optional<FileStamp> shared_control_plane_stamp_;
   bool control_plane_primary_ = false;
   std::uint64_t applied_config_generation_ = 0;
   std::uint64_t applied_status_generation_ = 0;
@@ -0,0 +1,45 @@
+/**
+ * @file file_stamp.hpp
+ * @brief Дешёвый отпечаток файла/каталога для инвалидации кэшей
+ */
+
+#pragma once
+
+#include <cstdint>
+#include <filesystem>
+#include <optional>
+
+#include <sys/stat.h>
+#include <sys/types.h>
+
+namespace punto {
+
+/// Отпечаток stat(): атомарная замена файла (rename) меняет inode, запись на
+/// месте — size/mtime, создание/удаление записи в каталоге — его mtime.
+struct FileStamp {
+  dev_t dev = 0;
+  ino_t ino = 0;
+  off_t size = 0;
+  std::int64_t mtime_ns = 0;
+
+  friend bool operator==(const FileStamp &, const FileStamp &) = default;
+};
+
+/// Один stat() вместо чтения файла: nullopt если путь недоступен.
+[[nodiscard]] inline std::optional<FileStamp>
+stat_file_stamp(const std::filesystem::path &path) {
+  struct stat st {};
+  if (::stat(path.c_str(), &st) != 0) {
+    return std::nullopt;
+  }
+
+  FileStamp stamp;
+  stamp.dev = st.st_dev;
+  stamp.ino = st.st_ino;
+  stamp.size = st.st_size;
+  stamp.mtime_ns = static_cast<std::int64_t>(st.st_mtim.tv_sec) * 1000000000 +
+                   static_cast<std::int64_t>(st.st_mtim.tv_nsec);
+  return stamp;
+}
+
+} // namespace punto
@@ -10,6 +10,8 @@
 
 #include <linux/input.h>
 
+#include <array>
+#include <cstddef>
 #include <optional>
 #include <span>
 #include <string>
@@ -82,6 +84,77 @@ namespace detail {
   return c;
 }
 
+/// Скан-код -> QWERTY символ, отдельно без Shift [0] и с Shift [1].
+/// '\0' = клавиша не даёт символа. Пробел и Tab от Shift не зависят.
+inline constexpr auto kScancodeToQwerty = [] {
+  std::array<std::array<char, 256>, 2> table{};
+  for (std::size_t code = 0; code < kScancodeToChar.size(); ++code) {
+    const char c = kScancodeToChar[code];
+    table[0][code] = c;
+    table[1][code] = (c != '\0') ? apply_shift_to_qwerty_char(c) : '\0';
+  }
+  for (auto &row : table) {
+    row[KEY_SPACE] = ' ';
+    row[KEY_TAB] = '\t';
+  }
+  return table;
+}();
+
+/// Скан-код -> «видимый» UTF-8 символ: [layout][shift][code].
+/// Пустой string_view = клавиша не даёт символа. Для RU символы без пары
+/// ЙЦУКЕН остаются как есть (так же, как в en_to_ru()).
+inline constexpr auto kScancodeToVisible = [] {
+  std::array<std::string_view, 128> en_to_ru{};
+  for (const auto &entry : kEnToRuUpper) {
+    en_to_ru[static_cast<unsigned char>(entry.from)] = entry.to;
+  }
+  // Lower имеет приоритет (как в en_to_ru()).
+  for (const auto &entry : kEnToRuLower) {
+    en_to_ru[static_cast<unsigned char>(entry.from)] = entry.to;
+  }
+
+  std::array<std::array<std::array<std::string_view, 256>, 2>, 2> table{};
+  for (std::size_t shift = 0; shift < 2; ++shift) {
+    for (std::size_t code = 0; code < 256; ++code) {
+      const char &c = kScancodeToQwerty[shift][code];
+      if (c == '\0') {
+        continue;
+      }
+      const std::string_view self{&c, 1};
+      const auto uc = static_cast<unsigned char>(c);
+      const std::string_view ru = (uc < en_to_ru.size()) ? en_to_ru[uc] : "";
+      table[0][shift][code] = self;
+      table[1][shift][code] = ru.empty() ? self : ru;
+    }
+  }
+  return table;
+}();
+
+/// KeyEntry -> видимый текст одним проходом (layout: 0=EN, 1=RU).
+/// @return false если часть скан-кодов не дала символа (они пропущены)
+[[nodiscard]] inline bool append_visible_text(std::span<const KeyEntry> entries,
+                                              int layout, std::string &out) {
+  const auto &by_shift = kScancodeToVisible[layout == 1 ? 1 : 0];
+  bool all_mapped = true;
+
+  for (const auto &e : entries) {
+    if (e.code >= kScancodeToChar.size()) {
+      all_mapped = false;
+      continue;
+    }
+
+    const std::string_view sym = by_shift[e.shifted ? 1 : 0][e.code];
+    if (sym.empty()) {
+      all_mapped = false;
+      continue;
+    }
+
+    out += sym;
+  }
+
+  return all_mapped;
+}
+
 } // namespace detail
 
 /// Конвертирует последовательность KeyEntry (скан-коды + shift) в QWERTY-строку.
@@ -94,28 +167,15 @@ key_entries_to_qwerty(std::span<const KeyEntry> entries) {
   out.reserve(entries.size());
 
   for (const auto &e : entries) {
-    if (e.code == KEY_SPACE) {
-      out.push_back(' ');
-      continue;
-    }
-    if (e.code == KEY_TAB) {
-      out.push_back('\t');
-      continue;
-    }
-
     if (e.code >= kScancodeToChar.size()) {
       continue;
     }
 
-    char c = kScancodeToChar[e.code];
+    const char c = detail::kScancodeToQwerty[e.shifted ? 1 : 0][e.code];
     if (c == '\0') {
       continue;
     }
 
-    if (e.shifted) {
-      c = detail::apply_shift_to_qwerty_char(c);
-    }
-
     out.push_back(c);
   }
 
@@ -141,8 +201,15 @@ qwerty_to_visible_text(std::string_view qwerty, int layout) {
 /// layout: 0=EN, 1=RU.
 [[nodiscard]] inline std::string
 key_entries_to_visible_text(std::span<const KeyEntry> entries, int layout) {
-  std::string qwerty = key_entries_to_qwerty(entries);
-  return qwerty_to_visible_text(qwerty, layout);
+  if (layout != 0 && layout != 1) {
+    // Fail-fast: некорректное значение раскладки.
+    return {};
+  }
+
+  std::string out;
+  out.reserve(entries.size() * (layout == 1 ? 2 : 1));
+  (void)detail::append_visible_text(entries, layout, out);
+  return out;
 }
 
 /// Как key_entries_to_visible_text, но fail-fast если какие-то скан-коды не
@@ -150,13 +217,16 @@ key_entries_to_visible_text(std::span<const KeyEntry> entries, int layout) {
 [[nodiscard]] inline std::optional<std::string>
 key_entries_to_visible_text_checked(std::span<const KeyEntry> entries,
                                    int layout) {
-  std::string qwerty = key_entries_to_qwerty(entries);
-  if (qwerty.size() != entries.size()) {
+  if (entries.empty()) {
+    return std::string{};
+  }
+  if (layout != 0 && layout != 1) {
     return std::nullopt;
   }
 
-  std::string visible = qwerty_to_visible_text(qwerty, layout);
-  if (visible.empty() && !qwerty.empty()) {
+  std::string visible;
+  visible.reserve(entries.size() * (layout == 1 ? 2 : 1));
+  if (!detail::append_visible_text(entries, layout, visible)) {
     return std::nullopt;
   }
 
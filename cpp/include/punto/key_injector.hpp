@@ -48,6 +48,15 @@ public:
    */
   void send_key(ScanCode code, KeyState state) const;
 
+  /**
+   * @brief Отправляет несколько нажатий/отпусканий одним отчётом
+   *
+   * Все EV_KEY и завершающий SYN уходят одним write().
+   * @param codes Скан-коды (в порядке отправки)
+   * @param state Состояние для всех клавиш
+   */
+  void send_keys(std::span<const ScanCode> codes, KeyState state) const;
+
   /// Тип функции ожидания (для интеграции с Input Guard)
   using WaitFunc = std::function<void(std::chrono::microseconds)>;
 
@@ -83,6 +83,21 @@ public:
    */
   [[nodiscard]] static bool has_invalid_chars(std::span<const KeyEntry> word);
 
+  /**
+   * @brief Решает, уйдёт ли слово на границе (SPACE/TAB) в анализ
+   *
+   * Только такие слова синхронизируют раскладку с ОС на границе:
+   * layout_at_boundary нужна лишь их метаданным.
+   *
+   * @param word Слово без завершающей пунктуации
+   * @param min_word_len Минимальная длина слова для анализа
+   * @param auto_switch_enabled Включено ли автопереключение
+   * @return true если слово нужно анализировать
+   */
+  [[nodiscard]] static bool needs_analysis(std::span<const KeyEntry> word,
+                                           std::size_t min_word_len,
+                                           bool auto_switch_enabled);
+
 private:
   /**
    * @brief Конвертирует скан-код в ASCII символ (нижний регистр)
@@ -100,6 +115,31 @@ private:
   [[nodiscard]] static std::size_t word_to_ascii(std::span<const KeyEntry> word,
                                                  char *buffer);
 
+  /**
+   * @brief Общая реализация analyze()/should_switch()
+   * @param word Буфер слова
+   * @param count_invalid Заполнять ли en/ru_invalid_count (should_switch()
+   *        они не нужны, и второй проход по биграммам пропускается)
+   */
+  [[nodiscard]] AnalysisResult analyze_impl(std::span<const KeyEntry> word,
+                                            bool count_invalid) const;
+
+  /**
+   * @brief Скор по уже сконвертированному ASCII буферу
+   * @param buffer Результат word_to_ascii()
+   * @param len Длина буфера
+   * @param lang Язык для анализа
+   */
+  [[nodiscard]] static double score_ascii(const char *buffer, std::size_t len,
+                                          Language lang);
+
+  /**
+   * @brief Подсчёт невалидных биграмм по уже сконвертированному ASCII буферу
+   */
+  static void count_invalid_ascii(const char *buffer, std::size_t len,
+                                  std::size_t &en_invalid,
+                                  std::size_t &ru_invalid);
+
   AutoSwitchConfig config_;
 };
 
@@ -12,7 +12,9 @@
 
 #pragma once
 
+#include <algorithm>
 #include <array>
+#include <cstddef>
 #include <cstdint>
 
 #include "punto/asm_utils.hpp"
@@ -558,28 +560,78 @@ inline constexpr std::array<BigramEntry, 256> kRuBigrams = {{
 // Функции поиска
 // ===========================================================================
 
+/// Размер алфавита плоских таблиц биграмм (a-z и QWERTY-знаки русских букв).
+inline constexpr std::size_t kNgramAlphabetSize = 64;
+
+/// ASCII -> индекс в алфавите плоских таблиц (-1 = символ не встречается
+/// в n-граммах, вес такой биграммы всегда 0).
+inline constexpr auto kNgramCharIndex = [] {
+  std::array<std::int8_t, 128> index{};
+  for (auto &i : index) {
+    i = -1;
+  }
+  std::int8_t next = 0;
+  for (char c = 'a'; c <= 'z'; ++c) {
+    index[static_cast<unsigned char>(c)] = next++;
+  }
+  for (char c : {',', '.', ';', '\'', '[', ']', '`', '-'}) {
+    index[static_cast<unsigned char>(c)] = next++;
+  }
+  return index;
+}();
+
+[[nodiscard]] constexpr int ngram_char_index(char c) noexcept {
+  const auto uc = static_cast<unsigned char>(c);
+  return uc < kNgramCharIndex.size() ? kNgramCharIndex[uc] : -1;
+}
+
+/// Строит плоскую таблицу весов [first][second] из списка биграмм.
+/// При дубликатах побеждает первая запись (как при линейном поиске).
+[[nodiscard]] constexpr auto
+make_bigram_table(const std::array<BigramEntry, 256> &entries) noexcept {
+  std::array<std::uint8_t, kNgramAlphabetSize * kNgramAlphabetSize> table{};
+  for (const auto &entry : entries) {
+    const int a = ngram_char_index(entry.first);
+    const int b = ngram_char_index(entry.second);
+    if (a < 0 || b < 0) {
+      continue; // Пустые записи-заполнители
+    }
+    auto &slot = table[static_cast<std::size_t>(a) * kNgramAlphabetSize +
+                       static_cast<std::size_t>(b)];
+    if (slot == 0) {
+      slot = entry.weight;
+    }
+  }
+  return table;
+}
+
+// 4 KB на язык: вес биграммы за одно обращение к памяти вместо линейного
+// SIMD-поиска по 256 записям на каждую пару символов.
+inline constexpr auto kEnBigramTable = make_bigram_table(kEnBigrams);
+inline constexpr auto kRuBigramTable = make_bigram_table(kRuBigrams);
+
+[[nodiscard]] constexpr std::uint8_t
+lookup_bigram_table(const std::array<std::uint8_t, kNgramAlphabetSize *
+                                                       kNgramAlphabetSize> &table,
+                    char first, char second) noexcept {
+  const int a = ngram_char_index(first);
+  const int b = ngram_char_index(second);
+  if (a < 0 || b < 0) {
+    return 0;
+  }
+  return table[static_cast<std::size_t>(a) * kNgramAlphabetSize +
+               static_cast<std::size_t>(b)];
+}
+
 /**
  * @brief Поиск веса биграммы в английской таблице
  * @param first Первый символ биграммы (lowercase ASCII)
  * @param second Второй символ биграммы (lowercase ASCII)
  * @return Вес биграммы или 0 если не найдена
  */
-[[nodiscard]] inline std::uint8_t lookup_en_bigram(char first,
-                                                   char second) noexcept {
-#if defined(__x86_64__) && !defined(PUNTO_NO_ASM) && defined(__AVX2__)
-  return asm_utils::avx2_find_bigram(kEnBigrams.data(), kEnBigrams.size(),
-                                     first, second);
-#elif defined(__x86_64__) && !defined(PUNTO_NO_ASM)
-  return asm_utils::sse_find_bigram(kEnBigrams.data(), kEnBigrams.size(), first,
-                                    second);
-#else
-  for (const auto &entry : kEnBigrams) {
-    if (entry.first == first && entry.second == second) {
-      return entry.weight;
-    }
-  }
-  return 0;
-#endif
+[[nodiscard]] constexpr std::uint8_t lookup_en_bigram(char first,
+                                                      char second) noexcept {
+  return lookup_bigram_table(kEnBigramTable, first, second);
 }
 
 /**
@@ -588,24 +640,13 @@ inline constexpr std::array<BigramEntry, 256> kRuBigrams = {{
  * @param second Второй символ биграммы (латинский эквивалент, lowercase)
  * @return Вес биграммы или 0 если не найдена
  */
-[[nodiscard]] inline std::uint8_t lookup_ru_bigram(char first,
-                                                   char second) noexcept {
-#if defined(__x86_64__) && !defined(PUNTO_NO_ASM) && defined(__AVX2__)
-  return asm_utils::avx2_find_bigram(kRuBigrams.data(), kRuBigrams.size(),
-                                     first, second);
-#elif defined(__x86_64__) && !defined(PUNTO_NO_ASM)
-  return asm_utils::sse_find_bigram(kRuBigrams.data(), kRuBigrams.size(), first,
-                                    second);
-#else
-  for (const auto &entry : kRuBigrams) {
-    if (entry.first == first && entry.second == second) {
-      return entry.weight;
-    }
-  }
-  return 0;
-#endif
+[[nodiscard]] constexpr std::uint8_t lookup_ru_bigram(char first,
+                                                      char second) noexcept {
+  return lookup_bigram_table(kRuBigramTable, first, second);
 }
 
+static_assert(lookup_en_bigram('t', 'h') == 255, "flat EN bigram table");
+
 // ===========================================================================
 // Невозможные сочетания (для штрафов)
 // ===========================================================================
@@ -790,18 +831,70 @@ inline constexpr std::array<TrigramEntry, 64> kRuTrigrams = {{
 }};
 // clang-format on
 
+/// Триграмма, упакованная в ключ для бинарного поиска.
+struct PackedTrigram {
+  std::uint32_t key;
+  std::uint8_t weight;
+};
+
+[[nodiscard]] constexpr std::uint32_t pack_trigram(char first, char second,
+                                                   char third) noexcept {
+  return (static_cast<std::uint32_t>(static_cast<unsigned char>(first)) << 16) |
+         (static_cast<std::uint32_t>(static_cast<unsigned char>(second)) << 8) |
+         static_cast<std::uint32_t>(static_cast<unsigned char>(third));
+}
+
+/// Отсортированная по ключу копия таблицы триграмм (без заполнителей).
+/// Порядок дубликатов сохраняется: побеждает первая запись исходной таблицы.
+struct SortedTrigramTable {
+  std::array<PackedTrigram, 64> entries{};
+  std::size_t size = 0;
+};
+
+[[nodiscard]] constexpr SortedTrigramTable
+make_sorted_trigram_table(const std::array<TrigramEntry, 64> &source) noexcept {
+  SortedTrigramTable table{};
+  for (const auto &entry : source) {
+    if (entry.first == 0) {
+      continue; // Заполнитель
+    }
+    // Вставка с сохранением порядка равных ключей (std::stable_sort не constexpr).
+    const PackedTrigram item{pack_trigram(entry.first, entry.second, entry.third),
+                             entry.weight};
+    std::size_t pos = table.size++;
+    while (pos > 0 && table.entries[pos - 1].key > item.key) {
+      table.entries[pos] = table.entries[pos - 1];
+      --pos;
+    }
+    table.entries[pos] = item;
+  }
+  return table;
+}
+
+inline constexpr SortedTrigramTable kEnTrigramTable =
+    make_sorted_trigram_table(kEnTrigrams);
+inline constexpr SortedTrigramTable kRuTrigramTable =
+    make_sorted_trigram_table(kRuTrigrams);
+
+/// Бинарный поиск (≤ 6 сравнений) вместо линейного прохода по 64 записям.
+[[nodiscard]] constexpr std::uint8_t
+lookup_trigram_table(const SortedTrigramTable &table, char first, char second,
+                     char third) noexcept {
+  const std::uint32_t key = pack_trigram(first, second, third);
+  const auto *begin = table.entries.data();
+  const auto *end = begin + table.size;
+  const auto *it = std::lower_bound(
+      begin, end, key,
+      [](const PackedTrigram &e, std::uint32_t k) { return e.key < k; });
+  return (it != end && it->key == key) ? it->weight : 0;
+}
+
 /**
  * @brief Поиск веса триграммы в английской таблице
  */
 [[nodiscard]] constexpr std::uint8_t lookup_en_trigram(char first, char second,
                                                        char third) noexcept {
-  for (const auto &entry : kEnTrigrams) {
-    if (entry.first == first && entry.second == second &&
-        entry.third == third) {
-      return entry.weight;
-    }
-  }
-  return 0;
+  return lookup_trigram_table(kEnTrigramTable, first, second, third);
 }
 
 /**
@@ -809,13 +902,9 @@ inline constexpr std::array<TrigramEntry, 64> kRuTrigrams = {{
  */
 [[nodiscard]] constexpr std::uint8_t lookup_ru_trigram(char first, char second,
                                                        char third) noexcept {
-  for (const auto &entry : kRuTrigrams) {
-    if (entry.first == first && entry.second == second &&
-        entry.third == third) {
-      return entry.weight;
-    }
-  }
-  return 0;
+  return lookup_trigram_table(kRuTrigramTable, first, second, third);
 }
 
+static_assert(lookup_en_trigram('t', 'h', 'e') == 255, "sorted EN trigram table");
+
 } // namespace punto
@@ -11,6 +11,7 @@
 #include <linux/input.h>
 
 #include <array>
+#include <cstddef>
 #include <cstdint>
 #include <optional>
 #include <string_view>
@@ -95,6 +96,29 @@ inline constexpr std::array<char, 256> kScancodeToChar = [] {
   return map;
 }();
 
+/// Обратная таблица: ASCII символ -> скан-код (0 = нет клавиши).
+/// При дублях (цифры/операторы numpad) берётся наименьший скан-код —
+/// клавиша основной клавиатуры.
+inline constexpr auto kCharToScancode = [] {
+  std::array<std::uint16_t, 128> table{};
+  for (std::size_t code = kScancodeToChar.size(); code-- > 1;) {
+    const char c = kScancodeToChar[code];
+    if (c != '\0') {
+      table[static_cast<unsigned char>(c)] = static_cast<std::uint16_t>(code);
+    }
+  }
+  return table;
+}();
+
+/// ASCII символ -> скан-код (0 = символ не набирается одной клавишей)
+[[nodiscard]] constexpr std::uint16_t char_to_scancode(char c) noexcept {
+  const auto idx = static_cast<unsigned char>(c);
+  return idx < kCharToScancode.size() ? kCharToScancode[idx] : 0;
+}
+
+static_assert(char_to_scancode('0') == KEY_0, "main row wins over numpad");
+static_assert(char_to_scancode('/') == KEY_SLASH, "main row wins over numpad");
+
 /// Проверка, является ли скан-код "буквенной" клавишей
 [[nodiscard]] constexpr bool is_letter_key(std::uint16_t code) noexcept {
   return code < kScancodeToChar.size() && kScancodeToChar[code] != '\0';
@@ -194,6 +218,56 @@ inline constexpr std::array kRuToEnUpper = std::to_array<Utf8Mapping>({
 });
 // clang-format on
 
+// ===========================================================================
+// Плоские таблицы кириллица <-> QWERTY (нижний регистр)
+// ===========================================================================
+
+/// Индекс 2-байтового UTF-8 символа U+0400..U+047F в плоских таблицах (0..127).
+/// @return -1 если это не кириллица из этого диапазона
+[[nodiscard]] constexpr int cyrillic_index(std::string_view ch) noexcept {
+  if (ch.size() != 2) {
+    return -1;
+  }
+  const auto b0 = static_cast<unsigned char>(ch[0]);
+  const auto b1 = static_cast<unsigned char>(ch[1]);
+  if ((b0 != 0xD0 && b0 != 0xD1) || (b1 & 0xC0) != 0x80) {
+    return -1;
+  }
+  const int cp = ((b0 & 0x1F) << 6) | (b1 & 0x3F);
+  return cp - 0x400;
+}
+
+/// Кириллическая буква (любой регистр) -> QWERTY клавиша в нижнем регистре.
+/// Строится из kRuToEnLower; заглавные получают ту же клавишу, что и строчные.
+inline constexpr auto kCyrToQwertyLower = [] {
+  std::array<char, 128> table{};
+  for (const auto &entry : kRuToEnLower) {
+    const int lower = cyrillic_index(entry.from);
+    if (lower < 0) {
+      continue; // "." и прочие не-буквы
+    }
+    table[static_cast<std::size_t>(lower)] = entry.to;
+    // а-я (U+0430..U+044F) -> А-Я (-0x20), ё (U+0451) -> Ё (U+0401, -0x50)
+    const int upper = lower >= 0x50 ? lower - 0x50 : lower - 0x20;
+    if (upper >= 0) {
+      table[static_cast<std::size_t>(upper)] = entry.to;
+    }
+  }
+  return table;
+}();
+
+/// QWERTY клавиша (нижний регистр) -> строчная кириллическая буква.
+/// Пустой string_view = клавиша не соответствует русской букве.
+inline constexpr auto kQwertyToCyrLower = [] {
+  std::array<std::string_view, 128> table{};
+  for (const auto &entry : kEnToRuLower) {
+    if (cyrillic_index(entry.to) >= 0) {
+      table[static_cast<unsigned char>(entry.from)] = entry.to;
+    }
+  }
+  return table;
+}();
+
 // ===========================================================================
 // Транслитерация CYR -> LAT
 // ===========================================================================
@@ -5,6 +5,7 @@
 
 #pragma once
 
+#include <functional>
 #include <gtk/gtk.h>
 #include <string>
 
@@ -32,6 +33,8 @@ struct SettingsData {
   // Hotkey
   std::string modifier = "leftctrl";
   std::string key = "grave";
+
+  bool operator==(const SettingsData &) const = default;
 };
 
 /**
@@ -52,12 +55,27 @@ public:
   /// Сохраняет настройки в файл (используется также tray меню)
   static bool save_settings(const SettingsData &settings);
 
+  /**
+   * @brief Атомарно читает, изменяет и сохраняет настройки
+   *
+   * Все записи конфига (диалог, переключатели меню) сериализуются одним
+   * мьютексом, поэтому изменение, сделанное между чтением и записью другим
+   * потоком, не теряется.
+   *
+   * @param mutate Изменяет настройки; false — запись не нужна
+   * @return false если запись не удалась
+   */
+  static bool update_settings(const std::function<bool(SettingsData &)> &mutate);
+
   /// Путь к user config (~/.config/punto/config.yaml)
   static std::string get_user_config_path();
 
 private:
   /// Создаёт user config если его нет
   static bool ensure_user_config();
+
+  /// Пишет конфиг без блокировки (вызывающий держит мьютекс записи)
+  static bool write_settings_file(const SettingsData &settings);
 };
 
 } // namespace punto
@@ -7,14 +7,23 @@
  *
  * Подход:
  * - подготовка аргументов/окружения в родителе
- * - double-fork: родитель ждёт только промежуточного процесса (быстро),
- *   финальный плеер становится сиротой и не оставляет zombie
+ * - posix_spawn() (vfork+exec), если смена uid/gid не нужна; иначе один fork()
+ *   со сменой пользователя перед execve
+ * - запуск и ожидание плеера — в одном фоновом потоке: main loop только
+ *   ставит звук в очередь. Звуки не накапливаются: новый прерывает ещё
+ *   играющий и заменяет ожидающий, так что отклик на переключение не запаздывает
  */
 
 #pragma once
 
+#include "punto/concurrent_queue.hpp"
+
 #include <atomic>
+#include <cstdint>
+#include <mutex>
+#include <stop_token>
 #include <string>
+#include <thread>
 #include <vector>
 
 #include <sys/types.h>
@@ -40,6 +49,15 @@ public:
 private:
   void play_file(const char *wav_path);
 
+  /// Запуск плеера через posix_spawn() (без смены пользователя).
+  pid_t spawn_player(char *const argv[]);
+
+  /// Запуск плеера через fork() со сменой groups/gid/uid в дочернем процессе.
+  pid_t fork_player(char *const argv[]);
+
+  /// Фоновый поток: запускает плеер и ждёт его завершения.
+  void worker_loop(std::stop_token st);
+
   const X11Session &x11_session_;
   std::atomic<bool> enabled_{true};
 
@@ -59,6 +77,28 @@ private:
 
   // /dev/null для перенаправления stdin/stdout/stderr дочернему процессу
   int devnull_fd_ = -1;
+
+  // true, если плеер нужно запускать от другого uid/gid (демон под root).
+  bool needs_credential_switch_ = true;
+
+  /// Звук для фонового потока: путь к wav (строковый литерал) и его номер.
+  struct SoundRequest {
+    const char *wav_path = nullptr;
+    std::uint64_t seq = 0;
+  };
+
+  // Очередь звуков для фонового потока (не больше одного, последний).
+  ConcurrentQueue<SoundRequest> queue_;
+
+  // Защищает child_pid_, latest_seq_ и проверку остановки перед запуском
+  // плеера.
+  std::mutex child_mu_;
+  pid_t child_pid_ = -1;
+  // Номер последнего запрошенного звука: более старые не запускаются.
+  std::uint64_t latest_seq_ = 0;
+
+  // Последний член: поток должен остановиться до разрушения остальных полей.
+  std::jthread worker_;
 };
 
 } // namespace punto
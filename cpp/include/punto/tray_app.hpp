@@ -19,8 +19,14 @@
 
 #include "punto/ipc_client.hpp"
 
+#include <memory>
+#include <thread>
+
 namespace punto {
 
+struct ToggleApplyJob;
+struct SettingsReloadJob;
+
 /**
  * @brief Класс tray-приложения
  *
@@ -38,6 +44,9 @@ public:
 
   /**
    * @brief Инициализирует приложение
+   *
+   * Повторный вызов переиспользует уже созданные индикатор и меню.
+   *
    * @return true при успехе
    */
   bool initialize();
@@ -56,6 +65,12 @@ private:
   static void on_about_clicked(GtkMenuItem* item, gpointer user_data);
   static void on_quit_clicked(GtkMenuItem* item, gpointer user_data);
 
+  // Callback завершения фонового применения настройки из меню
+  static gboolean on_toggle_applied(gpointer user_data);
+
+  // Callback завершения фонового RELOAD после диалога настроек
+  static gboolean on_settings_reloaded(gpointer user_data);
+
   // Callback для периодического обновления статуса
   static gboolean on_status_update(gpointer user_data);
 
@@ -68,6 +83,25 @@ private:
   /// Обновляет состояние пункта меню звука
   void update_sound_toggle_state();
 
+  /**
+   * @brief Сохраняет переключатель меню и перезагружает сервис в фоне
+   *
+   * Запись конфига и IPC RELOAD выполняются в отдельном потоке, результат
+   * возвращается в GTK-поток через g_idle_add (on_toggle_applied).
+   *
+   * @param sound_toggle true — переключатель звука, false — автопереключения
+   * @param enabled Новое значение
+   */
+  void apply_toggle_async(bool sound_toggle, bool enabled);
+
+  /**
+   * @brief Отправляет RELOAD после сохранения настроек (в фоне)
+   *
+   * Одновременно выполняется не больше одного RELOAD: сохранения, пришедшие
+   * во время него, схлопываются в один повторный RELOAD после завершения.
+   */
+  void start_settings_reload();
+
   /// Создаёт контекстное меню
   GtkWidget* create_menu();
 
@@ -79,9 +113,22 @@ private:
 
   bool suppress_menu_signals_ = false;
 
+  // Фоновые задания: TrayApp владеет их данными и потоками (join в
+  // деструкторе). Непустой *_job_ — задание выполняется.
+  std::unique_ptr<ToggleApplyJob> toggle_job_;
+  std::thread toggle_worker_;
+  std::unique_ptr<SettingsReloadJob> settings_reload_job_;
+  std::thread settings_reload_worker_;
+
+  // Во время RELOAD после диалога настроек запрошен ещё один
+  bool settings_reload_queued_ = false;
+
   // Текущий статус
   ServiceStatus current_status_ = ServiceStatus::Unknown;
 
+  // Иконка, последней переданная в app_indicator_set_icon (nullptr — ещё нет)
+  const char* applied_icon_ = nullptr;
+
   // Текущий статус звука (берём из user config)
   bool sound_enabled_ = true;
 
@@ -0,0 +1,26 @@
+/**
+ * @file tray_messages.hpp
+ * @brief Сообщения пользователю из tray-приложения
+ */
+
+#pragma once
+
+#include <gtk/gtk.h>
+#include <string>
+
+namespace punto {
+
+/**
+ * @brief Показывает модальное сообщение без вложенного main loop
+ *
+ * В отличие от gtk_dialog_run(), управление сразу возвращается: диалог
+ * уничтожается в обработчике "response".
+ *
+ * @param parent Родительское окно (может быть nullptr)
+ * @param type Тип сообщения (GTK_MESSAGE_WARNING и т.д.)
+ * @param text Текст сообщения
+ */
+void show_message_async(GtkWindow *parent, GtkMessageType type,
+                        const std::string &text);
+
+} // namespace punto
@@ -48,52 +48,87 @@ struct alignas(4) BigramEntry {
 /// Скан-код клавиши (обёртка над linux/input.h константами)
 using ScanCode = std::uint16_t;
 
-/// Состояние модификаторов
+/// Биты модификаторов в ModifierState::mask
+inline constexpr std::uint8_t kModLeftShift = 1U << 0;
+inline constexpr std::uint8_t kModRightShift = 1U << 1;
+inline constexpr std::uint8_t kModLeftCtrl = 1U << 2;
+inline constexpr std::uint8_t kModRightCtrl = 1U << 3;
+inline constexpr std::uint8_t kModLeftAlt = 1U << 4;
+inline constexpr std::uint8_t kModRightAlt = 1U << 5;
+inline constexpr std::uint8_t kModLeftMeta = 1U << 6;
+inline constexpr std::uint8_t kModRightMeta = 1U << 7;
+
+inline constexpr std::uint8_t kModShift = kModLeftShift | kModRightShift;
+inline constexpr std::uint8_t kModCtrl = kModLeftCtrl | kModRightCtrl;
+inline constexpr std::uint8_t kModAlt = kModLeftAlt | kModRightAlt;
+inline constexpr std::uint8_t kModMeta = kModLeftMeta | kModRightMeta;
+
+/// Бит модификатора для скан-кода (0 — не модификатор)
+[[nodiscard]] constexpr std::uint8_t modifier_bit(std::uint16_t code) noexcept {
+  switch (code) {
+  case KEY_LEFTSHIFT:
+    return kModLeftShift;
+  case KEY_RIGHTSHIFT:
+    return kModRightShift;
+  case KEY_LEFTCTRL:
+    return kModLeftCtrl;
+  case KEY_RIGHTCTRL:
+    return kModRightCtrl;
+  case KEY_LEFTALT:
+    return kModLeftAlt;
+  case KEY_RIGHTALT:
+    return kModRightAlt;
+  case KEY_LEFTMETA:
+    return kModLeftMeta;
+  case KEY_RIGHTMETA:
+    return kModRightMeta;
+  default:
+    return 0;
+  }
+}
+
+/// Состояние модификаторов (битовая маска: комбинации проверяются одним &)
 struct ModifierState {
-  bool left_shift : 1 = false;
-  bool right_shift : 1 = false;
-  bool left_ctrl : 1 = false;
-  bool right_ctrl : 1 = false;
-  bool left_alt : 1 = false;
-  bool right_alt : 1 = false;
-  bool left_meta : 1 = false;
-  bool right_meta : 1 = false;
+  std::uint8_t mask = 0;
+
+  /// Обновляет бит модификатора по событию press/release
+  constexpr void set(std::uint16_t code, bool pressed) noexcept {
+    const std::uint8_t bit = modifier_bit(code);
+    mask = pressed ? static_cast<std::uint8_t>(mask | bit)
+                   : static_cast<std::uint8_t>(mask & ~bit);
+  }
+
+  /// Нажаты ли ВСЕ модификаторы из bits
+  [[nodiscard]] constexpr bool all_of(std::uint8_t bits) const noexcept {
+    return (mask & bits) == bits;
+  }
+
+  /// Нажат ли ХОТЯ БЫ ОДИН модификатор из bits
+  [[nodiscard]] constexpr bool any_of(std::uint8_t bits) const noexcept {
+    return (mask & bits) != 0;
+  }
 
   [[nodiscard]] constexpr bool any_shift() const noexcept {
-    return left_shift || right_shift;
+    return any_of(kModShift);
   }
 
   [[nodiscard]] constexpr bool any_ctrl() const noexcept {
-    return left_ctrl || right_ctrl;
+    return any_of(kModCtrl);
   }
 
   [[nodiscard]] constexpr bool any_alt() const noexcept {
-    return left_alt || right_alt;
+    return any_of(kModAlt);
   }
 
   [[nodiscard]] constexpr bool any_meta() const noexcept {
-    return left_meta || right_meta;
+    return any_of(kModMeta);
   }
 
   /// Сбрасывает все модификаторы в false
-  constexpr void reset_all() noexcept {
-    left_shift = false;
-    right_shift = false;
-    left_ctrl = false;
-    right_ctrl = false;
-    left_alt = false;
-    right_alt = false;
-    left_meta = false;
-    right_meta = false;
-  }
+  constexpr void reset_all() noexcept { mask = 0; }
 
   /// Сброс всех модификаторов
-  constexpr void reset() noexcept {
-    left_shift = right_shift = false;
-    left_ctrl = right_ctrl = false;
-    left_alt = right_alt = false;
-    left_meta = right_meta = false;
-  }
+  constexpr void reset() noexcept { mask = 0; }
 };
 
 // ===========================================================================
@@ -137,6 +172,42 @@ enum class HotkeyAction {
   TranslitSelection      // LCtrl+LAlt+Pause
 };
 
+/// Действие для Pause по маске Shift/Ctrl/Alt (Meta не участвует).
+/// Приоритет: LCtrl+LAlt > Shift > Alt > Ctrl > без модификаторов.
+inline constexpr auto kPauseHotkeyActions = [] {
+  constexpr std::uint8_t kRelevant = kModShift | kModCtrl | kModAlt;
+  std::array<HotkeyAction, kRelevant + 1> table{};
+  for (std::size_t m = 0; m < table.size(); ++m) {
+    const ModifierState mods{static_cast<std::uint8_t>(m)};
+    if (mods.all_of(kModLeftCtrl | kModLeftAlt)) {
+      table[m] = HotkeyAction::TranslitSelection;
+    } else if (mods.any_shift()) {
+      table[m] = HotkeyAction::InvertLayoutSelection;
+    } else if (mods.any_alt()) {
+      table[m] = HotkeyAction::InvertCaseSelection;
+    } else if (mods.any_ctrl()) {
+      table[m] = HotkeyAction::InvertCaseWord;
+    } else {
+      table[m] = HotkeyAction::InvertLayoutWord;
+    }
+  }
+  return table;
+}();
+
+/// Действие Pause для текущих модификаторов: один индекс в таблице.
+[[nodiscard]] constexpr HotkeyAction
+pause_hotkey_action(const ModifierState &mods) noexcept {
+  return kPauseHotkeyActions[static_cast<std::size_t>(
+      mods.mask & (kModShift | kModCtrl | kModAlt))];
+}
+
+static_assert(pause_hotkey_action(ModifierState{kModLeftCtrl | kModLeftAlt}) ==
+              HotkeyAction::TranslitSelection);
+static_assert(pause_hotkey_action(ModifierState{kModRightCtrl | kModLeftAlt}) ==
+              HotkeyAction::InvertCaseSelection);
+static_assert(pause_hotkey_action(ModifierState{kModLeftMeta}) ==
+              HotkeyAction::InvertLayoutWord);
+
 // ===========================================================================
 // Буферы
 // ===========================================================================
@@ -153,9 +224,36 @@ using TrailingBuffer = std::array<ScanCode, kMaxWordLen>;
 
 /// Проверка, является ли скан-код модификатором
 [[nodiscard]] constexpr bool is_modifier(ScanCode code) noexcept {
-  return code == KEY_LEFTSHIFT || code == KEY_RIGHTSHIFT ||
-         code == KEY_LEFTCTRL || code == KEY_RIGHTCTRL || code == KEY_LEFTALT ||
-         code == KEY_RIGHTALT || code == KEY_LEFTMETA || code == KEY_RIGHTMETA;
+  return modifier_bit(code) != 0;
+}
+
+/// Набор скан-кодов из битовой маски (все коды должны быть < 64)
+template <typename... Codes>
+[[nodiscard]] constexpr std::uint64_t make_key_mask(Codes... codes) noexcept {
+  return ((std::uint64_t{1} << codes) | ...);
+}
+
+/// Разделители слов (пробел, таб)
+inline constexpr std::uint64_t kWordDelimiterMask =
+    make_key_mask(KEY_SPACE, KEY_TAB);
+
+/// Пунктуация, которая набирается внутри слова и отрезается перед анализом
+inline constexpr std::uint64_t kWordPunctuationMask =
+    make_key_mask(KEY_DOT, KEY_COMMA, KEY_SEMICOLON, KEY_APOSTROPHE, KEY_SLASH,
+                  KEY_MINUS);
+
+/// Принадлежность скан-кода маске: один сдвиг и & вместо цепочки сравнений
+[[nodiscard]] constexpr bool key_in_mask(ScanCode code,
+                                         std::uint64_t mask) noexcept {
+  return code < 64 && ((mask >> code) & 1U) != 0;
+}
+
+[[nodiscard]] constexpr bool is_word_delimiter(ScanCode code) noexcept {
+  return key_in_mask(code, kWordDelimiterMask);
+}
+
+[[nodiscard]] constexpr bool is_word_punctuation(ScanCode code) noexcept {
+  return key_in_mask(code, kWordPunctuationMask);
 }
 
 /// Проверка, является ли ключ навигационной клавишей
@@ -123,6 +123,14 @@ public:
         word.pop_back();
       }
       if (!word.empty()) {
+        // Ключи нормализуем один раз при загрузке: lookup приходит уже в
+        // lowercase, и исключение, записанное вручную как "Ghbdtn", должно
+        // срабатывать.
+        for (char &c : word) {
+          if (c >= 'A' && c <= 'Z') {
+            c = static_cast<char>(c + 32);
+          }
+        }
         exclusions_.insert(word);
         ++count;
       }
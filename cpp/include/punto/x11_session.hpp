@@ -14,6 +14,7 @@
 #include <mutex>
 #include <optional>
 #include <string>
+#include <unordered_map>
 
 #include <X11/Xlib.h>
 #include <sys/types.h>
@@ -129,8 +130,19 @@ private:
     std::string leader_pid;
   };
 
+  /// Неизменяемые свойства loginctl-сессии: Class/Name/Leader не меняются
+  /// за время жизни сессии (меняется только Active).
+  struct SessionProps {
+    bool candidate = false; ///< Class=user и не greeter
+    std::string name;
+    std::string leader_pid;
+  };
+
   /**
    * @brief Находит активную user-сессию на seat0 через loginctl
+   *
+   * Свойства уже виденных сессий берутся из кеша: для них запрашивается
+   * только Active, а заведомо неподходящие (greeter и т.п.) не опрашиваются.
    */
   std::optional<ActiveSession> find_active_session_loginctl();
 
@@ -158,6 +170,10 @@ private:
   X11SessionInfo info_;
   std::atomic<bool> initialized_{false};
 
+  // Кеш свойств сессий по session_id (чистится, когда сессия исчезает)
+  std::mutex session_cache_mutex_;
+  std::unordered_map<std::string, SessionProps> session_props_cache_;
+
   // Фоновый refresh
   mutable std::mutex refresh_mutex_;
   std::future<RefreshResult> pending_refresh_;
@@ -10,10 +10,13 @@
 #include <X11/Xlib.h>
 #include <X11/Xutil.h>
 
+#include <poll.h>
+
+#include <algorithm>
 #include <chrono>
 #include <cstring>
 #include <iostream>
-#include <thread>
+#include <utility>
 #include <vector>
 
 namespace punto {
@@ -50,6 +53,18 @@ bool ClipboardManager::open() {
   atom_text_plain_ = XInternAtom(display_, "text/plain", False);
   atom_text_plain_utf8_ = XInternAtom(display_, "text/plain;charset=utf-8", False);
 
+  // Property для приёма данных get_text(): раньше XInternAtom() вызывался на
+  // каждый запрос, что давало лишний round-trip к X серверу.
+  for (std::size_t i = 0; i < atom_punto_sel_.size(); ++i) {
+    const std::string name = "PUNTO_SEL" + std::to_string(i);
+    atom_punto_sel_[i] = XInternAtom(display_, name.c_str(), False);
+  }
+  atom_net_active_window_ = XInternAtom(display_, "_NET_ACTIVE_WINDOW", False);
+  root_ = RootWindow(display_, screen);
+
+  cached_active_window_ = None;
+  cached_active_is_terminal_ = false;
+
   return true;
 }
 
@@ -74,6 +89,17 @@ Atom ClipboardManager::get_selection_atom(Selection sel) const {
   return sel == Selection::Primary ? atom_primary_ : atom_clipboard_;
 }
 
+const std::string *ClipboardManager::owned_text(Selection sel) const noexcept {
+  if (sel == Selection::Primary) {
+    return owns_primary_ ? &primary_text_ : nullptr;
+  }
+  return owns_clipboard_ ? &clipboard_text_ : nullptr;
+}
+
+int ClipboardManager::connection_fd() const noexcept {
+  return display_ ? ConnectionNumber(display_) : -1;
+}
+
 void ClipboardManager::pump_events() {
   if (!display_) {
     return;
@@ -196,11 +222,17 @@ void ClipboardManager::handle_selection_request(const XSelectionRequestEvent &re
   XFlush(display_);
 }
 
-bool ClipboardManager::wait_for_selection_notify(Atom property) {
-  auto start = std::chrono::steady_clock::now();
+bool ClipboardManager::wait_for_selection_notify(
+    Atom property, std::chrono::milliseconds timeout) {
+  // Максимальный шаг ожидания: страховка от событий, уже прочитанных Xlib
+  // в свой буфер (poll() по сокету их не увидит).
+  constexpr auto kMaxPollSlice = std::chrono::milliseconds{5};
+
+  const auto deadline = std::chrono::steady_clock::now() + timeout;
+  const int x11_fd = ConnectionNumber(display_);
   XEvent event;
 
-  while (std::chrono::steady_clock::now() - start < timeout_) {
+  while (true) {
     // Если мы владеем selection, то при XConvertSelection() сервер присылает нам
     // SelectionRequest, и без обработки этого события SelectionNotify не придёт.
     pump_events();
@@ -209,28 +241,74 @@ bool ClipboardManager::wait_for_selection_notify(Atom property) {
       if (event.xselection.property == property) {
         return event.xselection.property != None;
       }
+      // Поздний ответ на прежний запрос (своя property) — не наш результат.
+      if (event.xselection.property != None) {
+        XDeleteProperty(display_, window_, event.xselection.property);
+      }
+      continue;
     }
-    std::this_thread::sleep_for(std::chrono::milliseconds{1});
-  }
 
-  return false;
+    const auto now = std::chrono::steady_clock::now();
+    if (now >= deadline) {
+      return false;
+    }
+
+    // Вместо sleep(1ms) ждём данных на сокете X сервера: ответ владельца
+    // selection обрабатывается сразу, без лишних пробуждений.
+    const auto remaining =
+        std::chrono::ceil<std::chrono::milliseconds>(deadline - now);
+    const auto slice = std::min(remaining, kMaxPollSlice);
+
+    pollfd pfd{};
+    pfd.fd = x11_fd;
+    pfd.events = POLLIN;
+    (void)::poll(&pfd, 1, static_cast<int>(slice.count()));
+  }
 }
 
 std::optional<std::string> ClipboardManager::get_text(Selection sel) {
+  return get_text(sel, timeout_);
+}
+
+std::optional<std::string>
+ClipboardManager::get_text(Selection sel, std::chrono::milliseconds timeout) {
   if (!display_) {
     if (!open())
       return std::nullopt;
   }
 
   Atom selection = get_selection_atom(sel);
-  Atom property = XInternAtom(display_, "PUNTO_SEL", False);
+
+  // Если selection принадлежит нам, данные уже лежат в памяти процесса.
+  // XConvertSelection() здесь дал бы полный круг через X сервер и наш же
+  // обработчик SelectionRequest. Владельца перепроверяем одним запросом:
+  // SelectionClear мог ещё не быть обработан.
+  pump_events();
+  const std::string *owned = owned_text(sel);
+  if (owned != nullptr && XGetSelectionOwner(display_, selection) == window_) {
+    return *owned;
+  }
+
+  const Atom property = atom_punto_sel_[next_sel_property_];
+  next_sel_property_ = (next_sel_property_ + 1) % atom_punto_sel_.size();
+
+  // Ответы на прерванные по таймауту запросы, уже попавшие в очередь,
+  // отбрасываем вместе с их данными.
+  XEvent stale;
+  while (XCheckTypedWindowEvent(display_, window_, SelectionNotify, &stale) !=
+         0) {
+    if (stale.xselection.property != None) {
+      XDeleteProperty(display_, window_, stale.xselection.property);
+    }
+  }
+  XDeleteProperty(display_, window_, property);
 
   // Запрашиваем конвертацию selection в UTF8_STRING
   XConvertSelection(display_, selection, atom_utf8_string_, property, window_,
                     CurrentTime);
   XFlush(display_);
 
-  if (!wait_for_selection_notify(property)) {
+  if (!wait_for_selection_notify(property, timeout)) {
     return std::nullopt;
   }
 
@@ -317,26 +395,58 @@ bool ClipboardManager::verify_ownership() const {
   return true;
 }
 
+namespace {
+
+/// Читает WM_CLASS окна; false если hint отсутствует
+bool read_class_hint(Display *display, Window w, std::string &instance,
+                     std::string &wm_class) {
+  XClassHint class_hint;
+  if (XGetClassHint(display, w, &class_hint) == 0) {
+    return false;
+  }
+  if (class_hint.res_class) {
+    wm_class = class_hint.res_class;
+    XFree(class_hint.res_class);
+  }
+  if (class_hint.res_name) {
+    instance = class_hint.res_name;
+    XFree(class_hint.res_name);
+  }
+  return true;
+}
+
+/// Родитель окна; None если его нет или запрос не удался
+Window parent_window(Display *display, Window w) {
+  Window root_ret = None;
+  Window parent_ret = None;
+  Window *children = nullptr;
+  unsigned int nchildren = 0;
+
+  if (XQueryTree(display, w, &root_ret, &parent_ret, &children, &nchildren) ==
+      0) {
+    return None;
+  }
+  if (children) {
+    XFree(children);
+  }
+  return parent_ret == w ? None : parent_ret;
+}
+
+} // namespace
+
 bool ClipboardManager::is_active_window_terminal() {
   if (!display_) {
     if (!open())
       return false;
   }
 
-  // Получаем активное окно
-  Atom net_active_window = XInternAtom(display_, "_NET_ACTIVE_WINDOW", True);
-  if (net_active_window == None)
-    return false;
-
+  // Получаем активное окно (один round-trip; атом кэширован в open()).
   Atom actual_type;
   int actual_format;
   unsigned long nitems, bytes_after;
   unsigned char *data = nullptr;
 
-  int root_screen = DefaultScreen(display_);
-  Window root = RootWindow(display_, root_screen);
-
-  int result = XGetWindowProperty(display_, root, net_active_window, 0, 1,
+  int result = XGetWindowProperty(display_, root_, atom_net_active_window_, 0, 1,
                                   False, XA_WINDOW, &actual_type,
                                   &actual_format, &nitems, &bytes_after, &data);
 
@@ -352,52 +462,76 @@ bool ClipboardManager::is_active_window_terminal() {
   if (active_window == None)
     return false;
 
+  // Окно не сменилось с прошлого вызова — не обходим дерево заново (до 8 пар
+  // XGetClassHint/XQueryTree). Вердикт перепроверяем: id мог достаться новому
+  // окну. Если WM_CLASS лежал на предке, поднимаемся к нему только через
+  // XQueryTree (предки живого окна живы, BadWindow не будет) и перечитываем
+  // его WM_CLASS.
+  if (active_window == cached_active_window_) {
+    std::string wm_class;
+    std::string wm_instance;
+    (void)read_class_hint(display_, active_window, wm_instance, wm_class);
+
+    bool same_class = false;
+    if (cached_class_depth_ == 0) {
+      same_class =
+          wm_class == cached_wm_class_ && wm_instance == cached_wm_instance_;
+    } else if (wm_class.empty() && wm_instance.empty()) {
+      Window w = active_window;
+      for (int depth = 0; depth < cached_class_depth_ && w != None; ++depth) {
+        w = parent_window(display_, w);
+      }
+      if (w != None && w == cached_class_window_ &&
+          read_class_hint(display_, w, wm_instance, wm_class)) {
+        same_class =
+            wm_class == cached_wm_class_ && wm_instance == cached_wm_instance_;
+      }
+    }
+    if (same_class) {
+      return cached_active_is_terminal_;
+    }
+  }
+
   // Получаем WM_CLASS (instance/class)
   //
   // Важно: иногда _NET_ACTIVE_WINDOW может указывать на дочернее окно.
   // Тогда WM_CLASS хранится на родителе. Делаем небольшой подъём по дереву.
   std::string wm_class;
   std::string wm_instance;
+  Window class_window = None;
+  int class_depth = 0;
 
   Window w = active_window;
   for (int depth = 0; depth < 8 && w != None; ++depth) {
-    XClassHint class_hint;
-    if (XGetClassHint(display_, w, &class_hint) != 0) {
-      if (class_hint.res_class) {
-        wm_class = class_hint.res_class;
-        XFree(class_hint.res_class);
-      }
-      if (class_hint.res_name) {
-        wm_instance = class_hint.res_name;
-        XFree(class_hint.res_name);
-      }
-
+    if (read_class_hint(display_, w, wm_instance, wm_class)) {
       // Если нашли хоть что-то — достаточно.
       if (!wm_class.empty() || !wm_instance.empty()) {
+        class_window = w;
+        class_depth = depth;
         break;
       }
     }
 
     // Поднимаемся к родителю.
-    Window root_ret = None;
-    Window parent_ret = None;
-    Window *children = nullptr;
-    unsigned int nchildren = 0;
+    w = parent_window(display_, w);
+  }
 
-    if (XQueryTree(display_, w, &root_ret, &parent_ret, &children, &nchildren) == 0) {
-      break;
-    }
-    if (children) {
-      XFree(children);
-    }
+  const bool is_terminal = is_terminal_wm_class(wm_instance, wm_class);
 
-    if (parent_ret == None || parent_ret == w) {
-      break;
-    }
-    w = parent_ret;
+  // Новое окно терминала могло ещё не выставить WM_CLASS: такой вердикт не
+  // кэшируем, иначе он залип бы до смены активного окна.
+  if (wm_class.empty() && wm_instance.empty()) {
+    cached_active_window_ = None;
+    return is_terminal;
   }
 
-  return is_terminal_wm_class(wm_instance, wm_class);
+  cached_active_window_ = active_window;
+  cached_wm_class_ = std::move(wm_class);
+  cached_wm_instance_ = std::move(wm_instance);
+  cached_class_window_ = class_window;
+  cached_class_depth_ = class_depth;
+  cached_active_is_terminal_ = is_terminal;
+  return is_terminal;
 }
 
 } // namespace punto
@@ -4,6 +4,7 @@
  */
 
 #include "punto/config.hpp"
+#include "punto/file_stamp.hpp"
 #include "punto/scancode_map.hpp"
 
 #include <cctype>
@@ -12,6 +13,8 @@
 #include <cstdlib>
 #include <fstream>
 #include <iostream>
+#include <mutex>
+#include <optional>
 #include <string>
 
 namespace punto {
@@ -43,11 +46,10 @@ std::optional<int> parse_int(std::string_view sv) {
 /// Парсит число с плавающей точкой из строки
 std::optional<double> parse_double(std::string_view sv) {
   sv = trim(sv);
-  // std::from_chars для double не везде поддерживается, используем strtod
-  std::string str{sv};
-  char *end = nullptr;
-  double value = std::strtod(str.c_str(), &end);
-  if (end == str.c_str() + str.size()) {
+  double value = 0.0;
+  // from_chars: без копии в std::string и без зависимости от локали (strtod).
+  auto [ptr, ec] = std::from_chars(sv.data(), sv.data() + sv.size(), value);
+  if (ec == std::errc{} && ptr == sv.data() + sv.size()) {
     return value;
   }
   return std::nullopt;
@@ -119,13 +121,42 @@ std::string get_user_config_path() {
   return "";
 }
 
-Config parse_config_stream(std::istream &file) {
+/// Секции конфигурации (вместо сравнения std::string на каждой строке).
+enum class ConfigSection { None, Hotkey, AutoSwitch, Sound, Logging, Runtime };
+
+struct SectionName {
+  std::string_view header;
+  ConfigSection section;
+};
+
+constexpr SectionName kSectionNames[] = {
+    {"hotkey:", ConfigSection::Hotkey},   {"auto_switch:", ConfigSection::AutoSwitch},
+    {"sound:", ConfigSection::Sound},     {"logging:", ConfigSection::Logging},
+    {"runtime:", ConfigSection::Runtime},
+};
+
+/// Читает файл целиком: один буфер вместо std::string на каждую строку.
+std::string read_whole_file(std::ifstream &file, std::size_t size_hint) {
+  std::string content;
+  content.reserve(size_hint);
+
+  char chunk[4096];
+  while (file.read(chunk, sizeof(chunk)) || file.gcount() > 0) {
+    content.append(chunk, static_cast<std::size_t>(file.gcount()));
+  }
+  return content;
+}
+
+Config parse_config_text(std::string_view text) {
   Config config;
 
-  std::string line;
-  std::string current_section;
+  ConfigSection current_section = ConfigSection::None;
+
+  while (!text.empty()) {
+    const std::size_t eol = text.find('\n');
+    const std::string_view line = text.substr(0, eol);
+    text.remove_prefix(eol == std::string_view::npos ? text.size() : eol + 1);
 
-  while (std::getline(file, line)) {
     std::string_view sv = trim(line);
 
     // Пропуск пустых строк и комментариев
@@ -134,24 +165,15 @@ Config parse_config_stream(std::istream &file) {
     }
 
     // Определение секции
-    if (sv == "hotkey:" || sv.starts_with("hotkey:")) {
-      current_section = "hotkey";
-      continue;
-    }
-    if (sv == "auto_switch:" || sv.starts_with("auto_switch:")) {
-      current_section = "auto_switch";
-      continue;
-    }
-    if (sv == "sound:" || sv.starts_with("sound:")) {
-      current_section = "sound";
-      continue;
-    }
-    if (sv == "logging:" || sv.starts_with("logging:")) {
-      current_section = "logging";
-      continue;
+    bool is_header = false;
+    for (const auto &name : kSectionNames) {
+      if (sv.starts_with(name.header)) {
+        current_section = name.section;
+        is_header = true;
+        break;
+      }
     }
-    if (sv == "runtime:" || sv.starts_with("runtime:")) {
-      current_section = "runtime";
+    if (is_header) {
       continue;
     }
 
@@ -164,7 +186,7 @@ Config parse_config_stream(std::istream &file) {
     std::string_view key = trim(sv.substr(0, colon_pos));
     std::string_view value = trim(sv.substr(colon_pos + 1));
 
-    if (current_section == "hotkey") {
+    if (current_section == ConfigSection::Hotkey) {
       if (key == "modifier") {
         if (auto code = key_name_to_code(value)) {
           config.hotkey.modifier = *code;
@@ -174,7 +196,7 @@ Config parse_config_stream(std::istream &file) {
           config.hotkey.key = *code;
         }
       }
-    } else if (current_section == "auto_switch") {
+    } else if (current_section == ConfigSection::AutoSwitch) {
       if (key == "enabled") {
         if (auto val = parse_bool(value)) {
           config.auto_switch.enabled = *val;
@@ -209,19 +231,19 @@ Config parse_config_stream(std::istream &file) {
           config.auto_switch.sticky_shift_correction_enabled = *val;
         }
       }
-    } else if (current_section == "sound") {
+    } else if (current_section == ConfigSection::Sound) {
       if (key == "enabled") {
         if (auto val = parse_bool(value)) {
           config.sound.enabled = *val;
         }
       }
-    } else if (current_section == "logging") {
+    } else if (current_section == ConfigSection::Logging) {
       if (key == "level") {
         if (auto level = parse_log_level(value)) {
           config.logging.level = *level;
         }
       }
-    } else if (current_section == "runtime") {
+    } else if (current_section == ConfigSection::Runtime) {
       if (key == "analysis_threads") {
         if (auto val = parse_int(value); val && *val >= 0) {
           config.runtime.analysis_threads = static_cast<std::size_t>(*val);
@@ -238,6 +260,21 @@ Config parse_config_stream(std::istream &file) {
   return config;
 }
 
+/// Последний успешно загруженный конфиг. reload_config() вызывается и из
+/// main loop, и из IPC-потока, поэтому доступ под mutex.
+struct ConfigCache {
+  std::mutex mu;
+  std::filesystem::path path;
+  FileStamp stamp; ///< если файл не изменился, не перечитываем его
+  ConfigLoadOutcome outcome;
+  bool valid = false;
+};
+
+ConfigCache &config_cache() {
+  static ConfigCache cache;
+  return cache;
+}
+
 } // namespace
 
 ConfigLoadOutcome load_config_checked(std::filesystem::path path) {
@@ -250,14 +287,27 @@ ConfigLoadOutcome load_config_checked(std::filesystem::path path) {
     return out;
   }
 
-  std::ifstream file{out.used_path};
+  // Повторные RELOAD (смена X11-сессии, синхронизация control plane) чаще
+  // всего приходят для неизменённого файла: отдаём разобранный ранее конфиг.
+  const std::optional<FileStamp> stamp = stat_file_stamp(out.used_path);
+  ConfigCache &cache = config_cache();
+  if (stamp) {
+    std::lock_guard<std::mutex> lock(cache.mu);
+    if (cache.valid && cache.path == out.used_path && cache.stamp == *stamp) {
+      return cache.outcome;
+    }
+  }
+
+  std::ifstream file{out.used_path, std::ios::binary};
   if (!file.is_open()) {
     out.result = ConfigResult::FileNotFound;
     out.error = "Config file not found: " + out.used_path.string();
     return out;
   }
 
-  out.config = parse_config_stream(file);
+  const std::string content = read_whole_file(
+      file, stamp ? static_cast<std::size_t>(stamp->size) : std::size_t{0});
+  out.config = parse_config_text(content);
   out.config.config_path = out.used_path;
 
   if (!validate_config(out.config)) {
@@ -268,6 +318,14 @@ ConfigLoadOutcome load_config_checked(std::filesystem::path path) {
   }
 
   out.result = ConfigResult::Ok;
+
+  if (stamp) {
+    std::lock_guard<std::mutex> lock(cache.mu);
+    cache.path = out.used_path;
+    cache.stamp = *stamp;
+    cache.outcome = out;
+    cache.valid = true;
+  }
   return out;
 }
 
@@ -9,7 +9,6 @@
 
 #include <algorithm>
 #include <cctype>
-#include <cstring>
 #include <fstream>
 #include <iostream>
 #include <linux/input.h>
@@ -92,55 +91,14 @@ constexpr const char *kBuiltinITTerms[] = {
 };
 // clang-format on
 
+// Биты языков в Dictionary::hash_langs_
+constexpr std::uint8_t kHashLangEn = 1U << 0;
+constexpr std::uint8_t kHashLangRu = 1U << 1;
+
 // Минимальная и максимальная длина слов для загрузки
 constexpr std::size_t kDictMinWordLen = 2;
 constexpr std::size_t kDictMaxWordLen = 20;
 
-/// Таблица конвертации UTF-8 кириллицы -> ASCII QWERTY
-/// Ключ: 2-байтовый UTF-8 код (без учёта первого байта 0xD0/0xD1)
-/// Значение: ASCII символ на QWERTY клавиатуре
-struct CyrToQwerty {
-  const char *utf8;
-  char qwerty;
-};
-
-// clang-format off
-constexpr CyrToQwerty kCyrillicMap[] = {
-    // Строчные
-    {"а", 'f'}, {"б", ','}, {"в", 'd'}, {"г", 'u'}, {"д", 'l'},
-    {"е", 't'}, {"ж", ';'}, {"з", 'p'}, {"и", 'b'}, {"й", 'q'},
-    {"к", 'r'}, {"л", 'k'}, {"м", 'v'}, {"н", 'y'}, {"о", 'j'},
-    {"п", 'g'}, {"р", 'h'}, {"с", 'c'}, {"т", 'n'}, {"у", 'e'},
-    {"ф", 'a'}, {"х", '['}, {"ц", 'w'}, {"ч", 'x'}, {"ш", 'i'},
-    {"щ", 'o'}, {"ъ", ']'}, {"ы", 's'}, {"ь", 'm'}, {"э", '\''},
-    {"ю", '.'}, {"я", 'z'}, {"ё", '`'},
-    // Заглавные -> в нижний регистр
-    {"А", 'f'}, {"Б", ','}, {"В", 'd'}, {"Г", 'u'}, {"Д", 'l'},
-    {"Е", 't'}, {"Ж", ';'}, {"З", 'p'}, {"И", 'b'}, {"Й", 'q'},
-    {"К", 'r'}, {"Л", 'k'}, {"М", 'v'}, {"Н", 'y'}, {"О", 'j'},
-    {"П", 'g'}, {"Р", 'h'}, {"С", 'c'}, {"Т", 'n'}, {"У", 'e'},
-    {"Ф", 'a'}, {"Х", '['}, {"Ц", 'w'}, {"Ч", 'x'}, {"Ш", 'i'},
-    {"Щ", 'o'}, {"Ъ", ']'}, {"Ы", 's'}, {"Ь", 'm'}, {"Э", '\''},
-    {"Ю", '.'}, {"Я", 'z'}, {"Ё", '`'},
-};
-
-/// Таблица обратной конвертации: ASCII QWERTY -> UTF-8 кириллица
-struct QwertyToCyr {
-  char qwerty;
-  const char *utf8;
-};
-
-constexpr QwertyToCyr kQwertyMap[] = {
-    {'f', "а"}, {',', "б"}, {'d', "в"}, {'u', "г"}, {'l', "д"},
-    {'t', "е"}, {';', "ж"}, {'p', "з"}, {'b', "и"}, {'q', "й"},
-    {'r', "к"}, {'k', "л"}, {'v', "м"}, {'y', "н"}, {'j', "о"},
-    {'g', "п"}, {'h', "р"}, {'c', "с"}, {'n', "т"}, {'e', "у"},
-    {'a', "ф"}, {'[', "х"}, {'w', "ц"}, {'x', "ч"}, {'i', "ш"},
-    {'o', "щ"}, {']', "ъ"}, {'s', "ы"}, {'m', "ь"}, {'\'', "э"},
-    {'.', "ю"}, {'z', "я"}, {'`', "ё"},
-};
-// clang-format on
-
 // Пути к hunspell словарям (с .aff файлами)
 constexpr const char *kEnAffPath = "/usr/share/hunspell/en_US.aff";
 constexpr const char *kEnDicPathHunspell = "/usr/share/hunspell/en_US.dic";
@@ -170,16 +128,34 @@ std::string to_lowercase_ascii(const std::string &s) {
   return result;
 }
 
-/// Проверяет, содержит ли строка только ASCII буквы
-bool is_ascii_alpha_only(const std::string &s) {
+/// Проверяет, что строка состоит только из ASCII букв, и за тот же проход
+/// пишет её в нижнем регистре в out (буфер переиспользуется между словами).
+/// При первом же не-буквенном символе возвращает false.
+bool ascii_alpha_to_lower(std::string_view s, std::string &out) {
+  out.clear();
   for (char c : s) {
-    if (!((c >= 'a' && c <= 'z') || (c >= 'A' && c <= 'Z'))) {
+    if (c >= 'A' && c <= 'Z') {
+      out += static_cast<char>(c + 32);
+    } else if (c >= 'a' && c <= 'z') {
+      out += c;
+    } else {
       return false;
     }
   }
   return true;
 }
 
+/// Добавляет слово в отсортированный массив хешей и Bloom filter.
+/// Хеш считается один раз: h1 идёт и в массив, и в фильтр.
+void add_word_hashes(std::vector<std::uint64_t> &hashes, BloomFilter &bloom,
+                     std::string_view word) {
+  std::uint64_t h1 = 0;
+  std::uint64_t h2 = 0;
+  Hasher::hash_string_double(word, h1, h2);
+  hashes.push_back(h1);
+  bloom.add_hashes(h1, h2);
+}
+
 } // namespace
 
 std::string Dictionary::cyrillic_to_qwerty(const std::string &cyrillic) {
@@ -188,42 +164,37 @@ std::string Dictionary::cyrillic_to_qwerty(const std::string &cyrillic) {
 
   std::size_t i = 0;
   while (i < cyrillic.size()) {
-    bool found = false;
-
-    // Проверяем 2-байтовые UTF-8 последовательности
+    // Кириллица (2 байта UTF-8): одна плоская таблица из scancode_map.hpp
     if (i + 1 < cyrillic.size()) {
-      for (const auto &entry : kCyrillicMap) {
-        std::size_t len = std::strlen(entry.utf8);
-        if (i + len <= cyrillic.size() &&
-            std::memcmp(cyrillic.data() + i, entry.utf8, len) == 0) {
-          result += entry.qwerty;
-          i += len;
-          found = true;
-          break;
-        }
+      const int idx = cyrillic_index(std::string_view{cyrillic}.substr(i, 2));
+      if (idx >= 0 && idx < static_cast<int>(kCyrToQwertyLower.size()) &&
+          kCyrToQwertyLower[static_cast<std::size_t>(idx)] != '\0') {
+        result += kCyrToQwertyLower[static_cast<std::size_t>(idx)];
+        i += 2;
+        continue;
       }
     }
 
-    if (!found) {
-      // Неизвестный символ — пропускаем или указываем на ошибку
-      char c = cyrillic[i];
-      if ((c >= 'a' && c <= 'z') || (c >= 'A' && c <= 'Z')) {
-        // ASCII буква — оставляем как есть (в нижнем регистре)
-        result +=
-            static_cast<char>(std::tolower(static_cast<unsigned char>(c)));
-      }
-      ++i;
+    // Неизвестный символ — пропускаем или указываем на ошибку
+    char c = cyrillic[i];
+    if ((c >= 'a' && c <= 'z') || (c >= 'A' && c <= 'Z')) {
+      // ASCII буква — оставляем как есть (в нижнем регистре)
+      result += static_cast<char>(std::tolower(static_cast<unsigned char>(c)));
     }
+    ++i;
   }
 
   return result;
 }
 
-bool Dictionary::hash_exists(
-    std::uint64_t hash, const std::vector<std::uint64_t> &hashes) noexcept {
+std::uint8_t Dictionary::find_hash_langs(std::uint64_t hash) const noexcept {
   // Бинарный поиск в отсортированном векторе
   // O(log N) с отличной cache locality
-  return std::binary_search(hashes.begin(), hashes.end(), hash);
+  const auto it = std::lower_bound(hashes_.begin(), hashes_.end(), hash);
+  if (it == hashes_.end() || *it != hash) {
+    return 0;
+  }
+  return hash_langs_[static_cast<std::size_t>(it - hashes_.begin())];
 }
 
 std::size_t Dictionary::load_en_dictionary(const std::string &path) {
@@ -249,6 +220,8 @@ std::size_t Dictionary::load_en_dictionary(const std::string &path) {
     std::getline(file, line);
   }
 
+  std::string lower;
+
   while (std::getline(file, line)) {
     std::string word = is_hunspell ? extract_word(line) : line;
 
@@ -257,19 +230,14 @@ std::size_t Dictionary::load_en_dictionary(const std::string &path) {
            (word.back() == '\r' || word.back() == '\n' || word.back() == ' ')) {
       word.pop_back();
     }
-    while (!word.empty() && (word.front() == ' ')) {
-      word.erase(0, 1);
-    }
+    // Один erase вместо посимвольного erase(0, 1): без квадратичного сдвига
+    word.erase(0, std::min(word.find_first_not_of(' '), word.size()));
 
     // Фильтруем по длине и содержимому
     if (word.size() >= kDictMinWordLen && word.size() <= kDictMaxWordLen &&
-        is_ascii_alpha_only(word)) {
-      std::string lower = to_lowercase_ascii(word);
-
+        ascii_alpha_to_lower(word, lower)) {
       // Вычисляем хеш и добавляем в структуры
-      std::uint64_t hash = Hasher::hash_string(lower);
-      en_hashes_.push_back(hash);
-      en_bloom_.add(lower);
+      add_word_hashes(en_hashes_, en_bloom_, lower);
 
       ++count;
     }
@@ -309,9 +277,8 @@ std::size_t Dictionary::load_ru_dictionary(const std::string &path) {
            (word.back() == '\r' || word.back() == '\n' || word.back() == ' ')) {
       word.pop_back();
     }
-    while (!word.empty() && (word.front() == ' ')) {
-      word.erase(0, 1);
-    }
+    // Один erase вместо посимвольного erase(0, 1): без квадратичного сдвига
+    word.erase(0, std::min(word.find_first_not_of(' '), word.size()));
 
     // Фильтруем по длине (в символах UTF-8 это примерно word.size()/2)
     if (word.size() >= kDictMinWordLen * 2 &&
@@ -322,9 +289,7 @@ std::size_t Dictionary::load_ru_dictionary(const std::string &path) {
       if (qwerty.size() >= kDictMinWordLen &&
           qwerty.size() <= kDictMaxWordLen) {
         // Вычисляем хеш и добавляем в структуры
-        std::uint64_t hash = Hasher::hash_string(qwerty);
-        ru_hashes_.push_back(hash);
-        ru_bloom_.add(qwerty);
+        add_word_hashes(ru_hashes_, ru_bloom_, qwerty);
 
         ++count;
       }
@@ -398,10 +363,7 @@ bool Dictionary::initialize() {
     std::string word_str(term);
     if (word_str.size() >= kDictMinWordLen &&
         word_str.size() <= kDictMaxWordLen) {
-      std::string lower = to_lowercase_ascii(word_str);
-      std::uint64_t hash = Hasher::hash_string(lower);
-      en_hashes_.push_back(hash);
-      en_bloom_.add(lower);
+      add_word_hashes(en_hashes_, en_bloom_, to_lowercase_ascii(word_str));
       ++it_count;
     }
   }
@@ -416,14 +378,15 @@ bool Dictionary::initialize() {
   initialized_ =
       (fallback_en_count > 0 || fallback_ru_count > 0 || hunspell_available_);
 
-  std::cerr << "[punto] Dictionary: EN=" << en_hashes_.size()
-            << " RU=" << ru_hashes_.size() << " unique words (hash-based)\n";
+  std::cerr << "[punto] Dictionary: EN=" << en_word_count_
+            << " RU=" << ru_word_count_ << " unique words (hash-based)\n";
   std::cerr << "[punto] Bloom fill: EN="
             << static_cast<int>(en_bloom_.fill_ratio() * 100)
             << "% RU=" << static_cast<int>(ru_bloom_.fill_ratio() * 100)
             << "%\n";
-  std::cerr << "[punto] Hash memory: EN=" << (en_hashes_.size() * 8 / 1024)
-            << "KB RU=" << (ru_hashes_.size() * 8 / 1024) << "KB\n";
+  std::cerr << "[punto] Hash memory: "
+            << (hashes_.size() * (sizeof(std::uint64_t) + 1) / 1024)
+            << "KB (" << hashes_.size() << " EN+RU hashes)\n";
 
   return initialized_;
 }
@@ -439,9 +402,40 @@ void Dictionary::finalize_hashes() {
   ru_hashes_.erase(std::unique(ru_hashes_.begin(), ru_hashes_.end()),
                    ru_hashes_.end());
 
-  // Освобождаем лишнюю память
-  en_hashes_.shrink_to_fit();
-  ru_hashes_.shrink_to_fit();
+  en_word_count_ = en_hashes_.size();
+  ru_word_count_ = ru_hashes_.size();
+
+  // Сливаем два отсортированных вектора в один с битами языков
+  hashes_.clear();
+  hash_langs_.clear();
+  hashes_.reserve(en_hashes_.size() + ru_hashes_.size());
+  hash_langs_.reserve(en_hashes_.size() + ru_hashes_.size());
+
+  auto en = en_hashes_.begin();
+  auto ru = ru_hashes_.begin();
+  while (en != en_hashes_.end() || ru != ru_hashes_.end()) {
+    std::uint8_t langs = 0;
+    std::uint64_t hash = 0;
+    if (ru == ru_hashes_.end() || (en != en_hashes_.end() && *en < *ru)) {
+      hash = *en++;
+      langs = kHashLangEn;
+    } else if (en == en_hashes_.end() || *ru < *en) {
+      hash = *ru++;
+      langs = kHashLangRu;
+    } else {
+      hash = *en++;
+      ++ru;
+      langs = kHashLangEn | kHashLangRu;
+    }
+    hashes_.push_back(hash);
+    hash_langs_.push_back(langs);
+  }
+
+  // Исходные векторы больше не нужны — освобождаем память
+  std::vector<std::uint64_t>().swap(en_hashes_);
+  std::vector<std::uint64_t>().swap(ru_hashes_);
+  hashes_.shrink_to_fit();
+  hash_langs_.shrink_to_fit();
 }
 
 DictResult Dictionary::lookup(std::span<const KeyEntry> entries) const {
@@ -469,6 +463,32 @@ DictResult Dictionary::lookup(std::span<const KeyEntry> entries) const {
     return DictResult::Unknown;
   }
 
+  // hash_entries() хеширует ровно эту строку — считаем хеши один раз
+  std::uint64_t h1 = 0;
+  std::uint64_t h2 = 0;
+  Hasher::hash_string_double(ascii_word, h1, h2);
+  LookupCacheSlot &slot =
+      lookup_cache_[static_cast<std::size_t>(h1) & (kLookupCacheSize - 1)];
+  {
+    std::lock_guard<std::mutex> lock(lookup_cache_mutex_);
+    if (slot.hash == h1 && slot.word == ascii_word) {
+      return slot.result;
+    }
+  }
+
+  const DictResult result = lookup_ascii(ascii_word, h1, h2);
+
+  {
+    std::lock_guard<std::mutex> lock(lookup_cache_mutex_);
+    slot.hash = h1;
+    slot.word = ascii_word;
+    slot.result = result;
+  }
+  return result;
+}
+
+DictResult Dictionary::lookup_ascii(const std::string &ascii_word,
+                                    std::uint64_t h1, std::uint64_t h2) const {
   bool in_en = false;
   bool in_ru = false;
 
@@ -500,9 +520,6 @@ DictResult Dictionary::lookup(std::span<const KeyEntry> entries) const {
 #endif
 
   // Приоритет 2: Hash-based проверка (fallback)
-  std::uint64_t h1, h2;
-  Hasher::hash_entries_double(entries, h1, h2);
-
   if (h1 == 0) {
     return DictResult::Unknown;
   }
@@ -516,9 +533,10 @@ DictResult Dictionary::lookup(std::span<const KeyEntry> entries) const {
     return DictResult::Unknown;
   }
 
-  // Level 1-2: Точная проверка в sorted vector (бинарный поиск)
-  in_en = maybe_en && hash_exists(h1, en_hashes_);
-  in_ru = maybe_ru && hash_exists(h1, ru_hashes_);
+  // Level 1-2: Точная проверка — один бинарный поиск по EN+RU
+  const std::uint8_t langs = find_hash_langs(h1);
+  in_en = maybe_en && (langs & kHashLangEn) != 0;
+  in_ru = maybe_ru && (langs & kHashLangRu) != 0;
 
   if (in_en && in_ru) {
     return DictResult::Both;
@@ -544,19 +562,12 @@ std::string Dictionary::qwerty_to_cyrillic(const std::string &qwerty) {
       lower = static_cast<char>(lower + 32);
     }
 
-    bool found = false;
-    for (const auto &entry : kQwertyMap) {
-      if (entry.qwerty == lower) {
-        result += entry.utf8;
-        found = true;
-        break;
-      }
-    }
-
-    if (!found) {
+    const auto uc = static_cast<unsigned char>(lower);
+    if (uc >= kQwertyToCyrLower.size() || kQwertyToCyrLower[uc].empty()) {
       // Неизвестный символ — не конвертируем
       return "";
     }
+    result += kQwertyToCyrLower[uc];
   }
 
   return result;
@@ -58,6 +58,12 @@ oneshot_paste_waits(bool is_terminal) noexcept {
 constexpr std::uint64_t kTaskIdFenceStride = 1024;
 constexpr auto kControlPlanePollInterval = std::chrono::seconds{2};
 
+// Тик главного цикла: при незавершённой async-работе и в простое.
+// Простой ограничивает только латентность периодических проверок
+// (control plane, X11 сессия), которые и так идут раз в секунды.
+constexpr int kBusyPollTimeoutMs = 1;
+constexpr int kIdlePollTimeoutMs = 100;
+
 enum class ReadEventStatus {
   Ok,
   Eof,
@@ -65,14 +71,23 @@ enum class ReadEventStatus {
   Error,
 };
 
-ReadEventStatus read_input_event(int fd, input_event &ev) {
-  auto *dst = reinterpret_cast<std::uint8_t *>(&ev);
+/// Читает одним read() все уже доступные события (не больше out.size()).
+/// Частично прочитанное последнее событие дочитывается до конца.
+ReadEventStatus read_input_events(int fd, std::span<input_event> out,
+                                  std::size_t &count) {
+  count = 0;
+  auto *dst = reinterpret_cast<std::uint8_t *>(out.data());
+  const std::size_t capacity = out.size_bytes();
   std::size_t total = 0;
+  std::size_t want = sizeof(input_event);
 
-  while (total < sizeof(ev)) {
-    const ssize_t n = ::read(fd, dst + total, sizeof(ev) - total);
+  while (total < want) {
+    const ssize_t n = ::read(fd, dst + total, capacity - total);
     if (n > 0) {
       total += static_cast<std::size_t>(n);
+      // Дочитываем только хвост неполного события, новых не ждём.
+      want = (total + sizeof(input_event) - 1) / sizeof(input_event) *
+             sizeof(input_event);
       continue;
     }
     if (n == 0) {
@@ -87,6 +102,7 @@ ReadEventStatus read_input_event(int fd, input_event &ev) {
     return ReadEventStatus::Error;
   }
 
+  count = total / sizeof(input_event);
   return ReadEventStatus::Ok;
 }
 
@@ -208,6 +224,7 @@ bool EventLoop::initialize() {
 
     std::shared_ptr<const KeyInjector> injector_const = injector;
     std::atomic_store(&injector_, std::move(injector_const));
+    snapshot_generation_.fetch_add(1, std::memory_order_release);
   }
 
   // Инициализируем словарь для гибридного анализа
@@ -323,8 +340,6 @@ int EventLoop::run() {
 
   std::setbuf(stdout, nullptr);
 
-  input_event ev{};
-
   pollfd pfd{STDIN_FILENO, POLLIN, 0};
 
   // Время последней проверки/обновления X11-сессии.
@@ -334,6 +349,7 @@ int EventLoop::run() {
   constexpr auto kX11CheckInterval = std::chrono::seconds{3};
 
   bool x11_wait_log_emitted = false;
+  int x11_fd_broken = -1;
 
   auto rebuild_x11_deps = [&]() {
     // Смена GUI-сессии может менять источник конфигурации (~/.config/...)
@@ -360,6 +376,7 @@ int EventLoop::run() {
     // Пересоздаём Clipboard/Sound (они завязаны на
     // DISPLAY/XDG_RUNTIME_DIR/uid).
     clipboard_ = std::make_unique<ClipboardManager>(*x11_session_);
+    x11_fd_broken = -1;
 
     auto cfg = std::atomic_load(&config_);
     sound_manager_ = std::make_unique<SoundManager>(*x11_session_, cfg->sound);
@@ -464,18 +481,49 @@ int EventLoop::run() {
       break;
     }
 
-    std::array<pollfd, 2> pfds{};
+    // Сначала разбираем уже прочитанный пакет: poll() о нём не сообщит.
+    if (stdin_batch_pos_ < stdin_batch_len_) {
+      handle_next_batched_event();
+      process_ready_results();
+      maybe_handle_injector_failure("stdin event processing");
+      continue;
+    }
+
+    std::array<pollfd, 3> pfds{};
     nfds_t nfds = 1;
     pfds[0] = pfd;
+    nfds_t stop_idx = 0;
     if (stop_signal_fd_ >= 0) {
-      pfds[1] = pollfd{stop_signal_fd_, POLLIN, 0};
-      nfds = 2;
+      stop_idx = nfds;
+      pfds[nfds++] = pollfd{stop_signal_fd_, POLLIN, 0};
+    }
+    // X11 события (SelectionRequest от других приложений) будят цикл сразу,
+    // поэтому в простое не нужен частый тик ради pump_events().
+    // Round-trip'ы после pump_events() в начале итерации (восстановление
+    // буфера, результаты анализа) могли уже вычитать событие в очередь Xlib:
+    // fd о нём не сообщит, поэтому разбираем очередь непосредственно перед
+    // poll().
+    if (clipboard_) {
+      clipboard_->pump_events();
+    }
+    const int x11_fd = clipboard_ ? clipboard_->connection_fd() : -1;
+    nfds_t x11_idx = 0;
+    if (x11_fd >= 0 && x11_fd != x11_fd_broken) {
+      x11_idx = nfds;
+      pfds[nfds++] = pollfd{x11_fd, POLLIN, 0};
     }
 
-    int ret = poll(pfds.data(), nfds, 1); // 1ms тик
+    int ret = poll(pfds.data(), nfds, main_loop_poll_timeout_ms());
 
     if (ret > 0) {
-      if (stop_signal_fd_ >= 0 && (pfds[1].revents & POLLIN)) {
+      // Оборванное X11 соединение давало бы POLLHUP на каждом poll() —
+      // перестаём его ждать (pump_events по тику продолжит работать).
+      if (x11_idx != 0 &&
+          (pfds[x11_idx].revents & (POLLHUP | POLLERR | POLLNVAL))) {
+        x11_fd_broken = x11_fd;
+      }
+
+      if (stop_idx != 0 && (pfds[stop_idx].revents & POLLIN)) {
         drain_fd(stop_signal_fd_);
         request_stop();
         continue;
@@ -499,9 +547,11 @@ int EventLoop::run() {
       }
 
       if (pfd.revents & POLLIN) {
-        switch (read_input_event(STDIN_FILENO, ev)) {
+        switch (read_input_events(STDIN_FILENO, stdin_batch_,
+                                  stdin_batch_len_)) {
         case ReadEventStatus::Ok:
-          handle_event(ev);
+          stdin_batch_pos_ = 0;
+          handle_next_batched_event();
           process_ready_results();
           maybe_handle_injector_failure("stdin event processing");
           continue;
@@ -541,6 +591,17 @@ int EventLoop::run() {
   return exit_code_;
 }
 
+int EventLoop::main_loop_poll_timeout_ms() const noexcept {
+  // Все task_id из [next_apply_task_id_, next_task_id_) ещё ждут результата
+  // воркера: его нужно применить без задержки.
+  const bool analysis_in_flight = next_apply_task_id_ < next_task_id_;
+  if (analysis_in_flight || pending_clip_restore_.has_value() ||
+      x11_refresh_pending_) {
+    return kBusyPollTimeoutMs;
+  }
+  return kIdlePollTimeoutMs;
+}
+
 void EventLoop::emit_passthrough_event(const input_event &ev) {
   if (ev.type == EV_KEY) {
     const ScanCode code = ev.code;
@@ -549,12 +610,41 @@ void EventLoop::emit_passthrough_event(const input_event &ev) {
     }
   }
 
-  auto injector = std::atomic_load(&injector_);
+  refresh_main_snapshots();
+  const auto injector = main_injector_;
   if (!injector) {
     return;
   }
   injector->emit_event(ev);
-  maybe_handle_injector_failure("passthrough");
+  // Тот же снапшот injector'а: второй atomic_load на каждое событие не нужен.
+  maybe_handle_injector_failure(*injector, "passthrough");
+}
+
+void EventLoop::handle_next_batched_event() {
+  // Не-EV_KEY события вне макроса handle_event() только форвардит, поэтому
+  // их серию можно отдать одним write(). EV_KEY идут по одному: после них
+  // может последовать инжекция.
+  std::size_t run = 0;
+  if (!is_processing_macro_.load(std::memory_order_acquire)) {
+    while (stdin_batch_pos_ + run < stdin_batch_len_ &&
+           stdin_batch_[stdin_batch_pos_ + run].type != EV_KEY) {
+      ++run;
+    }
+  }
+
+  refresh_main_snapshots();
+  const auto injector = (run > 1) ? main_injector_ : nullptr;
+  if (injector) {
+    injector->emit_events(std::span<const input_event>{
+        stdin_batch_.data() + stdin_batch_pos_, run});
+    stdin_batch_pos_ += run;
+    maybe_handle_injector_failure(*injector, "passthrough");
+    return;
+  }
+
+  // Копия: handle_event() может перечитать пакет во время макроса.
+  const input_event ev = stdin_batch_[stdin_batch_pos_++];
+  handle_event(ev);
 }
 
 void EventLoop::handle_event(const input_event &ev) {
@@ -608,7 +698,8 @@ void EventLoop::handle_event(const input_event &ev) {
     return;
   }
 
-  auto cfg = std::atomic_load(&config_);
+  refresh_main_snapshots();
+  const auto cfg = main_config_;
 
   // Применяем изменения max_rollback_words безопасно (только в main thread).
   if (history_.max_words() != cfg->auto_switch.max_rollback_words) {
@@ -621,7 +712,8 @@ void EventLoop::handle_event(const input_event &ev) {
   // =========================================================================
 
   if (is_modifier(code)) {
-    const bool hotkey_press = is_configured_layout_hotkey_press(code, is_press);
+    const bool hotkey_press =
+        is_configured_layout_hotkey_press(cfg->hotkey, code, is_press);
     update_modifier_state(code, pressed);
     emit_passthrough_event(ev);
     if (hotkey_press) {
@@ -629,7 +721,7 @@ void EventLoop::handle_event(const input_event &ev) {
                                 std::chrono::steady_clock::now());
       mark_layout_desynced("user layout hotkey");
     }
-    maybe_complete_external_layout_hotkey(code, is_release);
+    maybe_complete_external_layout_hotkey(cfg->hotkey, code, is_release);
     return;
   }
 
@@ -638,14 +730,14 @@ void EventLoop::handle_event(const input_event &ev) {
   // =========================================================================
   if (is_release) {
     emit_passthrough_event(ev);
-    maybe_complete_external_layout_hotkey(code, true);
+    maybe_complete_external_layout_hotkey(cfg->hotkey, code, true);
     return;
   }
 
   // Повторы разделителей (SPACE/TAB) должны проходить в приложение,
   // но не должны повторно запускать автоанализ/автозамену.
   // Иначе возможны дубли пробела и рассинхронизация контекста слова.
-  if (is_repeat && (code == KEY_SPACE || code == KEY_TAB)) {
+  if (is_repeat && is_word_delimiter(code)) {
     emit_passthrough_event(ev);
     return;
   }
@@ -730,7 +822,7 @@ void EventLoop::handle_event(const input_event &ev) {
   // Пользовательский hotkey переключения раскладки
   // =========================================================================
 
-  if (is_configured_layout_hotkey_press(code, is_press)) {
+  if (is_configured_layout_hotkey_press(cfg->hotkey, code, is_press)) {
     reset_async_state();
     history_.reset();
     arm_external_layout_sound(external_layout_sound_,
@@ -760,25 +852,28 @@ void EventLoop::handle_event(const input_event &ev) {
   // Разделители слов (пробел, таб)
   // =========================================================================
 
-  if (code == KEY_SPACE || code == KEY_TAB) {
+  if (is_word_delimiter(code)) {
     auto full_word = buffer_.current_word();
 
-    // 1. Синхронизируем раскладку (на каждом разделителе!)
-    if (!is_processing_macro_.load(std::memory_order_acquire)) {
-      sync_current_layout_from_os(code == KEY_SPACE ? "space boundary"
-                                                    : "tab boundary");
+    // 1. Очищаем слово от пунктуации для анализа
+    std::span<const KeyEntry> analysis_word = full_word;
+    while (!analysis_word.empty() &&
+           is_word_punctuation(analysis_word.back().code)) {
+      analysis_word = analysis_word.subspan(0, analysis_word.size() - 1);
     }
 
-    // 2. Очищаем слово от пунктуации для анализа
-    std::span<const KeyEntry> analysis_word = full_word;
-    while (!analysis_word.empty()) {
-      ScanCode last = analysis_word.back().code;
-      if (last == KEY_DOT || last == KEY_COMMA || last == KEY_SEMICOLON ||
-          last == KEY_APOSTROPHE || last == KEY_SLASH || last == KEY_MINUS) {
-        analysis_word = analysis_word.subspan(0, analysis_word.size() - 1);
-      } else {
-        break;
-      }
+    // Автопереключение может быть выключено через IPC.
+    const bool needs_analysis = LayoutAnalyzer::needs_analysis(
+        analysis_word, cfg->auto_switch.min_word_len,
+        ipc_enabled_.load(std::memory_order_relaxed));
+
+    // 2. Синхронизируем раскладку только для слов, уходящих в анализ: их
+    // метаданным нужна layout_at_boundary. Для коротких слов, слов с цифрами
+    // и двойных пробелов X11 round-trip не делаем — Pause-действия и
+    // set_layout() синхронизируются сами перед использованием раскладки.
+    if (needs_analysis && !is_processing_macro_.load(std::memory_order_acquire)) {
+      sync_current_layout_from_os(code == KEY_SPACE ? "space boundary"
+                                                    : "tab boundary");
     }
 
     // Сначала эмулируем ввод разделителя (чтобы ввод не тормозил).
@@ -795,10 +890,7 @@ void EventLoop::handle_event(const input_event &ev) {
     // Каждому слову — свой task_id для строгого порядка применения.
     const std::uint64_t task_id = next_task_id_++;
 
-    // Проверяем, включено ли автопереключение через IPC.
-    const bool ipc_enabled = ipc_enabled_.load(std::memory_order_relaxed);
-
-    if (!ipc_enabled || analysis_word.size() < cfg->auto_switch.min_word_len) {
+    if (!needs_analysis) {
       WordResult res;
       res.task_id = task_id;
       res.need_switch = false;
@@ -840,18 +932,20 @@ void EventLoop::handle_event(const input_event &ev) {
     meta.start_pos =
         meta.end_pos - static_cast<std::uint64_t>(meta.word.size());
 
-    pending_words_[task_id] = meta;
-    lifetime_telemetry_.pending_words.store(pending_words_.size(),
-                                            std::memory_order_relaxed);
-
     WordTask task;
     task.task_id = task_id;
-    task.word = meta.word;
+    task.word.assign(full_word.begin(), full_word.end());
     task.analysis_len = meta.analysis_len;
     task.layout_at_boundary = meta.layout_at_boundary;
     task.cfg = cfg->auto_switch;
-    task.submitted_at = std::chrono::steady_clock::now();
 
+    // meta переносим, а не копируем: слово копируется один раз для meta и
+    // один раз для задачи воркера (раньше — ещё и третья копия в map).
+    pending_words_.insert_or_assign(task_id, std::move(meta));
+    lifetime_telemetry_.pending_words.store(pending_words_.size(),
+                                            std::memory_order_relaxed);
+
+    task.submitted_at = std::chrono::steady_clock::now();
     analysis_pool_.submit(std::move(task));
 
     // Ограничиваем память: храним метаданные только для последних N слов.
@@ -873,8 +967,7 @@ void EventLoop::handle_event(const input_event &ev) {
     return;
   }
 
-  if (code == KEY_DOT || code == KEY_COMMA || code == KEY_SEMICOLON ||
-      code == KEY_APOSTROPHE || code == KEY_SLASH || code == KEY_MINUS) {
+  if (is_word_punctuation(code)) {
 
     // Синхронизируем раскладку (только синхронизация, без анализа)
     if (!is_processing_macro_.load(std::memory_order_acquire)) {
@@ -956,34 +1049,7 @@ void EventLoop::handle_event(const input_event &ev) {
 }
 
 void EventLoop::update_modifier_state(ScanCode code, bool pressed) {
-  switch (code) {
-  case KEY_LEFTSHIFT:
-    modifiers_.left_shift = pressed;
-    break;
-  case KEY_RIGHTSHIFT:
-    modifiers_.right_shift = pressed;
-    break;
-  case KEY_LEFTCTRL:
-    modifiers_.left_ctrl = pressed;
-    break;
-  case KEY_RIGHTCTRL:
-    modifiers_.right_ctrl = pressed;
-    break;
-  case KEY_LEFTALT:
-    modifiers_.left_alt = pressed;
-    break;
-  case KEY_RIGHTALT:
-    modifiers_.right_alt = pressed;
-    break;
-  case KEY_LEFTMETA:
-    modifiers_.left_meta = pressed;
-    break;
-  case KEY_RIGHTMETA:
-    modifiers_.right_meta = pressed;
-    break;
-  default:
-    break;
-  }
+  modifiers_.set(code, pressed);
 }
 
 void EventLoop::reset_modifiers_state() {
@@ -1014,28 +1080,8 @@ HotkeyAction EventLoop::determine_hotkey_action(ScanCode code) const {
     return HotkeyAction::NoAction;
   }
 
-  // LCtrl + LAlt + Pause = Transliterate
-  if (modifiers_.left_ctrl && modifiers_.left_alt) {
-    return HotkeyAction::TranslitSelection;
-  }
-
-  // Shift + Pause = Invert Layout Selection
-  if (modifiers_.any_shift()) {
-    return HotkeyAction::InvertLayoutSelection;
-  }
-
-  // Alt + Pause = Invert Case Selection
-  if (modifiers_.any_alt()) {
-    return HotkeyAction::InvertCaseSelection;
-  }
-
-  // Ctrl + Pause = Invert Case Word
-  if (modifiers_.any_ctrl()) {
-    return HotkeyAction::InvertCaseWord;
-  }
-
-  // Pause only = Invert Layout Word
-  return HotkeyAction::InvertLayoutWord;
+  // LCtrl+LAlt > Shift > Alt > Ctrl > без модификаторов (см. kPauseHotkeyActions)
+  return pause_hotkey_action(modifiers_);
 }
 
 void EventLoop::reset_async_state(bool bump_task_barrier) {
@@ -1063,48 +1109,32 @@ void EventLoop::mark_layout_desynced(std::string_view reason) {
   layout_desynced_ = true;
 }
 
-bool EventLoop::is_configured_layout_hotkey_press(ScanCode code,
+bool EventLoop::is_configured_layout_hotkey_press(const HotkeyConfig &hotkey,
+                                                  ScanCode code,
                                                   bool is_press) const {
-  if (!is_press) {
-    return false;
-  }
-
-  auto cfg = std::atomic_load(&config_);
-  if (code != cfg->hotkey.key) {
+  if (!is_press || code != hotkey.key) {
     return false;
   }
 
-  switch (cfg->hotkey.modifier) {
-  case KEY_LEFTCTRL:
-    return modifiers_.left_ctrl;
-  case KEY_RIGHTCTRL:
-    return modifiers_.right_ctrl;
-  case KEY_LEFTALT:
-    return modifiers_.left_alt;
-  case KEY_RIGHTALT:
-    return modifiers_.right_alt;
-  case KEY_LEFTSHIFT:
-    return modifiers_.left_shift;
-  case KEY_RIGHTSHIFT:
-    return modifiers_.right_shift;
-  default:
-    return false;
-  }
+  // Meta как модификатор пользовательского hotkey не поддерживается.
+  const std::uint8_t bit = modifier_bit(hotkey.modifier);
+  return (bit & static_cast<std::uint8_t>(~kModMeta)) != 0 &&
+         modifiers_.all_of(bit);
 }
 
-bool EventLoop::is_configured_layout_hotkey_release(ScanCode code,
+bool EventLoop::is_configured_layout_hotkey_release(const HotkeyConfig &hotkey,
+                                                    ScanCode code,
                                                     bool is_release) const {
   if (!is_release || !external_layout_sound_.pending) {
     return false;
   }
 
-  auto cfg = std::atomic_load(&config_);
-  return code == cfg->hotkey.key || code == cfg->hotkey.modifier;
+  return code == hotkey.key || code == hotkey.modifier;
 }
 
-void EventLoop::maybe_complete_external_layout_hotkey(ScanCode code,
-                                                      bool is_release) {
-  if (!is_configured_layout_hotkey_release(code, is_release)) {
+void EventLoop::maybe_complete_external_layout_hotkey(
+    const HotkeyConfig &hotkey, ScanCode code, bool is_release) {
+  if (!is_configured_layout_hotkey_release(hotkey, code, is_release)) {
     return;
   }
 
@@ -1159,14 +1189,33 @@ void EventLoop::sync_current_layout_from_os(std::string_view reason) {
   }
 }
 
+void EventLoop::refresh_main_snapshots() {
+  const std::uint64_t generation =
+      snapshot_generation_.load(std::memory_order_acquire);
+  if (generation == main_snapshot_generation_) {
+    return;
+  }
+  main_snapshot_generation_ = generation;
+  main_config_ = std::atomic_load(&config_);
+  main_injector_ = std::atomic_load(&injector_);
+}
+
 void EventLoop::maybe_handle_injector_failure(std::string_view context) {
-  auto injector = std::atomic_load(&injector_);
-  if (!injector || !injector->has_fatal_io_error()) {
+  refresh_main_snapshots();
+  const auto injector = main_injector_;
+  if (injector) {
+    maybe_handle_injector_failure(*injector, context);
+  }
+}
+
+void EventLoop::maybe_handle_injector_failure(const KeyInjector &injector,
+                                              std::string_view context) {
+  if (!injector.has_fatal_io_error()) {
     return;
   }
 
-  const int err = injector->fatal_io_errno();
-  injector->clear_fatal_io_error();
+  const int err = injector.fatal_io_errno();
+  injector.clear_fatal_io_error();
   exit_code_ = (exit_code_ == 0) ? 1 : exit_code_;
   std::cerr << "[punto] Fatal output I/O error in " << context
             << ": errno=" << err << " (" << std::strerror(err) << ")\n";
@@ -1222,6 +1271,13 @@ void EventLoop::sync_control_plane_from_shared_state(bool force) {
     return;
   }
 
+  // Файл не менялся с последней синхронизации — читать и парсить его незачем.
+  const std::optional<FileStamp> stamp =
+      stat_shared_control_plane_state();
+  if (!force && stamp.has_value() && stamp == shared_control_plane_stamp_) {
+    return;
+  }
+
   SharedControlPlaneState next;
   if (!read_shared_control_plane_state(next)) {
     return;
@@ -1243,6 +1299,7 @@ void EventLoop::sync_control_plane_from_shared_state(bool force) {
   }
 
   shared_control_plane_state_ = next;
+  shared_control_plane_stamp_ = stamp;
 }
 
 void EventLoop::maybe_promote_to_control_plane_primary() {
@@ -1784,6 +1841,15 @@ void EventLoop::action_invert_layout_word() {
     return;
   }
 
+  MacroLockGuard lock_guard(macro_lock_);
+  if (!lock_guard.owns_lock()) {
+    std::cerr << "[punto] Invert-layout-word: не удалось захватить macro lock (skip)\n";
+    return;
+  }
+  // Раскладку синхронизируем до первого её чтения: от неё зависят
+  // target_layout, оба видимых текста и запись для Ctrl+Z.
+  sync_layout_from_os();
+
   const int restore_layout_for_undo = current_layout_;
 
   // Важно: слово инвертируем относительно текущей раскладки.
@@ -1820,13 +1886,6 @@ void EventLoop::action_invert_layout_word() {
   }
 
   // Удаляем слово + trailing и вставляем replacement одной операцией.
-  MacroLockGuard lock_guard(macro_lock_);
-  if (!lock_guard.owns_lock()) {
-    std::cerr << "[punto] Invert-layout-word: не удалось захватить macro lock (skip)\n";
-    return;
-  }
-  sync_layout_from_os();
-
   is_processing_macro_.store(true, std::memory_order_release);
   struct DrainGuard {
     EventLoop *self;
@@ -1908,6 +1967,14 @@ void EventLoop::action_invert_case_word() {
     return;
   }
 
+  MacroLockGuard lock_guard(macro_lock_);
+  if (!lock_guard.owns_lock()) {
+    std::cerr << "[punto] Invert-case-word: не удалось захватить macro lock (skip)\n";
+    return;
+  }
+  // Видимый текст строится по текущей раскладке: синхронизируем её заранее.
+  sync_layout_from_os();
+
   auto visible_opt = key_entries_to_visible_text_checked(word, current_layout_);
   if (!visible_opt.has_value()) {
     std::cerr << "[punto] Invert-case: cannot build visible text (layout="
@@ -1929,13 +1996,6 @@ void EventLoop::action_invert_case_word() {
     }
   }
 
-  MacroLockGuard lock_guard(macro_lock_);
-  if (!lock_guard.owns_lock()) {
-    std::cerr << "[punto] Invert-case-word: не удалось захватить macro lock (skip)\n";
-    return;
-  }
-  sync_layout_from_os();
-
   is_processing_macro_.store(true, std::memory_order_release);
   struct DrainGuard {
     EventLoop *self;
@@ -2001,10 +2061,32 @@ bool EventLoop::process_selection(
     wait_and_buffer(std::chrono::microseconds{20000});
     injector->send_key(KEY_LEFTCTRL, KeyState::Release);
 
-    // Даём приложению время выставить CLIPBOARD.
-    wait_and_buffer(std::chrono::microseconds{200000});
-
-    text = clipboard_->get_text(Selection::Clipboard);
+    // Ждём, пока приложение выставит CLIPBOARD: обычно это занимает единицы
+    // миллисекунд, 200ms — лишь верхняя граница (например, если выделения нет).
+    // Опрос прореживаем, а таймаут каждой конверсии ограничиваем остатком
+    // окна: медленный владелец selection не растянет ожидание за 200ms.
+    // Нижняя граница таймаута — чтобы последняя проверка у самого дедлайна
+    // успевала получить ответ, а не обрывала конверсию почти сразу.
+    constexpr auto kCopyWait = std::chrono::milliseconds{200};
+    constexpr auto kCopyPollInterval = std::chrono::milliseconds{10};
+    constexpr auto kMinCopyPollBudget = std::chrono::milliseconds{20};
+    const auto copy_deadline = std::chrono::steady_clock::now() + kCopyWait;
+    auto next_check = std::chrono::steady_clock::now() + kCopyPollInterval;
+    auto clipboard_changed = [this, &before_clip, &text, &next_check,
+                              copy_deadline, kCopyPollInterval,
+                              kMinCopyPollBudget]() {
+      const auto now = std::chrono::steady_clock::now();
+      if (!clipboard_ || now < next_check) {
+        return false;
+      }
+      next_check = now + kCopyPollInterval;
+      const auto budget = std::max(
+          kMinCopyPollBudget,
+          std::chrono::ceil<std::chrono::milliseconds>(copy_deadline - now));
+      text = clipboard_->get_text(Selection::Clipboard, budget);
+      return text.has_value() && *text != *before_clip;
+    };
+    wait_and_buffer_until(kCopyWait, clipboard_changed);
 
     if (!text.has_value() || text->empty()) {
       return false;
@@ -2054,10 +2136,23 @@ bool EventLoop::process_selection(
     flush_pending_release_frames();
   }
 
+  const std::uint64_t clip_seq =
+      clipboard_->selection_request_seq(Selection::Clipboard);
+  const std::uint64_t primary_seq =
+      clipboard_->selection_request_seq(Selection::Primary);
+
   injector->send_paste(is_terminal);
 
-  // Даем приложению время запросить содержимое clipboard.
-  wait_and_buffer(std::chrono::microseconds{250000});
+  // Даем приложению время запросить содержимое clipboard: как только запрос
+  // пришёл (и обслужен в pump_events), вставка выполнена.
+  auto has_request = [this, clip_seq, primary_seq]() {
+    return clipboard_ &&
+           (clipboard_->selection_request_seq(Selection::Clipboard) !=
+                clip_seq ||
+            clipboard_->selection_request_seq(Selection::Primary) !=
+                primary_seq);
+  };
+  wait_and_buffer_until(std::chrono::microseconds{250000}, has_request);
 
   if (restore_layout.has_value()) {
     (void)set_layout(*restore_layout, /*play_sound=*/false);
@@ -2087,6 +2182,37 @@ void EventLoop::wait_and_buffer_until(
   const auto start = std::chrono::steady_clock::now();
   const auto end = start + us;
 
+  // Переносит необработанные события пакета в pending_events_.
+  auto buffer_stdin_batch = [this]() {
+    constexpr std::size_t kPendingEventsCap = 5000;
+    constexpr std::size_t kOverflowAbortThreshold = 4000;
+
+    while (stdin_batch_pos_ < stdin_batch_len_) {
+      const input_event &ev = stdin_batch_[stdin_batch_pos_++];
+
+      // Проверяем порог аварийного прерывания
+      if (pending_events_.size() >= kOverflowAbortThreshold &&
+          !event_overflow_abort_requested_) {
+        event_overflow_abort_requested_ = true;
+        std::cerr << "[punto] ABORT(wait): event queue near overflow ("
+                  << pending_events_.size() << "/" << kPendingEventsCap
+                  << "), aborting macro\n";
+      }
+
+      if (pending_events_.size() < kPendingEventsCap) {
+        pending_events_.push_back(ev);
+      } else {
+        static bool warned = false;
+        if (!warned) {
+          warned = true;
+          std::cerr
+              << "[punto] Input Guard(wait): pending_events overflow cap="
+              << kPendingEventsCap << " (dropping input events)\n";
+        }
+      }
+    }
+  };
+
   while (true) {
     // Аварийный выход при переполнении очереди событий
     if (event_overflow_abort_requested_) {
@@ -2118,6 +2244,12 @@ void EventLoop::wait_and_buffer_until(
       timeout_ms = 1;
     }
 
+    // Хвост пакета, прочитанного main loop'ом, старше всего, что ещё в stdin.
+    if (stdin_batch_pos_ < stdin_batch_len_) {
+      buffer_stdin_batch();
+      continue;
+    }
+
     // Мы должны регулярно обслуживать X11 события, иначе paste может не
     // получить содержимое selection. Поэтому дробим длинные ожидания.
     constexpr int kMaxPollSliceMs = 5;
@@ -2142,33 +2274,14 @@ void EventLoop::wait_and_buffer_until(
     }
 
     if (ret > 0 && (pfds[0].revents & POLLIN)) {
-      input_event ev;
       while (true) {
-        const ReadEventStatus status = read_input_event(STDIN_FILENO, ev);
+        std::size_t count = 0;
+        const ReadEventStatus status =
+            read_input_events(STDIN_FILENO, stdin_batch_, count);
         if (status == ReadEventStatus::Ok) {
-          constexpr std::size_t kPendingEventsCap = 5000;
-          constexpr std::size_t kOverflowAbortThreshold = 4000;
-
-          // Проверяем порог аварийного прерывания
-          if (pending_events_.size() >= kOverflowAbortThreshold &&
-              !event_overflow_abort_requested_) {
-            event_overflow_abort_requested_ = true;
-            std::cerr << "[punto] ABORT(wait): event queue near overflow ("
-                      << pending_events_.size() << "/" << kPendingEventsCap
-                      << "), aborting macro\n";
-          }
-
-          if (pending_events_.size() < kPendingEventsCap) {
-            pending_events_.push_back(ev);
-          } else {
-            static bool warned = false;
-            if (!warned) {
-              warned = true;
-              std::cerr
-                  << "[punto] Input Guard(wait): pending_events overflow cap="
-                  << kPendingEventsCap << " (dropping input events)\n";
-            }
-          }
+          stdin_batch_pos_ = 0;
+          stdin_batch_len_ = count;
+          buffer_stdin_batch();
         }
         if (status == ReadEventStatus::Eof) {
           request_stop();
@@ -2457,7 +2570,10 @@ void EventLoop::process_ready_results() {
           1, std::memory_order_relaxed);
     }
 
-    ready_results_[r.task_id] = r;
+    // Результат (вместе с correction) переходит во владение очереди
+    // применения; r переиспользуется только как приёмник try_pop_result().
+    const std::uint64_t task_id = r.task_id;
+    ready_results_.insert_or_assign(task_id, std::move(r));
   }
   lifetime_telemetry_.ready_results.store(ready_results_.size(),
                                           std::memory_order_relaxed);
@@ -2488,13 +2604,13 @@ void EventLoop::process_ready_results() {
       if (mit != pending_words_.end()) {
         // Проверяем, не находится ли слово в сессионных исключениях
         // (пользователь ранее отменял коррекцию этого слова)
+        // kScancodeToChar — символы без Shift, т.е. уже lowercase: ключ
+        // исключений получается без отдельной нормализации регистра.
         std::string word_ascii;
+        word_ascii.reserve(mit->second.word.size());
         for (const auto &entry : mit->second.word) {
           if (entry.code < kScancodeToChar.size()) {
-            char c = kScancodeToChar[entry.code];
-            if (c >= 'A' && c <= 'Z') {
-              c = static_cast<char>(c + 32);
-            }
+            const char c = kScancodeToChar[entry.code];
             if (c != '\0') {
               word_ascii += c;
             }
@@ -3254,6 +3370,7 @@ IpcResult EventLoop::reload_config(const std::string &config_path) {
   std::atomic_store(&config_, std::move(cfg_const));
   std::atomic_store(&analyzer_, std::move(analyzer_const));
   std::atomic_store(&injector_, std::move(injector_const));
+  snapshot_generation_.fetch_add(1, std::memory_order_release);
 
   if (sound_manager_) {
     sound_manager_->set_enabled(new_cfg->sound.enabled);
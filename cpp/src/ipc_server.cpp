@@ -164,7 +164,7 @@ bool IpcServer::is_running() const noexcept {
 
 int IpcServer::create_socket() {
   auto is_socket_active = [](const char* socket_path) {
-    int fd = socket(AF_UNIX, SOCK_STREAM, 0);
+    int fd = socket(AF_UNIX, SOCK_STREAM | SOCK_CLOEXEC, 0);
     if (fd < 0) {
       // Консервативно: если не можем проверить — считаем сокет "живым",
       // чтобы не удалить чужой/рабочий путь.
@@ -195,7 +195,7 @@ int IpcServer::create_socket() {
       (void)unlink(socket_path.c_str());
     }
 
-    int fd = socket(AF_UNIX, SOCK_STREAM, 0);
+    int fd = socket(AF_UNIX, SOCK_STREAM | SOCK_CLOEXEC, 0);
     if (fd < 0) {
       if (out_errno) {
         *out_errno = errno;
@@ -311,7 +311,8 @@ void IpcServer::server_loop() {
       sockaddr_un client_addr{};
       socklen_t client_len = sizeof(client_addr);
       
-      int client_fd = accept(server_fd_, reinterpret_cast<sockaddr*>(&client_addr), &client_len);
+      int client_fd = accept4(server_fd_, reinterpret_cast<sockaddr*>(&client_addr),
+                              &client_len, SOCK_CLOEXEC);
       if (client_fd < 0) {
         if (errno != EAGAIN && errno != EWOULDBLOCK && running_.load()) {
           std::cerr << "[punto-ipc] Accept error: " << strerror(errno) << "\n";
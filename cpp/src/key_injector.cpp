@@ -72,6 +72,34 @@ void KeyInjector::send_key(ScanCode code, KeyState state) const {
   emit_events(std::span<const input_event>{evs, 2});
 }
 
+void KeyInjector::send_keys(std::span<const ScanCode> codes,
+                            KeyState state) const {
+  // Все EV_KEY одним отчётом: один SYN_REPORT и один write() на пачку.
+  constexpr std::size_t kMaxBatch = 8;
+  if (codes.empty() || codes.size() > kMaxBatch) {
+    for (const auto code : codes) {
+      send_key(code, state);
+    }
+    return;
+  }
+
+  input_event evs[kMaxBatch + 1]{};
+  std::size_t n = 0;
+  for (const auto code : codes) {
+    evs[n].type = EV_KEY;
+    evs[n].code = code;
+    evs[n].value = static_cast<std::int32_t>(state);
+    ++n;
+  }
+
+  evs[n].type = EV_SYN;
+  evs[n].code = SYN_REPORT;
+  evs[n].value = 0;
+  ++n;
+
+  emit_events(std::span<const input_event>{evs, n});
+}
+
 void KeyInjector::tap_key(ScanCode code, bool with_shift, bool turbo) const {
   auto retype_delay = turbo ? kTurboRetype : kRetype;
 
@@ -146,8 +174,8 @@ void KeyInjector::send_paste(bool is_terminal) const {
   if (is_terminal) {
     // Терминалы (включая некоторые встроенные/кастомные) часто используют
     // Ctrl+Shift+V для paste.
-    send_key(KEY_LEFTCTRL, KeyState::Press);
-    send_key(KEY_LEFTSHIFT, KeyState::Press);
+    static constexpr ScanCode kCtrlShift[] = {KEY_LEFTCTRL, KEY_LEFTSHIFT};
+    send_keys(kCtrlShift, KeyState::Press);
     delay(kKeyPress);
 
     send_key(KEY_V, KeyState::Press);
@@ -155,8 +183,8 @@ void KeyInjector::send_paste(bool is_terminal) const {
     send_key(KEY_V, KeyState::Release);
 
     delay(kKeyPress);
-    send_key(KEY_LEFTSHIFT, KeyState::Release);
-    send_key(KEY_LEFTCTRL, KeyState::Release);
+    static constexpr ScanCode kShiftCtrl[] = {KEY_LEFTSHIFT, KEY_LEFTCTRL};
+    send_keys(kShiftCtrl, KeyState::Release);
     delay(kKeyPress);
     return;
   }
@@ -178,14 +206,12 @@ void KeyInjector::send_paste(bool is_terminal) const {
 
 void KeyInjector::release_all_modifiers() const {
   // Отпускаем все модификаторы для предотвращения interference
-  send_key(KEY_LEFTSHIFT, KeyState::Release);
-  send_key(KEY_RIGHTSHIFT, KeyState::Release);
-  send_key(KEY_LEFTCTRL, KeyState::Release);
-  send_key(KEY_RIGHTCTRL, KeyState::Release);
-  send_key(KEY_LEFTALT, KeyState::Release);
-  send_key(KEY_RIGHTALT, KeyState::Release);
-  send_key(KEY_LEFTMETA, KeyState::Release);
-  send_key(KEY_RIGHTMETA, KeyState::Release);
+  // (одним отчётом: 8 EV_KEY + SYN, один write вместо восьми)
+  static constexpr ScanCode kModifiers[] = {
+      KEY_LEFTSHIFT, KEY_RIGHTSHIFT, KEY_LEFTCTRL, KEY_RIGHTCTRL,
+      KEY_LEFTALT,   KEY_RIGHTALT,   KEY_LEFTMETA, KEY_RIGHTMETA,
+  };
+  send_keys(kModifiers, KeyState::Release);
   delay(kKeyPress);
 }
 
@@ -31,11 +31,16 @@ bool LayoutAnalyzer::should_switch(std::span<const KeyEntry> word) const {
     return false;
   }
 
-  auto result = analyze(word);
-  return result.should_switch;
+  // Счётчики невалидных биграмм для решения не нужны — их не считаем
+  return analyze_impl(word, false).should_switch;
 }
 
 AnalysisResult LayoutAnalyzer::analyze(std::span<const KeyEntry> word) const {
+  return analyze_impl(word, true);
+}
+
+AnalysisResult LayoutAnalyzer::analyze_impl(std::span<const KeyEntry> word,
+                                            bool count_invalid) const {
   AnalysisResult result;
 
   // Минимум 2 символа для биграммного анализа (1 биграмма)
@@ -43,11 +48,19 @@ AnalysisResult LayoutAnalyzer::analyze(std::span<const KeyEntry> word) const {
     return result;
   }
 
-  result.en_score = calculate_score(word, Language::English);
-  result.ru_score = calculate_score(word, Language::Russian);
+  // Конвертируем слово в ASCII один раз: оба скора и подсчёт невалидных
+  // биграмм работают по одному и тому же буферу.
+  char buffer[kMaxWordLen];
+  const std::size_t len = word_to_ascii(word, buffer);
+
+  result.en_score = score_ascii(buffer, len, Language::English);
+  result.ru_score = score_ascii(buffer, len, Language::Russian);
 
   // Подсчитываем невалидные биграммы
-  count_invalid_bigrams(word, result.en_invalid_count, result.ru_invalid_count);
+  if (count_invalid) {
+    count_invalid_ascii(buffer, len, result.en_invalid_count,
+                        result.ru_invalid_count);
+  }
 
   // Определяем вероятный язык
   if (result.ru_score > result.en_score) {
@@ -90,73 +103,60 @@ double LayoutAnalyzer::calculate_score(std::span<const KeyEntry> word,
     return 0.0;
   }
 
-  // Prefetch N-gram tables to L1 cache for faster lookups
-  asm_utils::prefetch_read(kEnBigrams.data());
-  asm_utils::prefetch_read(kRuBigrams.data());
-  asm_utils::prefetch_read(kEnTrigrams.data());
-  asm_utils::prefetch_read(kRuTrigrams.data());
-
   // Конвертируем слово в ASCII
   char buffer[kMaxWordLen];
-  std::size_t len = word_to_ascii(word, buffer);
+  const std::size_t len = word_to_ascii(word, buffer);
 
+  return score_ascii(buffer, len, lang);
+}
+
+double LayoutAnalyzer::score_ascii(const char *buffer, std::size_t len,
+                                   Language lang) {
   if (len < 2) {
     return 0.0;
   }
 
+  // Prefetch N-gram tables to L1 cache for faster lookups
+  asm_utils::prefetch_read(kEnBigramTable.data());
+  asm_utils::prefetch_read(kRuBigramTable.data());
+  asm_utils::prefetch_read(kEnTrigramTable.entries.data());
+  asm_utils::prefetch_read(kRuTrigramTable.entries.data());
+
+  // Выбор языка — один раз до циклов, а не на каждой N-грамме
+  const bool is_en = (lang == Language::English);
+  const auto &bigrams = is_en ? kEnBigramTable : kRuBigramTable;
+  const auto &trigrams = is_en ? kEnTrigramTable : kRuTrigramTable;
+  const auto is_invalid_bigram = is_en ? is_invalid_en_bigram
+                                       : is_invalid_ru_bigram;
+
   double score = 0.0;
   std::size_t valid_ngrams = 0;
 
   // Проходим по всем биграммам
   for (std::size_t i = 0; i + 1 < len; ++i) {
-    char first = buffer[i];
-    char second = buffer[i + 1];
-
-    std::uint8_t weight = 0;
+    const char first = buffer[i];
+    const char second = buffer[i + 1];
 
-    if (lang == Language::English) {
-      weight = lookup_en_bigram(first, second);
+    const std::uint8_t weight = lookup_bigram_table(bigrams, first, second);
 
-      // Проверяем "невозможные" биграммы
-      if (weight == 0 && is_invalid_en_bigram(first, second)) {
-        score -= 15.0; // Штраф за невозможную биграмму
-      }
-    } else {
-      weight = lookup_ru_bigram(first, second);
-
-      // Проверяем "невозможные" биграммы
-      if (weight == 0 && is_invalid_ru_bigram(first, second)) {
-        score -= 15.0;
-      }
+    // Штраф за "невозможную" биграмму (только если её нет в таблице)
+    if (weight == 0 && is_invalid_bigram(first, second)) {
+      score -= 15.0;
     }
 
-    if (weight > 0) {
-      score += static_cast<double>(weight);
-      ++valid_ngrams;
-    }
+    // Без ветвления: нулевой вес ничего не добавляет к скору
+    score += static_cast<double>(weight);
+    valid_ngrams += static_cast<std::size_t>(weight != 0);
   }
 
   // Проходим по всем триграммам (для слов от 3 символов)
-  if (len >= 3) {
-    for (std::size_t i = 0; i + 2 < len; ++i) {
-      char first = buffer[i];
-      char second = buffer[i + 1];
-      char third = buffer[i + 2];
-
-      std::uint8_t weight = 0;
-
-      if (lang == Language::English) {
-        weight = lookup_en_trigram(first, second, third);
-      } else {
-        weight = lookup_ru_trigram(first, second, third);
-      }
-
-      if (weight > 0) {
-        // Триграммы имеют бóльший вес — они более надёжны
-        score += static_cast<double>(weight) * 1.5;
-        ++valid_ngrams;
-      }
-    }
+  for (std::size_t i = 0; i + 2 < len; ++i) {
+    const std::uint8_t weight =
+        lookup_trigram_table(trigrams, buffer[i], buffer[i + 1], buffer[i + 2]);
+
+    // Триграммы имеют бóльший вес — они более надёжны
+    score += static_cast<double>(weight) * 1.5;
+    valid_ngrams += static_cast<std::size_t>(weight != 0);
   }
 
   // Нормализуем по количеству N-грамм
@@ -187,6 +187,15 @@ char LayoutAnalyzer::scancode_to_lowercase(ScanCode code) {
   return c;
 }
 
+bool LayoutAnalyzer::needs_analysis(std::span<const KeyEntry> word,
+                                    std::size_t min_word_len,
+                                    bool auto_switch_enabled) {
+  // Слова с цифрами/спецсимволами воркер всё равно отклонил бы первым же
+  // шагом — не гоняем их через очередь и пул потоков.
+  return auto_switch_enabled && !word.empty() && word.size() >= min_word_len &&
+         !has_invalid_chars(word);
+}
+
 bool LayoutAnalyzer::has_invalid_chars(std::span<const KeyEntry> word) {
   for (const auto &entry : word) {
     char c = scancode_to_lowercase(entry.code);
@@ -240,11 +249,16 @@ void LayoutAnalyzer::count_invalid_bigrams(std::span<const KeyEntry> word,
   }
 
   char buffer[kMaxWordLen];
-  std::size_t len = word_to_ascii(word, buffer);
+  const std::size_t len = word_to_ascii(word, buffer);
 
-  if (len < 2) {
-    return;
-  }
+  count_invalid_ascii(buffer, len, en_invalid, ru_invalid);
+}
+
+void LayoutAnalyzer::count_invalid_ascii(const char *buffer, std::size_t len,
+                                         std::size_t &en_invalid,
+                                         std::size_t &ru_invalid) {
+  en_invalid = 0;
+  ru_invalid = 0;
 
   for (std::size_t i = 0; i + 1 < len; ++i) {
     char first = buffer[i];
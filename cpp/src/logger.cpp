@@ -12,6 +12,7 @@
 #include <memory>
 #include <streambuf>
 #include <string>
+#include <string_view>
 #include <syslog.h>
 
 namespace punto {
@@ -78,12 +79,18 @@ std::string g_ident = "punto";
 
 class SyslogStreamBuf final : public std::streambuf {
 public:
-  explicit SyslogStreamBuf(std::streambuf *fallback) : fallback_{fallback} {}
+  explicit SyslogStreamBuf(std::streambuf *fallback)
+      : fallback_{fallback}, echo_to_stderr_{should_echo_to_stderr()} {
+    // Своя область вывода: operator<< копирует текст блоками, а не вызывает
+    // overflow() на каждый символ.
+    setp(put_area_, put_area_ + sizeof(put_area_));
+  }
 
   ~SyslogStreamBuf() override { sync(); }
 
 protected:
   int overflow(int ch) override {
+    take_put_area();
     if (ch == traits_type::eof()) {
       return sync() == 0 ? 0 : traits_type::eof();
     }
@@ -96,47 +103,63 @@ protected:
   }
 
   int sync() override {
+    take_put_area();
     flush_buffer();
     return 0;
   }
 
 private:
+  /// Переносит накопленное в put area в buffer_ и освобождает её
+  void take_put_area() {
+    if (pptr() != pbase()) {
+      buffer_.append(pbase(), static_cast<std::size_t>(pptr() - pbase()));
+      setp(put_area_, put_area_ + sizeof(put_area_));
+    }
+  }
+
   void flush_buffer() {
-    while (!buffer_.empty()) {
-      const std::size_t newline = buffer_.find('\n');
+    // Все полные строки разбираем по смещению и стираем из буфера один раз.
+    std::size_t start = 0;
+    while (start < buffer_.size()) {
+      const std::size_t newline = buffer_.find('\n', start);
       if (newline == std::string::npos) {
         break;
       }
 
-      std::string line = buffer_.substr(0, newline);
-      buffer_.erase(0, newline + 1);
-      emit_line(line);
+      emit_line(std::string_view{buffer_}.substr(start, newline - start + 1));
+      start = newline + 1;
     }
+    buffer_.erase(0, start);
   }
 
-  void emit_line(const std::string &line) const {
-    if (line.empty()) {
+  /// @param line Строка вместе с завершающим '\n'
+  void emit_line(std::string_view line) const {
+    const std::string_view text = line.substr(0, line.size() - 1);
+    if (text.empty()) {
       return;
     }
 
-    const LogLevel level = infer_log_level(line);
+    const LogLevel level = infer_log_level(text);
     if (static_cast<int>(level) > static_cast<int>(g_min_log_level)) {
       return;
     }
 
-    syslog(to_syslog_priority(level), "%s", line.c_str());
-    if (fallback_ != nullptr && should_echo_to_stderr()) {
+    syslog(to_syslog_priority(level), "%.*s", static_cast<int>(text.size()),
+           text.data());
+    if (fallback_ != nullptr && echo_to_stderr_) {
+      // Строку и перевод строки отдаём одним write() в небуферизованный stderr.
       fallback_->sputn(line.data(), static_cast<std::streamsize>(line.size()));
-      fallback_->sputc('\n');
     }
   }
 
-  [[nodiscard]] bool should_echo_to_stderr() const {
+  [[nodiscard]] static bool should_echo_to_stderr() {
     const char *env = std::getenv("PUNTO_LOG_STDERR");
     return env != nullptr && std::string_view{env} == "1";
   }
 
   std::streambuf *fallback_ = nullptr;
+  bool echo_to_stderr_ = false;
+  char put_area_[512];
   std::string buffer_;
 };
 
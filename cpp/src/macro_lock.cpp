@@ -58,7 +58,9 @@ bool MacroLock::ensure_fd() {
 
   // O_CREAT | O_RDWR: создаём файл если не существует.
   // Файл НЕ удаляется — stale lock файлы безопасны для flock().
-  fd_ = ::open(kLockPath, O_CREAT | O_RDWR, 0660);
+  // O_CLOEXEC: дочерние процессы (paplay/aplay, popen) не должны наследовать
+  // fd и вместе с ним удерживать flock() после exec.
+  fd_ = ::open(kLockPath, O_CREAT | O_RDWR | O_CLOEXEC, 0660);
   if (fd_ < 0) {
     const int err = errno;
     std::cerr << "[punto] MacroLock: failed to open " << kLockPath << ": "
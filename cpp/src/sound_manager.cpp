@@ -10,14 +10,27 @@
 
 #include <fcntl.h>
 #include <grp.h>
+#include <signal.h>
+#include <spawn.h>
 #include <sys/wait.h>
 #include <unistd.h>
 
+#include <algorithm>
 #include <array>
 #include <cerrno>
+#include <climits>
 #include <cstring>
 #include <iostream>
 
+// close_range() и posix_spawn_file_actions_addclosefrom_np() появились в
+// glibc 2.34. __GLIBC_PREREQ вне glibc (musl) не определён, поэтому проверка
+// вложенная.
+#if defined(__GLIBC__)
+#if __GLIBC_PREREQ(2, 34)
+#define PUNTO_HAVE_CLOSE_RANGE 1
+#endif
+#endif
+
 namespace punto {
 
 namespace {
@@ -30,6 +43,15 @@ inline constexpr const char *kSoundRuToEn =
 inline constexpr const char *kPaplayPath = "/usr/bin/paplay";
 inline constexpr const char *kAplayPath = "/usr/bin/aplay";
 
+// Без posix_spawn_file_actions_addclosefrom_np() posix_spawn() оставил бы
+// плееру все наши fd без O_CLOEXEC, поэтому тогда всегда запускаем через
+// fork_player() (он закрывает fd в дочернем процессе).
+#ifdef PUNTO_HAVE_CLOSE_RANGE
+inline constexpr bool kSpawnClosesInheritedFds = true;
+#else
+inline constexpr bool kSpawnClosesInheritedFds = false;
+#endif
+
 [[nodiscard]] bool is_executable(const char *path) {
   return ::access(path, X_OK) == 0;
 }
@@ -125,14 +147,82 @@ SoundManager::SoundManager(const X11Session &x11_session, const SoundConfig &con
     envp_.push_back(e.data());
   }
   envp_.push_back(nullptr);
+
+  // posix_spawn() (vfork+exec, без копирования таблиц страниц) не умеет
+  // менять uid/gid/groups. Он применим, только если демон уже работает
+  // от имени пользователя сессии.
+  needs_credential_switch_ =
+      user_uid_ != ::geteuid() || user_gid_ != ::getegid();
+
+  worker_ = std::jthread([this](std::stop_token st) { worker_loop(st); });
 }
 
 SoundManager::~SoundManager() {
+  if (worker_.joinable()) {
+    worker_.request_stop();
+    queue_.notify_all();
+    {
+      // Не ждём окончания звука: прерываем текущий плеер.
+      std::lock_guard<std::mutex> lock(child_mu_);
+      if (child_pid_ > 0) {
+        (void)::kill(child_pid_, SIGTERM);
+      }
+    }
+    worker_.join();
+  }
   if (devnull_fd_ >= 0) {
     ::close(devnull_fd_);
   }
 }
 
+void SoundManager::worker_loop(std::stop_token st) {
+  while (!st.stop_requested()) {
+    auto request = queue_.pop_wait(st);
+    if (!request.has_value()) {
+      continue;
+    }
+
+    // Готовим argv до fork (в дочернем процессе никаких аллокаций/iostream).
+    std::array<char *, 3> argv{
+        player_path_.data(),
+        const_cast<char *>(request->wav_path),
+        nullptr,
+    };
+
+    pid_t pid = -1;
+    {
+      std::lock_guard<std::mutex> lock(child_mu_);
+      if (st.stop_requested()) {
+        break;
+      }
+      // Пока звук ждал, запросили новый: он уже в очереди.
+      if (request->seq != latest_seq_) {
+        continue;
+      }
+      pid = (needs_credential_switch_ || !kSpawnClosesInheritedFds)
+                ? fork_player(argv.data())
+                : spawn_player(argv.data());
+      child_pid_ = pid;
+    }
+
+    if (pid <= 0) {
+      continue;
+    }
+
+    // Ждём только свой pid: waitpid(-1) отобрал бы статус у pclose() в X11Session.
+    int status = 0;
+    while (::waitpid(pid, &status, 0) < 0) {
+      if (errno == EINTR) {
+        continue;
+      }
+      break;
+    }
+
+    std::lock_guard<std::mutex> lock(child_mu_);
+    child_pid_ = -1;
+  }
+}
+
 void SoundManager::set_enabled(bool enabled) noexcept {
   enabled_.store(enabled, std::memory_order_relaxed);
 }
@@ -166,36 +256,82 @@ void SoundManager::play_file(const char *wav_path) {
     return;
   }
 
-  // Готовим argv в родителе (в дочернем процессе никаких аллокаций/iostream).
-  std::array<char *, 3> argv{
-      player_path_.data(),
-      const_cast<char *>(wav_path),
-      nullptr,
-  };
+  // Сам запуск и waitpid() — в фоновом потоке, main loop не ждёт fork().
+  // Звук должен соответствовать последнему переключению: ещё играющий
+  // прерываем, ожидающий заменяем.
+  std::lock_guard<std::mutex> lock(child_mu_);
+  ++latest_seq_;
+  if (child_pid_ > 0) {
+    (void)::kill(child_pid_, SIGTERM);
+  }
+  queue_.replace(SoundRequest{wav_path, latest_seq_});
+}
+
+pid_t SoundManager::spawn_player(char *const argv[]) {
+  posix_spawn_file_actions_t actions;
+  if (::posix_spawn_file_actions_init(&actions) != 0) {
+    return -1;
+  }
+
+  if (devnull_fd_ >= 0) {
+    (void)::posix_spawn_file_actions_adddup2(&actions, devnull_fd_, STDIN_FILENO);
+    (void)::posix_spawn_file_actions_adddup2(&actions, devnull_fd_, STDOUT_FILENO);
+    (void)::posix_spawn_file_actions_adddup2(&actions, devnull_fd_, STDERR_FILENO);
+  }
+#ifdef PUNTO_HAVE_CLOSE_RANGE
+  // Аналог close_range(3, ~0U) из fork-пути (без него spawn_player не
+  // вызывается, см. kSpawnClosesInheritedFds).
+  (void)::posix_spawn_file_actions_addclosefrom_np(&actions, 3);
+#endif
+
+  pid_t pid = -1;
+  const int err = ::posix_spawn(&pid, player_path_.c_str(), &actions, nullptr,
+                                argv, envp_.data());
+  (void)::posix_spawn_file_actions_destroy(&actions);
+
+  if (err != 0) {
+    std::cerr << "[punto] Sound: posix_spawn() failed: " << std::strerror(err)
+              << "\n";
+    return -1;
+  }
+  return pid;
+}
+
+pid_t SoundManager::fork_player(char *const argv[]) {
+  // Верхняя граница для закрытия fd без close_range (sysconf — до fork).
+  const long open_max = ::sysconf(_SC_OPEN_MAX);
+  const int max_fd =
+      open_max > 0 ? static_cast<int>(std::min<long>(open_max, INT_MAX))
+                   : 1024;
 
   pid_t pid = ::fork();
   if (pid < 0) {
     std::cerr << "[punto] Sound: fork() failed: " << std::strerror(errno) << "\n";
-    return;
+    return -1;
   }
 
   if (pid == 0) {
-    // Промежуточный процесс
-    pid_t pid2 = ::fork();
-    if (pid2 < 0) {
-      _exit(1);
-    }
-    if (pid2 > 0) {
-      _exit(0);
-    }
-
-    // Финальный процесс: сбрасываем stdio в /dev/null
+    // Дочерний процесс: сбрасываем stdio в /dev/null
     if (devnull_fd_ >= 0) {
       (void)::dup2(devnull_fd_, STDIN_FILENO);
       (void)::dup2(devnull_fd_, STDOUT_FILENO);
       (void)::dup2(devnull_fd_, STDERR_FILENO);
     }
 
+    // Плееру нужны только stdio: всё остальное (uinput/IPC сокеты, X11,
+    // flock макросов) закрываем, чтобы child не удерживал наши ресурсы.
+#ifdef PUNTO_HAVE_CLOSE_RANGE
+    const bool closed = ::close_range(3, ~0U, 0) == 0;
+#else
+    const bool closed = false;
+#endif
+    if (!closed) {
+      // close_range() недоступен (старая glibc, musl или ядро < 5.9).
+      for (int fd = 3; fd < max_fd; ++fd) {
+        (void)::close(fd);
+      }
+    }
+
     // Сбрасываем группы/UID/GID (важно делать до exec).
     if (!user_groups_.empty()) {
       (void)::setgroups(user_groups_.size(), user_groups_.data());
@@ -208,18 +344,11 @@ void SoundManager::play_file(const char *wav_path) {
       _exit(1);
     }
 
-    ::execve(player_path_.c_str(), argv.data(), envp_.data());
+    ::execve(player_path_.c_str(), argv, envp_.data());
     _exit(127);
   }
 
-  // Родитель: ждём ТОЛЬКО промежуточный процесс, чтобы не оставлять зомби.
-  int status = 0;
-  while (::waitpid(pid, &status, 0) < 0) {
-    if (errno == EINTR) {
-      continue;
-    }
-    break;
-  }
+  return pid;
 }
 
 } // namespace punto
@@ -7,7 +7,8 @@
 
 #include <algorithm>
 #include <array>
-#include <cctype>
+#include <cstddef>
+#include <cstdint>
 
 namespace punto {
 
@@ -64,9 +65,16 @@ constexpr std::array kTerminalTokens = {
     "terminal",
 };
 
+/// Максимальная длина WM_CLASS (обе строки), которую нормализуем на стеке.
+constexpr std::size_t kMaxWmClassLen = 256;
+
+[[nodiscard]] constexpr char ascii_lower(char c) noexcept {
+  return (c >= 'A' && c <= 'Z') ? static_cast<char>(c - 'A' + 'a') : c;
+}
+
 /// Проверяет, содержит ли строка подстроку (case insensitive)
-[[nodiscard]] bool contains_ci(std::string_view haystack,
-                              std::string_view needle) noexcept {
+[[nodiscard]] constexpr bool contains_ci(std::string_view haystack,
+                                        std::string_view needle) noexcept {
   if (needle.empty()) {
     return true;
   }
@@ -76,14 +84,127 @@ constexpr std::array kTerminalTokens = {
 
   auto it = std::search(
       haystack.begin(), haystack.end(), needle.begin(), needle.end(),
-      [](char a, char b) {
-        return std::tolower(static_cast<unsigned char>(a)) ==
-               std::tolower(static_cast<unsigned char>(b));
-      });
+      [](char a, char b) { return ascii_lower(a) == ascii_lower(b); });
 
   return it != haystack.end();
 }
 
+/// Токен избыточен, если содержит другой токен: тот совпадёт всегда, когда
+/// совпадает этот (из одинаковых оставляем первый).
+[[nodiscard]] constexpr bool is_redundant_token(std::size_t i) noexcept {
+  const std::string_view token = kTerminalTokens[i];
+  for (std::size_t j = 0; j < kTerminalTokens.size(); ++j) {
+    const std::string_view other = kTerminalTokens[j];
+    if (j == i || other.size() > token.size() || !contains_ci(token, other)) {
+      continue;
+    }
+    if (other.size() < token.size() || j < i) {
+      return true;
+    }
+  }
+  return false;
+}
+
+inline constexpr std::size_t kIndexedTokenCount = [] {
+  std::size_t count = 0;
+  for (std::size_t i = 0; i < kTerminalTokens.size(); ++i) {
+    count += is_redundant_token(i) ? 0U : 1U;
+  }
+  return count;
+}();
+
+inline constexpr std::size_t kIndexedTokenChars = [] {
+  std::size_t total = 0;
+  for (std::size_t i = 0; i < kTerminalTokens.size(); ++i) {
+    total += is_redundant_token(i) ? 0 : std::string_view{kTerminalTokens[i]}.size();
+  }
+  return total;
+}();
+
+/// Токен индекса: срез пула символов TerminalTokenIndex::chars.
+struct TokenRef {
+  std::uint16_t offset = 0;
+  std::uint16_t size = 0;
+};
+
+/// Неизбыточные токены в нижнем регистре, сгруппированные по первому символу:
+/// токены на символ c лежат в [first[c], first[c + 1]).
+struct TerminalTokenIndex {
+  std::array<char, kIndexedTokenChars> chars{};
+  std::array<TokenRef, kIndexedTokenCount> tokens{};
+  std::array<std::uint8_t, 129> first{};
+};
+
+inline constexpr auto kTerminalTokenIndex = [] {
+  std::array<std::size_t, kIndexedTokenCount> order{};
+  std::size_t n = 0;
+  for (std::size_t i = 0; i < kTerminalTokens.size(); ++i) {
+    if (!is_redundant_token(i)) {
+      order[n++] = i;
+    }
+  }
+
+  auto first_char = [](std::size_t i) {
+    return static_cast<unsigned char>(ascii_lower(kTerminalTokens[i][0]));
+  };
+  // Стабильная сортировка вставками по первому символу.
+  for (std::size_t i = 1; i < order.size(); ++i) {
+    const std::size_t cur = order[i];
+    std::size_t j = i;
+    while (j > 0 && first_char(order[j - 1]) > first_char(cur)) {
+      order[j] = order[j - 1];
+      --j;
+    }
+    order[j] = cur;
+  }
+
+  TerminalTokenIndex index{};
+  std::size_t offset = 0;
+  for (std::size_t k = 0; k < order.size(); ++k) {
+    const std::string_view token = kTerminalTokens[order[k]];
+    index.tokens[k] = TokenRef{static_cast<std::uint16_t>(offset),
+                               static_cast<std::uint16_t>(token.size())};
+    for (char c : token) {
+      index.chars[offset++] = ascii_lower(c);
+    }
+  }
+
+  std::size_t k = 0;
+  for (std::size_t c = 0; c < 128; ++c) {
+    index.first[c] = static_cast<std::uint8_t>(k);
+    while (k < order.size() && first_char(order[k]) == c) {
+      ++k;
+    }
+  }
+  index.first[128] = static_cast<std::uint8_t>(k);
+  return index;
+}();
+
+static_assert(kIndexedTokenCount < 256, "token index must fit uint8_t buckets");
+static_assert(kTerminalTokenIndex.first[128] == kIndexedTokenCount,
+              "all tokens must be ASCII");
+
+/// Один проход по haystack (уже в нижнем регистре): в каждой позиции
+/// проверяются только токены, начинающиеся с этого символа.
+[[nodiscard]] bool contains_terminal_token(std::string_view haystack) noexcept {
+  const auto &index = kTerminalTokenIndex;
+  for (std::size_t i = 0; i < haystack.size(); ++i) {
+    const auto c = static_cast<unsigned char>(haystack[i]);
+    if (c >= 128) {
+      continue;
+    }
+    const std::string_view rest = haystack.substr(i);
+    for (std::size_t k = index.first[c]; k < index.first[c + 1]; ++k) {
+      const TokenRef ref = index.tokens[k];
+      if (rest.starts_with(
+              std::string_view{index.chars.data() + ref.offset, ref.size})) {
+        return true;
+      }
+    }
+  }
+  return false;
+}
+
 } // namespace
 
 bool is_terminal_wm_class(std::string_view res_name,
@@ -92,13 +213,26 @@ bool is_terminal_wm_class(std::string_view res_name,
     return false;
   }
 
-  for (const auto &token : kTerminalTokens) {
-    if (contains_ci(res_class, token) || contains_ci(res_name, token)) {
-      return true;
+  const std::size_t total = res_name.size() + 1 + res_class.size();
+  if (total > kMaxWmClassLen) {
+    for (const auto &token : kTerminalTokens) {
+      if (contains_ci(res_class, token) || contains_ci(res_name, token)) {
+        return true;
+      }
     }
+    return false;
   }
 
-  return false;
+  // Обе строки приводим к нижнему регистру один раз и склеиваем через '\n'
+  // (в токенах его нет, так что ложных совпадений на стыке не будет), после
+  // чего все токены ищутся за один проход.
+  std::array<char, kMaxWmClassLen> buf{};
+  auto out = std::transform(res_name.begin(), res_name.end(), buf.begin(),
+                            ascii_lower);
+  *out++ = '\n';
+  std::transform(res_class.begin(), res_class.end(), out, ascii_lower);
+
+  return contains_terminal_token(std::string_view(buf.data(), total));
 }
 
 } // namespace punto
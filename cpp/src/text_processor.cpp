@@ -9,140 +9,201 @@
 #include "punto/scancode_map.hpp"
 
 #include <algorithm>
+#include <array>
 #include <cctype>
-#include <unordered_map>
-#include <unordered_set>
-#include <vector>
+#include <cstdint>
 
 namespace punto {
 
 namespace {
 
-/// Lazy-initialized lookup table для EN->RU (lower)
-const std::unordered_map<char, std::string_view> &get_en_to_ru_lower() {
-  static const auto map = [] {
-    std::unordered_map<char, std::string_view> m;
-    for (const auto &entry : kEnToRuLower) {
-      m[entry.from] = entry.to;
-    }
-    return m;
-  }();
-  return map;
-}
-
-/// Lazy-initialized lookup table для EN->RU (upper)
-const std::unordered_map<char, std::string_view> &get_en_to_ru_upper() {
-  static const auto map = [] {
-    std::unordered_map<char, std::string_view> m;
-    for (const auto &entry : kEnToRuUpper) {
-      m[entry.from] = entry.to;
-    }
-    return m;
-  }();
-  return map;
-}
-
-/// Lazy-initialized lookup table для RU->EN (lower)
-const std::unordered_map<std::string_view, char> &get_ru_to_en_lower() {
-  static const auto map = [] {
-    std::unordered_map<std::string_view, char> m;
-    for (const auto &entry : kRuToEnLower) {
-      m[entry.from] = entry.to;
-    }
-    return m;
-  }();
-  return map;
-}
-
-/// Lazy-initialized lookup table для RU->EN (upper)
-const std::unordered_map<std::string_view, char> &get_ru_to_en_upper() {
-  static const auto map = [] {
-    std::unordered_map<std::string_view, char> m;
-    for (const auto &entry : kRuToEnUpper) {
-      m[entry.from] = entry.to;
-    }
-    return m;
-  }();
-  return map;
-}
-
-/// Lazy-initialized lookup table для CYR->LAT multi
-const std::unordered_map<std::string_view, std::string_view> &
-get_cyr_to_lat_multi() {
-  static const auto map = [] {
-    std::unordered_map<std::string_view, std::string_view> m;
-    for (const auto &entry : kCyrToLatMulti) {
-      m[entry.from] = entry.to;
+/// EN->RU: одна плоская таблица по ASCII-коду (lower + upper).
+/// Пустой string_view = символ не переводится.
+inline constexpr auto kEnToRuTable = [] {
+  std::array<std::string_view, 128> table{};
+  for (const auto &entry : kEnToRuUpper) {
+    table[static_cast<unsigned char>(entry.from)] = entry.to;
+  }
+  // Lower имеет приоритет (так же проверялся первым).
+  for (const auto &entry : kEnToRuLower) {
+    table[static_cast<unsigned char>(entry.from)] = entry.to;
+  }
+  return table;
+}();
+
+/// RU->EN: плоские таблицы для ASCII, кириллицы и единственного 3-байтового "№".
+struct RuToEnTable {
+  std::array<char, 128> ascii{};
+  std::array<char, 128> cyr{};
+  char numero = '\0';
+};
+
+inline constexpr std::string_view kNumeroSign = "№";
+
+inline constexpr auto kRuToEnTable = [] {
+  RuToEnTable table{};
+  auto add = [&table](const Utf8Mapping &entry) {
+    if (entry.from.size() == 1) {
+      table.ascii[static_cast<unsigned char>(entry.from[0])] = entry.to;
+    } else if (const int idx = cyrillic_index(entry.from); idx >= 0 && idx < 128) {
+      table.cyr[static_cast<std::size_t>(idx)] = entry.to;
+    } else if (entry.from == kNumeroSign) {
+      table.numero = entry.to;
     }
-    return m;
-  }();
-  return map;
+  };
+  for (const auto &entry : kRuToEnUpper) {
+    add(entry);
+  }
+  for (const auto &entry : kRuToEnLower) {
+    add(entry);
+  }
+  return table;
+}();
+
+/// RU->EN для одного UTF-8 символа; '\0' если символ не переводится.
+[[nodiscard]] constexpr char ru_char_to_en(std::string_view ch) noexcept {
+  if (ch.size() == 1) {
+    const auto c = static_cast<unsigned char>(ch[0]);
+    return c < 128 ? kRuToEnTable.ascii[c] : '\0';
+  }
+  if (const int idx = cyrillic_index(ch); idx >= 0 && idx < 128) {
+    return kRuToEnTable.cyr[static_cast<std::size_t>(idx)];
+  }
+  if (ch == kNumeroSign) {
+    return kRuToEnTable.numero;
+  }
+  return '\0';
 }
 
-/// Lazy-initialized lookup table для CYR->LAT single (lower + upper)
-const std::unordered_map<std::string_view, char> &get_cyr_to_lat_single() {
-  static const auto map = [] {
-    std::unordered_map<std::string_view, char> m;
-    for (const auto &entry : kCyrToLatLower) {
-      m[entry.from] = entry.to;
+/// Элемент плоской таблицы CYR->LAT (замена может быть пустой: "ъ" -> "").
+struct TranslitEntry {
+  std::string_view to;
+  bool mapped = false;
+};
+
+/// CYR->LAT: single + multi в одной таблице по коду U+0400..U+047F.
+inline constexpr auto kCyrToLatTable = [] {
+  std::array<TranslitEntry, 128> table{};
+  auto put = [&table](std::string_view from, std::string_view to) {
+    if (const int idx = cyrillic_index(from); idx >= 0 && idx < 128) {
+      table[static_cast<std::size_t>(idx)] = TranslitEntry{to, true};
     }
-    for (const auto &entry : kCyrToLatUpper) {
-      m[entry.from] = entry.to;
+  };
+  for (const auto &entry : kCyrToLatLower) {
+    put(entry.from, std::string_view{&entry.to, 1});
+  }
+  for (const auto &entry : kCyrToLatUpper) {
+    put(entry.from, std::string_view{&entry.to, 1});
+  }
+  // Многосимвольные замены имеют приоритет (так же проверялись первыми).
+  for (const auto &entry : kCyrToLatMulti) {
+    put(entry.from, entry.to);
+  }
+  return table;
+}();
+
+// clang-format off
+/// LAT->CYR: односимвольные замены (после многосимвольных).
+inline constexpr std::array kLatToCyrSingle = std::to_array<CharMapping>({
+    {'a', "а"}, {'b', "б"}, {'v', "в"}, {'g', "г"}, {'d', "д"},  {'e', "е"},
+    {'z', "з"}, {'i', "и"}, {'j', "й"}, {'k', "к"}, {'l', "л"},  {'m', "м"},
+    {'n', "н"}, {'o', "о"}, {'p', "п"}, {'r', "р"}, {'s', "с"},  {'t', "т"},
+    {'u', "у"}, {'f', "ф"}, {'h', "х"}, {'c', "ц"}, {'y', "ы"},  {'A', "А"},
+    {'B', "Б"}, {'V', "В"}, {'G', "Г"}, {'D', "Д"}, {'E', "Е"},  {'Z', "З"},
+    {'I', "И"}, {'J', "Й"}, {'K', "К"}, {'L', "Л"}, {'M', "М"},  {'N', "Н"},
+    {'O', "О"}, {'P', "П"}, {'R', "Р"}, {'S', "С"}, {'T', "Т"},  {'U', "У"},
+    {'F', "Ф"}, {'H', "Х"}, {'C', "Ц"}, {'Y', "Ы"}, {'\'', "ь"},
+});
+// clang-format on
+
+inline constexpr auto kLatToCyrSingleTable = [] {
+  std::array<std::string_view, 128> table{};
+  for (const auto &entry : kLatToCyrSingle) {
+    table[static_cast<unsigned char>(entry.from)] = entry.to;
+  }
+  return table;
+}();
+
+/// Максимальная длина ключа в kLatToCyrMulti ("shch").
+inline constexpr std::size_t kLatToCyrMaxFrom = [] {
+  std::size_t max_len = 0;
+  for (const auto &entry : kLatToCyrMulti) {
+    max_len = std::max(max_len, entry.from.size());
+  }
+  return max_len;
+}();
+
+/// Самая длинная многосимвольная замена, начинающаяся с начала rest.
+[[nodiscard]] constexpr const MultiCharTranslit *
+match_lat_to_cyr_multi(std::string_view rest) noexcept {
+  const MultiCharTranslit *best = nullptr;
+  for (const auto &entry : kLatToCyrMulti) {
+    if (rest.starts_with(entry.from) &&
+        (best == nullptr || entry.from.size() > best->from.size())) {
+      best = &entry;
+      if (best->from.size() == kLatToCyrMaxFrom) {
+        break;
+      }
     }
-    return m;
-  }();
-  return map;
+  }
+  return best;
 }
 
-/// Lazy-initialized lookup table для LAT->CYR multi
-const std::unordered_map<std::string_view, std::string_view> &
-get_lat_to_cyr_multi() {
-  static const auto map = [] {
-    std::unordered_map<std::string_view, std::string_view> m;
-    for (const auto &entry : kLatToCyrMulti) {
-      m[entry.from] = entry.to;
+/// Класс первого байта UTF-8 последовательности для count_letters():
+/// младшие биты — длина символа (0 = невалидный байт), старшие — флаги.
+inline constexpr std::uint8_t kUtf8LenMask = 0x07;
+inline constexpr std::uint8_t kUtf8Latin = 0x08;
+inline constexpr std::uint8_t kUtf8CyrLead = 0x10;
+
+inline constexpr auto kUtf8ByteClass = [] {
+  std::array<std::uint8_t, 256> table{};
+  for (std::size_t b = 0; b < table.size(); ++b) {
+    const auto byte = static_cast<unsigned char>(b);
+    auto cls = static_cast<std::uint8_t>(utf8_char_len(byte));
+    if (is_latin_char(static_cast<char>(byte))) {
+      cls |= kUtf8Latin;
+    } else if (byte == 0xD0 || byte == 0xD1) {
+      cls |= kUtf8CyrLead;
     }
-    return m;
-  }();
-  return map;
-}
-
-/// Кириллический нижний регистр -> верхний
-std::string_view cyr_to_upper(std::string_view lower) {
-  static const std::unordered_map<std::string_view, std::string_view> map = {
-      {"а", "А"}, {"б", "Б"}, {"в", "В"}, {"г", "Г"}, {"д", "Д"}, {"е", "Е"},
-      {"ё", "Ё"}, {"ж", "Ж"}, {"з", "З"}, {"и", "И"}, {"й", "Й"}, {"к", "К"},
-      {"л", "Л"}, {"м", "М"}, {"н", "Н"}, {"о", "О"}, {"п", "П"}, {"р", "Р"},
-      {"с", "С"}, {"т", "Т"}, {"у", "У"}, {"ф", "Ф"}, {"х", "Х"}, {"ц", "Ц"},
-      {"ч", "Ч"}, {"ш", "Ш"}, {"щ", "Щ"}, {"ъ", "Ъ"}, {"ы", "Ы"}, {"ь", "Ь"},
-      {"э", "Э"}, {"ю", "Ю"}, {"я", "Я"},
-  };
-  auto it = map.find(lower);
-  return it != map.end() ? it->second : lower;
-}
-
-/// Кириллический верхний регистр -> нижний
-std::string_view cyr_to_lower(std::string_view upper) {
-  static const std::unordered_map<std::string_view, std::string_view> map = {
-      {"А", "а"}, {"Б", "б"}, {"В", "в"}, {"Г", "г"}, {"Д", "д"}, {"Е", "е"},
-      {"Ё", "ё"}, {"Ж", "ж"}, {"З", "з"}, {"И", "и"}, {"Й", "й"}, {"К", "к"},
-      {"Л", "л"}, {"М", "м"}, {"Н", "н"}, {"О", "о"}, {"П", "п"}, {"Р", "р"},
-      {"С", "с"}, {"Т", "т"}, {"У", "у"}, {"Ф", "ф"}, {"Х", "х"}, {"Ц", "ц"},
-      {"Ч", "ч"}, {"Ш", "ш"}, {"Щ", "щ"}, {"Ъ", "ъ"}, {"Ы", "ы"}, {"Ь", "ь"},
-      {"Э", "э"}, {"Ю", "ю"}, {"Я", "я"},
-  };
-  auto it = map.find(upper);
-  return it != map.end() ? it->second : upper;
-}
-
-/// Проверка, является ли кириллический символ заглавным
-bool is_cyr_upper(std::string_view ch) {
-  static const std::unordered_set<std::string_view> upper_chars = {
-      "А", "Б", "В", "Г", "Д", "Е", "Ё", "Ж", "З", "И", "Й",
-      "К", "Л", "М", "Н", "О", "П", "Р", "С", "Т", "У", "Ф",
-      "Х", "Ц", "Ч", "Ш", "Щ", "Ъ", "Ы", "Ь", "Э", "Ю", "Я",
-  };
-  return upper_chars.count(ch) > 0;
+    table[b] = cls;
+  }
+  return table;
+}();
+
+/// Пары регистров кириллических букв (строчная, заглавная)
+struct CyrCasePair {
+  std::string_view lower;
+  std::string_view upper;
+};
+
+inline constexpr std::array kCyrCasePairs = std::to_array<CyrCasePair>({
+    {"а", "А"}, {"б", "Б"}, {"в", "В"}, {"г", "Г"}, {"д", "Д"}, {"е", "Е"},
+    {"ё", "Ё"}, {"ж", "Ж"}, {"з", "З"}, {"и", "И"}, {"й", "Й"}, {"к", "К"},
+    {"л", "Л"}, {"м", "М"}, {"н", "Н"}, {"о", "О"}, {"п", "П"}, {"р", "Р"},
+    {"с", "С"}, {"т", "Т"}, {"у", "У"}, {"ф", "Ф"}, {"х", "Х"}, {"ц", "Ц"},
+    {"ч", "Ч"}, {"ш", "Ш"}, {"щ", "Щ"}, {"ъ", "Ъ"}, {"ы", "Ы"}, {"ь", "Ь"},
+    {"э", "Э"}, {"ю", "Ю"}, {"я", "Я"},
+});
+
+/// Инверсия регистра кириллицы: плоская таблица по cyrillic_index().
+/// Пустой string_view = символ регистра не имеет (оставляем как есть).
+inline constexpr auto kCyrCaseSwapTable = [] {
+  std::array<std::string_view, 128> table{};
+  for (const auto &pair : kCyrCasePairs) {
+    table[static_cast<std::size_t>(cyrillic_index(pair.lower))] = pair.upper;
+    table[static_cast<std::size_t>(cyrillic_index(pair.upper))] = pair.lower;
+  }
+  return table;
+}();
+
+[[nodiscard]] constexpr std::string_view
+cyr_invert_case(std::string_view ch) noexcept {
+  const int idx = cyrillic_index(ch);
+  if (idx < 0 || idx >= static_cast<int>(kCyrCaseSwapTable.size())) {
+    return ch;
+  }
+  const auto swapped = kCyrCaseSwapTable[static_cast<std::size_t>(idx)];
+  return swapped.empty() ? ch : swapped;
 }
 
 } // namespace
@@ -168,19 +229,22 @@ std::pair<std::size_t, std::size_t> count_letters(std::string_view text) {
   std::size_t cyrillic = 0;
   std::size_t total = 0;
 
+  // Один линейный проход с классификацией по таблице первого байта: для
+  // больших выделений это основной цикл перед конвертацией.
+  const std::size_t size = text.size();
   std::size_t i = 0;
-  while (i < text.size()) {
-    auto len = utf8_char_len(static_cast<unsigned char>(text[i]));
-    if (len == 0 || i + len > text.size()) {
+  while (i < size) {
+    const std::uint8_t cls = kUtf8ByteClass[static_cast<unsigned char>(text[i])];
+    const std::size_t len = cls & kUtf8LenMask;
+    if (len == 0 || i + len > size) {
       ++i;
       continue;
     }
 
-    std::string_view ch = text.substr(i, len);
-
-    if (len == 1 && is_latin_char(text[i])) {
+    if ((cls & kUtf8Latin) != 0) {
       ++total;
-    } else if (len == 2 && is_cyrillic_char(ch)) {
+    } else if ((cls & kUtf8CyrLead) != 0 &&
+               (static_cast<unsigned char>(text[i + 1]) & 0xC0) == 0x80) {
       ++cyrillic;
       ++total;
     }
@@ -202,14 +266,10 @@ std::string en_to_ru(std::string_view text) {
   std::string result;
   result.reserve(text.size() * 2); // Русские буквы занимают 2 байта
 
-  const auto &lower_map = get_en_to_ru_lower();
-  const auto &upper_map = get_en_to_ru_upper();
-
   for (char c : text) {
-    if (auto it = lower_map.find(c); it != lower_map.end()) {
-      result += it->second;
-    } else if (auto it2 = upper_map.find(c); it2 != upper_map.end()) {
-      result += it2->second;
+    const auto uc = static_cast<unsigned char>(c);
+    if (uc < kEnToRuTable.size() && !kEnToRuTable[uc].empty()) {
+      result += kEnToRuTable[uc];
     } else {
       result += c;
     }
@@ -222,9 +282,6 @@ std::string ru_to_en(std::string_view text) {
   std::string result;
   result.reserve(text.size());
 
-  const auto &lower_map = get_ru_to_en_lower();
-  const auto &upper_map = get_ru_to_en_upper();
-
   std::size_t i = 0;
   while (i < text.size()) {
     auto len = utf8_char_len(static_cast<unsigned char>(text[i]));
@@ -236,10 +293,8 @@ std::string ru_to_en(std::string_view text) {
 
     std::string_view ch = text.substr(i, len);
 
-    if (auto it = lower_map.find(ch); it != lower_map.end()) {
-      result += it->second;
-    } else if (auto it2 = upper_map.find(ch); it2 != upper_map.end()) {
-      result += it2->second;
+    if (const char en = ru_char_to_en(ch); en != '\0') {
+      result += en;
     } else {
       result += ch;
     }
@@ -286,11 +341,7 @@ std::string invert_case(std::string_view text) {
       }
     } else if (len == 2 && is_cyrillic_char(ch)) {
       // Кириллица
-      if (is_cyr_upper(ch)) {
-        result += cyr_to_lower(ch);
-      } else {
-        result += cyr_to_upper(ch);
-      }
+      result += cyr_invert_case(ch);
     } else {
       result += ch;
     }
@@ -305,9 +356,6 @@ std::string cyr_to_lat(std::string_view text) {
   std::string result;
   result.reserve(text.size());
 
-  const auto &multi_map = get_cyr_to_lat_multi();
-  const auto &single_map = get_cyr_to_lat_single();
-
   std::size_t i = 0;
   while (i < text.size()) {
     auto len = utf8_char_len(static_cast<unsigned char>(text[i]));
@@ -319,11 +367,10 @@ std::string cyr_to_lat(std::string_view text) {
 
     std::string_view ch = text.substr(i, len);
 
-    // Сначала проверяем многосимвольные замены
-    if (auto it = multi_map.find(ch); it != multi_map.end()) {
-      result += it->second;
-    } else if (auto it2 = single_map.find(ch); it2 != single_map.end()) {
-      result += it2->second;
+    const int idx = cyrillic_index(ch);
+    if (idx >= 0 && idx < 128 &&
+        kCyrToLatTable[static_cast<std::size_t>(idx)].mapped) {
+      result += kCyrToLatTable[static_cast<std::size_t>(idx)].to;
     } else {
       result += ch;
     }
@@ -338,45 +385,26 @@ std::string lat_to_cyr(std::string_view text) {
   std::string result;
   result.reserve(text.size() * 2);
 
-  const auto &multi_map = get_lat_to_cyr_multi();
-
-  // Сортируем замены по длине from в убывающем порядке
-  // чтобы "shch" обрабатывался раньше "sh"
-  std::vector<std::pair<std::string_view, std::string_view>> sorted_multi(
-      multi_map.begin(), multi_map.end());
-  std::sort(sorted_multi.begin(), sorted_multi.end(),
-            [](const auto &a, const auto &b) {
-              return a.first.size() > b.first.size();
-            });
-
-  // Сначала заменяем многосимвольные последовательности
-  std::string temp{text};
-  for (const auto &[from, to] : sorted_multi) {
-    std::size_t pos = 0;
-    while ((pos = temp.find(from, pos)) != std::string::npos) {
-      temp.replace(pos, from.size(), std::string{to});
-      pos += to.size();
+  // Один проход слева направо: сначала самая длинная многосимвольная замена
+  // ("shch" раньше "sh"), затем односимвольная. Ключи kLatToCyrMulti не
+  // перекрываются, поэтому результат совпадает с последовательными заменами.
+  std::size_t i = 0;
+  while (i < text.size()) {
+    const std::string_view rest = text.substr(i);
+    if (const auto *multi = match_lat_to_cyr_multi(rest); multi != nullptr) {
+      result += multi->to;
+      i += multi->from.size();
+      continue;
     }
-  }
-
-  // Затем односимвольные
-  static const std::unordered_map<char, std::string_view> single_map = {
-      {'a', "а"}, {'b', "б"}, {'v', "в"}, {'g', "г"}, {'d', "д"},  {'e', "е"},
-      {'z', "з"}, {'i', "и"}, {'j', "й"}, {'k', "к"}, {'l', "л"},  {'m', "м"},
-      {'n', "н"}, {'o', "о"}, {'p', "п"}, {'r', "р"}, {'s', "с"},  {'t', "т"},
-      {'u', "у"}, {'f', "ф"}, {'h', "х"}, {'c', "ц"}, {'y', "ы"},  {'A', "А"},
-      {'B', "Б"}, {'V', "В"}, {'G', "Г"}, {'D', "Д"}, {'E', "Е"},  {'Z', "З"},
-      {'I', "И"}, {'J', "Й"}, {'K', "К"}, {'L', "Л"}, {'M', "М"},  {'N', "Н"},
-      {'O', "О"}, {'P', "П"}, {'R', "Р"}, {'S', "С"}, {'T', "Т"},  {'U', "У"},
-      {'F', "Ф"}, {'H', "Х"}, {'C', "Ц"}, {'Y', "Ы"}, {'\'', "ь"},
-  };
 
-  for (char c : temp) {
-    if (auto it = single_map.find(c); it != single_map.end()) {
-      result += it->second;
+    const char c = text[i];
+    const auto uc = static_cast<unsigned char>(c);
+    if (uc < kLatToCyrSingleTable.size() && !kLatToCyrSingleTable[uc].empty()) {
+      result += kLatToCyrSingleTable[uc];
     } else {
       result += c;
     }
+    ++i;
   }
 
   return result;
@@ -4,6 +4,7 @@
  */
 
 #include "punto/ipc_client.hpp"
+#include "punto/file_stamp.hpp"
 
 #include <sys/socket.h>
 #include <sys/un.h>
@@ -14,6 +15,7 @@
 #include <cerrno>
 #include <cstring>
 #include <filesystem>
+#include <mutex>
 #include <vector>
 
 namespace punto {
@@ -22,7 +24,7 @@ namespace {
 
 /// Создаёт подключение к серверу
 int connect_to_server(const char* socket_path) {
-  int fd = socket(AF_UNIX, SOCK_STREAM, 0);
+  int fd = socket(AF_UNIX, SOCK_STREAM | SOCK_CLOEXEC, 0);
   if (fd < 0) {
     return -1;
   }
@@ -39,16 +41,43 @@ int connect_to_server(const char* socket_path) {
   return fd;
 }
 
+/// Каталог, в котором сервисы создают сокеты punto-*.sock
+constexpr const char* kSocketDir = "/var/run";
+
+/// Результат последнего сканирования kSocketDir (tray опрашивает статус
+/// каждые 2 с и из фонового потока переключателей, поэтому под мьютексом)
+struct SocketListCache {
+  std::mutex mu;
+  bool valid = false;
+  FileStamp stamp; ///< создание/удаление записи меняет mtime каталога
+  std::vector<std::string> sockets;
+};
+
+SocketListCache& socket_list_cache() {
+  static SocketListCache cache;
+  return cache;
+}
+
 } // namespace
 
 std::vector<std::string> IpcClient::list_socket_paths() {
+  // Пока в каталоге не появлялись и не исчезали записи, список сокетов
+  // прежний: вместо обхода каталога на каждый запрос хватает одного stat().
+  const std::optional<FileStamp> stamp = stat_file_stamp(kSocketDir);
+
+  SocketListCache& cache = socket_list_cache();
+  std::lock_guard<std::mutex> lock(cache.mu);
+  if (stamp && cache.valid && cache.stamp == *stamp) {
+    return cache.sockets;
+  }
+
   std::vector<std::string> sockets;
   sockets.emplace_back(kSocketPath);
 
   std::vector<std::string> extra;
 
   std::error_code ec;
-  for (const auto& entry : std::filesystem::directory_iterator("/var/run", ec)) {
+  for (const auto& entry : std::filesystem::directory_iterator(kSocketDir, ec)) {
     if (ec) {
       break;
     }
@@ -75,6 +104,11 @@ std::vector<std::string> IpcClient::list_socket_paths() {
     }
   }
 
+  cache.valid = stamp.has_value();
+  if (stamp) {
+    cache.stamp = *stamp;
+  }
+  cache.sockets = sockets;
   return sockets;
 }
 
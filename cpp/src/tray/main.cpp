@@ -8,9 +8,11 @@
 
 #include "punto/tray_app.hpp"
 
-#include <cstdlib>
+#include <csignal>
 #include <iostream>
 
+#include <glib-unix.h>
+
 namespace {
 
 void print_version() {
@@ -29,6 +31,14 @@ void print_usage(const char* argv0) {
             << "для управления сервисом Punto Switcher.\n";
 }
 
+/// SIGINT/SIGTERM обрабатываются самим main loop GLib: gtk_main() штатно
+/// завершается, и ~TrayApp снимает таймер и отключает индикатор.
+gboolean on_terminate_signal(gpointer user_data) {
+  (void)user_data;
+  gtk_main_quit();
+  return G_SOURCE_REMOVE;
+}
+
 } // namespace
 
 int main(int argc, char* argv[]) {
@@ -48,15 +58,16 @@ int main(int argc, char* argv[]) {
   // Инициализация GTK
   gtk_init(&argc, &argv);
 
-  // Проверяем доступность сервиса (silent; сервис может появиться позже)
-  (void)punto::IpcClient::is_service_available();
-
-  // Создаём и запускаем приложение
+  // Создаём и запускаем приложение. Доступность сервиса отдельно не
+  // проверяем: initialize() сразу запрашивает GET_STATUS.
   punto::TrayApp app;
   
   if (!app.initialize()) {
     return 1;
   }
 
+  g_unix_signal_add(SIGINT, on_terminate_signal, nullptr);
+  g_unix_signal_add(SIGTERM, on_terminate_signal, nullptr);
+
   return app.run();
 }
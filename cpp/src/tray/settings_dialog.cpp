@@ -5,18 +5,24 @@
 
 #include "punto/settings_dialog.hpp"
 
+#include <cerrno>
 #include <cmath>
 #include <cstdlib>
 #include <filesystem>
 #include <fstream>
-#include <iostream>
 #include <locale>
+#include <mutex>
+#include <optional>
 #include <sstream>
 #include <string_view>
 
+#include <fcntl.h>
 #include <glib.h>
+#include <unistd.h>
 
+#include "punto/file_stamp.hpp"
 #include "punto/system_input_settings.hpp"
+#include "punto/tray_messages.hpp"
 #include "punto/types.hpp"
 
 namespace punto {
@@ -25,6 +31,44 @@ namespace {
 
 constexpr const char *kSystemConfigPath = "/etc/punto/config.yaml";
 
+/// Пункт выпадающего списка: id (значение в конфиге) и подпись
+struct ComboOption {
+  const char *id;
+  const char *label;
+};
+
+constexpr ComboOption kModifierOptions[] = {
+    {"leftctrl", "Left Ctrl"},   {"rightctrl", "Right Ctrl"},
+    {"leftalt", "Left Alt"},     {"rightalt", "Right Alt"},
+    {"leftshift", "Left Shift"}, {"rightshift", "Right Shift"},
+    {"leftmeta", "Left Super"},  {"rightmeta", "Right Super"},
+};
+
+constexpr ComboOption kKeyOptions[] = {
+    {"grave", "` (Grave)"},
+    {"space", "Space"},
+    {"tab", "Tab"},
+    {"backslash", "\\ (Backslash)"},
+    {"capslock", "Caps Lock"},
+    // Модификаторы тоже могут выступать "второй клавишей" (Alt+Shift,
+    // Ctrl+Alt и т.п.)
+    {"leftshift", "Left Shift"},
+    {"rightshift", "Right Shift"},
+    {"leftalt", "Left Alt"},
+    {"rightalt", "Right Alt"},
+    {"leftctrl", "Left Ctrl"},
+    {"rightctrl", "Right Ctrl"},
+    {"leftmeta", "Left Super"},
+    {"rightmeta", "Right Super"},
+};
+
+template <std::size_t N>
+void append_combo_options(GtkWidget *combo, const ComboOption (&options)[N]) {
+  for (const ComboOption &opt : options) {
+    gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(combo), opt.id, opt.label);
+  }
+}
+
 [[nodiscard]] GtkWidget *make_left_label(const char *text) {
   GtkWidget *lbl = gtk_label_new(text);
   gtk_label_set_xalign(GTK_LABEL(lbl), 0);
@@ -56,9 +100,17 @@ struct SettingsDialogUiContext {
   GtkComboBox *key_combo = nullptr;
 
   // UI
+  GtkWidget *dialog = nullptr;
+  GtkNotebook *notebook = nullptr;
   GtkWidget *hotkey_hint_label = nullptr;
+  std::string hotkey_hint_text; ///< Текст, установленный в hotkey_hint_label
+  GtkWidget *sys_label = nullptr;
   GtkWidget *save_button = nullptr;
 
+  /// Пока populate_settings_dialog() расставляет значения, сигналы
+  /// "changed" не пересчитывают подсказку на каждый виджет
+  bool suppress_updates = false;
+
   SettingsData initial;
 };
 
@@ -228,255 +280,42 @@ static void update_settings_dialog_state(SettingsDialogUiContext *ctx) {
     }
   }
 
-  gtk_label_set_text(GTK_LABEL(ctx->hotkey_hint_label), text.c_str());
+  // Подсказка зависит только от выбранного хоткея, а колбэк вызывается на
+  // каждый шаг любого спина: одинаковый текст не переустанавливаем, чтобы не
+  // вызывать перелайаут многострочного label.
+  if (text != ctx->hotkey_hint_text) {
+    ctx->hotkey_hint_text = std::move(text);
+    gtk_label_set_text(GTK_LABEL(ctx->hotkey_hint_label),
+                       ctx->hotkey_hint_text.c_str());
+  }
 }
 
 static void on_any_setting_changed(GtkWidget *widget, gpointer user_data) {
   (void)widget;
   auto *ctx = static_cast<SettingsDialogUiContext *>(user_data);
-  update_settings_dialog_state(ctx);
-}
-
-/// Вспомогательная функция trim
-std::string trim(const std::string &str) {
-  size_t start = str.find_first_not_of(" \t\r\n");
-  if (start == std::string::npos)
-    return "";
-  size_t end = str.find_last_not_of(" \t\r\n");
-  return str.substr(start, end - start + 1);
-}
-
-/// Парсит значение после двоеточия
-std::string parse_value(const std::string &line) {
-  auto pos = line.find(':');
-  if (pos == std::string::npos)
-    return "";
-  return trim(line.substr(pos + 1));
-}
-
-/// Извлекает ключ (до первого двоеточия) из строки YAML
-std::string parse_key(const std::string &line) {
-  auto pos = line.find(':');
-  if (pos == std::string::npos)
-    return "";
-  return trim(line.substr(0, pos));
-}
-
-/// Парсит double в независимости от локали (использует C locale)
-bool parse_double_clocale(const std::string &text, double &out) {
-  std::istringstream ss(text);
-  ss.imbue(std::locale::classic());
-  ss >> out;
-  return !ss.fail();
-}
-
-} // namespace
-
-std::string SettingsDialog::get_user_config_path() {
-  const char *home = std::getenv("HOME");
-  if (!home || std::string(home).empty()) {
-    // На всякий случай используем glib, если переменная HOME не прокинута
-    const char *ghome = g_get_home_dir();
-    if (ghome && std::string(ghome).size() > 0) {
-      home = ghome;
-    }
-  }
-
-  if (home) {
-    return std::string(home) + "/" + std::string(kUserConfigRelPath);
-  }
-  return "";
-}
-
-bool SettingsDialog::ensure_user_config() {
-  std::string user_path = get_user_config_path();
-  if (user_path.empty())
-    return false;
-
-  std::ifstream check{user_path};
-  if (check.is_open())
-    return true;
-
-  // Создаём директорию
-  std::string dir = user_path.substr(0, user_path.rfind('/'));
-  std::string mkdir_cmd = "mkdir -p \"" + dir + "\"";
-  if (std::system(mkdir_cmd.c_str()) != 0)
-    return false;
-
-  // Копируем системный конфиг
-  std::string cp_cmd =
-      "cp \"" + std::string(kSystemConfigPath) + "\" \"" + user_path + "\"";
-  return std::system(cp_cmd.c_str()) == 0;
-}
-
-SettingsData SettingsDialog::load_settings() {
-  SettingsData settings;
-
-  ensure_user_config();
-  std::string config_path = get_user_config_path();
-  if (config_path.empty()) {
-    return settings;
-  }
-
-  std::ifstream file{config_path};
-  if (!file.is_open()) {
-    return settings;
-  }
-
-  std::string line;
-  std::string section;
-
-  while (std::getline(file, line)) {
-    std::string trimmed = trim(line);
-    if (trimmed.empty() || trimmed[0] == '#')
-      continue;
-
-    // Секции
-    if (trimmed == "hotkey:") {
-      section = "hotkey";
-      continue;
-    }
-    if (trimmed == "auto_switch:") {
-      section = "auto_switch";
-      continue;
-    }
-    if (trimmed == "sound:") {
-      section = "sound";
-      continue;
-    }
-
-    std::string value = parse_value(trimmed);
-    if (value.empty())
-      continue;
-
-    std::string key = parse_key(trimmed);
-    if (key.empty())
-      continue;
-
-    if (section == "hotkey") {
-      if (key == "modifier") {
-        settings.modifier = value;
-      } else if (key == "key") {
-        settings.key = value;
-      }
-    } else if (section == "auto_switch") {
-      if (key == "enabled") {
-        settings.auto_enabled = (value == "true" || value == "1");
-      } else if (key == "threshold") {
-        double v{};
-        if (parse_double_clocale(value, v)) {
-          settings.threshold = v;
-        }
-      } else if (key == "min_word_len") {
-        settings.min_word_len = std::stoi(value);
-      } else if (key == "min_score") {
-        double v{};
-        if (parse_double_clocale(value, v)) {
-          settings.min_score = v;
-        }
-      } else if (key == "max_rollback_words") {
-        settings.max_rollback_words = std::stoi(value);
-      } else if (key == "typo_correction_enabled") {
-        settings.typo_correction_enabled = (value == "true" || value == "1");
-      } else if (key == "max_typo_diff") {
-        settings.max_typo_diff = std::stoi(value);
-      } else if (key == "sticky_shift_correction_enabled") {
-        settings.sticky_shift_correction_enabled =
-            (value == "true" || value == "1");
-      }
-    } else if (section == "sound") {
-      if (key == "enabled") {
-        settings.sound_enabled = (value == "true" || value == "1");
-      }
-    }
+  if (ctx && ctx->suppress_updates) {
+    return;
   }
-
-  return settings;
+  update_settings_dialog_state(ctx);
 }
 
-bool SettingsDialog::save_settings(const SettingsData &settings) {
-  if (!ensure_user_config()) {
-    return false;
-  }
-
-  std::string config_path_str = get_user_config_path();
-  if (config_path_str.empty()) {
-    return false;
-  }
-
-  std::filesystem::path config_path{config_path_str};
-  std::filesystem::path tmp_path = config_path;
-  tmp_path += ".tmp";
-
-  {
-    std::ofstream file{tmp_path, std::ios::trunc};
-    if (!file.is_open()) {
-      return false;
-    }
-
-    // Гарантируем точку в числах независимо от локали пользователя.
-    file.imbue(std::locale::classic());
-
-    file << "# Punto Switcher Configuration\n";
-    file << "# Автоматически сгенерировано punto-tray\n\n";
-
-    file << "hotkey:\n";
-    file << "  modifier: " << settings.modifier << "\n";
-    file << "  key: " << settings.key << "\n\n";
-
-    file << "auto_switch:\n";
-    file << "  enabled: " << (settings.auto_enabled ? "true" : "false") << "\n";
-    file << "  threshold: " << settings.threshold << "\n";
-    file << "  min_word_len: " << settings.min_word_len << "\n";
-    file << "  min_score: " << settings.min_score << "\n";
-    file << "  max_rollback_words: " << settings.max_rollback_words << "\n";
-    file << "  typo_correction_enabled: "
-         << (settings.typo_correction_enabled ? "true" : "false") << "\n";
-    file << "  max_typo_diff: " << settings.max_typo_diff << "\n";
-    file << "  sticky_shift_correction_enabled: "
-         << (settings.sticky_shift_correction_enabled ? "true" : "false")
-         << "\n\n";
-
-    file << "sound:\n";
-    file << "  enabled: " << (settings.sound_enabled ? "true" : "false")
-         << "\n";
-
-    file.flush();
-    if (!file.good()) {
-      return false;
-    }
-  }
-
-  // Атомарно заменяем файл (rename в пределах одной ФС атомарен).
-  std::error_code ec;
-  std::filesystem::rename(tmp_path, config_path, ec);
-  if (ec) {
-    // Best-effort cleanup временного файла.
-    std::error_code rm_ec;
-    std::filesystem::remove(tmp_path, rm_ec);
-    return false;
+void set_combo_active_id(GtkComboBox *combo, const std::string &id) {
+  if (!gtk_combo_box_set_active_id(combo, id.c_str())) {
+    gtk_combo_box_set_active(combo, -1);
   }
-
-  return true;
 }
 
-bool SettingsDialog::show(GtkWidget *parent) {
-  static GtkWidget *s_dialog_instance = nullptr;
-  if (s_dialog_instance) {
-    gtk_window_present(GTK_WINDOW(s_dialog_instance));
-    return false;
-  }
-
-  // Загружаем текущие настройки
-  const SettingsData initial_settings = load_settings();
-
+/**
+ * @brief Создаёт дерево виджетов диалога настроек
+ *
+ * Вызывается один раз: при закрытии диалог только скрывается, а при следующем
+ * открытии виджеты заполняются заново (populate_settings_dialog).
+ */
+[[nodiscard]] SettingsDialogUiContext *build_settings_dialog() {
   // Создаём диалог
   GtkWidget *dialog = gtk_dialog_new_with_buttons(
-      "Настройки Punto Switcher", parent ? GTK_WINDOW(parent) : nullptr,
-      GTK_DIALOG_MODAL, "_Отмена", GTK_RESPONSE_CANCEL, "_Сохранить",
-      GTK_RESPONSE_ACCEPT, nullptr);
-
-  s_dialog_instance = dialog;
+      "Настройки Punto Switcher", nullptr, GTK_DIALOG_MODAL, "_Отмена",
+      GTK_RESPONSE_CANCEL, "_Сохранить", GTK_RESPONSE_ACCEPT, nullptr);
 
   gtk_window_set_default_size(GTK_WINDOW(dialog), 440, -1);
   gtk_window_set_position(GTK_WINDOW(dialog), GTK_WIN_POS_CENTER);
@@ -494,9 +333,10 @@ bool SettingsDialog::show(GtkWidget *parent) {
   GtkWidget *notebook = gtk_notebook_new();
   gtk_box_pack_start(GTK_BOX(content), notebook, TRUE, TRUE, 0);
 
-  SettingsDialogUiContext ui_ctx;
-  ui_ctx.initial = initial_settings;
-  ui_ctx.save_button = save_button;
+  auto *ctx = new SettingsDialogUiContext{};
+  ctx->dialog = dialog;
+  ctx->save_button = save_button;
+  ctx->notebook = GTK_NOTEBOOK(notebook);
 
   // ===== Вкладка "Автопереключение" =====
   GtkWidget *auto_box = gtk_box_new(GTK_ORIENTATION_VERTICAL, 8);
@@ -506,7 +346,7 @@ bool SettingsDialog::show(GtkWidget *parent) {
       make_dim_label("Включение/выключение автопереключения — в меню трея.");
   gtk_box_pack_start(GTK_BOX(auto_box), auto_note, FALSE, FALSE, 0);
 
-  // Grid для параметров
+  // Grid для параметров (обе секции вкладки)
   GtkWidget *auto_grid = gtk_grid_new();
   gtk_grid_set_row_spacing(GTK_GRID(auto_grid), 4);
   gtk_grid_set_column_spacing(GTK_GRID(auto_grid), 12);
@@ -517,8 +357,6 @@ bool SettingsDialog::show(GtkWidget *parent) {
   gtk_grid_attach(GTK_GRID(auto_grid), threshold_lbl, 0, 0, 1, 1);
   GtkWidget *threshold_spin = gtk_spin_button_new_with_range(0.5, 10.0, 0.1);
   gtk_spin_button_set_digits(GTK_SPIN_BUTTON(threshold_spin), 1);
-  gtk_spin_button_set_value(GTK_SPIN_BUTTON(threshold_spin),
-                            initial_settings.threshold);
   gtk_spin_button_set_increments(GTK_SPIN_BUTTON(threshold_spin), 0.1, 0.1);
   gtk_spin_button_set_snap_to_ticks(GTK_SPIN_BUTTON(threshold_spin), FALSE);
   gtk_grid_attach(GTK_GRID(auto_grid), threshold_spin, 1, 0, 1, 1);
@@ -531,8 +369,6 @@ bool SettingsDialog::show(GtkWidget *parent) {
   GtkWidget *min_word_lbl = make_left_label("Мин. длина слова:");
   gtk_grid_attach(GTK_GRID(auto_grid), min_word_lbl, 0, 2, 1, 1);
   GtkWidget *min_word_spin = gtk_spin_button_new_with_range(1, 10, 1);
-  gtk_spin_button_set_value(GTK_SPIN_BUTTON(min_word_spin),
-                            initial_settings.min_word_len);
   gtk_grid_attach(GTK_GRID(auto_grid), min_word_spin, 1, 2, 1, 1);
   GtkWidget *min_word_desc = make_dim_label(
       "Диапазон: 1–10. Слова короче этого значения не анализируются.");
@@ -543,8 +379,6 @@ bool SettingsDialog::show(GtkWidget *parent) {
   gtk_grid_attach(GTK_GRID(auto_grid), min_score_lbl, 0, 4, 1, 1);
   GtkWidget *min_score_spin = gtk_spin_button_new_with_range(0.0, 20.0, 0.1);
   gtk_spin_button_set_digits(GTK_SPIN_BUTTON(min_score_spin), 1);
-  gtk_spin_button_set_value(GTK_SPIN_BUTTON(min_score_spin),
-                            initial_settings.min_score);
   gtk_spin_button_set_increments(GTK_SPIN_BUTTON(min_score_spin), 0.1, 0.1);
   gtk_spin_button_set_snap_to_ticks(GTK_SPIN_BUTTON(min_score_spin), FALSE);
   gtk_grid_attach(GTK_GRID(auto_grid), min_score_spin, 1, 4, 1, 1);
@@ -557,8 +391,6 @@ bool SettingsDialog::show(GtkWidget *parent) {
   GtkWidget *rollback_lbl = make_left_label("Макс. откат слов:");
   gtk_grid_attach(GTK_GRID(auto_grid), rollback_lbl, 0, 6, 1, 1);
   GtkWidget *rollback_spin = gtk_spin_button_new_with_range(1, 50, 1);
-  gtk_spin_button_set_value(GTK_SPIN_BUTTON(rollback_spin),
-                            initial_settings.max_rollback_words);
   gtk_grid_attach(GTK_GRID(auto_grid), rollback_spin, 1, 6, 1, 1);
   GtkWidget *rollback_desc =
       make_dim_label("Диапазон: 1–50. Сколько последних слов можно откатывать, "
@@ -566,65 +398,52 @@ bool SettingsDialog::show(GtkWidget *parent) {
   gtk_grid_attach(GTK_GRID(auto_grid), rollback_desc, 0, 7, 2, 1);
 
   // ===== Секция исправления опечаток =====
-  gtk_box_pack_start(GTK_BOX(auto_box),
-                     gtk_separator_new(GTK_ORIENTATION_HORIZONTAL), FALSE,
-                     FALSE, 6);
-  gtk_box_pack_start(GTK_BOX(auto_box), make_left_label("Исправление ошибок:"),
-                     FALSE, FALSE, 0);
-
-  GtkWidget *typo_grid = gtk_grid_new();
-  gtk_grid_set_row_spacing(GTK_GRID(typo_grid), 4);
-  gtk_grid_set_column_spacing(GTK_GRID(typo_grid), 12);
-  gtk_box_pack_start(GTK_BOX(auto_box), typo_grid, FALSE, FALSE, 4);
+  // Продолжение той же сетки, а не отдельные дети box и вложенная сетка:
+  // спины обеих секций в одной колонке, и контейнеров на вкладке меньше.
+  GtkWidget *typo_sep = gtk_separator_new(GTK_ORIENTATION_HORIZONTAL);
+  gtk_widget_set_margin_top(typo_sep, 10);
+  gtk_widget_set_margin_bottom(typo_sep, 6);
+  gtk_grid_attach(GTK_GRID(auto_grid), typo_sep, 0, 8, 2, 1);
+  gtk_grid_attach(GTK_GRID(auto_grid), make_left_label("Исправление ошибок:"),
+                  0, 9, 2, 1);
 
   // Sticky shift correction
   GtkWidget *sticky_check = gtk_check_button_new_with_label(
       "Исправлять залипший Shift (ПРивет → Привет)");
-  gtk_toggle_button_set_active(
-      GTK_TOGGLE_BUTTON(sticky_check),
-      initial_settings.sticky_shift_correction_enabled);
-  gtk_grid_attach(GTK_GRID(typo_grid), sticky_check, 0, 0, 2, 1);
+  gtk_widget_set_margin_top(sticky_check, 4);
+  gtk_grid_attach(GTK_GRID(auto_grid), sticky_check, 0, 10, 2, 1);
 
   // Typo correction
   GtkWidget *typo_check = gtk_check_button_new_with_label(
       "Исправлять опечатки (перестановки, пропуски, дубли) beta");
-  gtk_toggle_button_set_active(GTK_TOGGLE_BUTTON(typo_check),
-                               initial_settings.typo_correction_enabled);
-  gtk_grid_attach(GTK_GRID(typo_grid), typo_check, 0, 1, 2, 1);
+  gtk_grid_attach(GTK_GRID(auto_grid), typo_check, 0, 11, 2, 1);
 
   // Max typo diff
   GtkWidget *typo_diff_lbl = make_left_label("Макс. расстояние:");
-  gtk_grid_attach(GTK_GRID(typo_grid), typo_diff_lbl, 0, 2, 1, 1);
+  gtk_grid_attach(GTK_GRID(auto_grid), typo_diff_lbl, 0, 12, 1, 1);
   GtkWidget *typo_diff_spin = gtk_spin_button_new_with_range(1, 2, 1);
-  gtk_spin_button_set_value(GTK_SPIN_BUTTON(typo_diff_spin),
-                            initial_settings.max_typo_diff);
-  gtk_grid_attach(GTK_GRID(typo_grid), typo_diff_spin, 1, 2, 1, 1);
+  gtk_grid_attach(GTK_GRID(auto_grid), typo_diff_spin, 1, 12, 1, 1);
   GtkWidget *typo_diff_desc = make_dim_label(
       "1 = только однобуквенные ошибки, 2 = включая двухбуквенные.");
-  gtk_grid_attach(GTK_GRID(typo_grid), typo_diff_desc, 0, 3, 2, 1);
-
-  ui_ctx.threshold_spin = GTK_SPIN_BUTTON(threshold_spin);
-  ui_ctx.min_word_spin = GTK_SPIN_BUTTON(min_word_spin);
-  ui_ctx.min_score_spin = GTK_SPIN_BUTTON(min_score_spin);
-  ui_ctx.max_rollback_words_spin = GTK_SPIN_BUTTON(rollback_spin);
-  ui_ctx.sticky_shift_check = GTK_TOGGLE_BUTTON(sticky_check);
-  ui_ctx.typo_correction_check = GTK_TOGGLE_BUTTON(typo_check);
-  ui_ctx.max_typo_diff_spin = GTK_SPIN_BUTTON(typo_diff_spin);
-
-  g_signal_connect(threshold_spin, "value-changed",
-                   G_CALLBACK(on_any_setting_changed), &ui_ctx);
-  g_signal_connect(min_word_spin, "value-changed",
-                   G_CALLBACK(on_any_setting_changed), &ui_ctx);
-  g_signal_connect(min_score_spin, "value-changed",
-                   G_CALLBACK(on_any_setting_changed), &ui_ctx);
-  g_signal_connect(rollback_spin, "value-changed",
-                   G_CALLBACK(on_any_setting_changed), &ui_ctx);
-  g_signal_connect(sticky_check, "toggled", G_CALLBACK(on_any_setting_changed),
-                   &ui_ctx);
-  g_signal_connect(typo_check, "toggled", G_CALLBACK(on_any_setting_changed),
-                   &ui_ctx);
-  g_signal_connect(typo_diff_spin, "value-changed",
-                   G_CALLBACK(on_any_setting_changed), &ui_ctx);
+  gtk_grid_attach(GTK_GRID(auto_grid), typo_diff_desc, 0, 13, 2, 1);
+
+  ctx->threshold_spin = GTK_SPIN_BUTTON(threshold_spin);
+  ctx->min_word_spin = GTK_SPIN_BUTTON(min_word_spin);
+  ctx->min_score_spin = GTK_SPIN_BUTTON(min_score_spin);
+  ctx->max_rollback_words_spin = GTK_SPIN_BUTTON(rollback_spin);
+  ctx->sticky_shift_check = GTK_TOGGLE_BUTTON(sticky_check);
+  ctx->typo_correction_check = GTK_TOGGLE_BUTTON(typo_check);
+  ctx->max_typo_diff_spin = GTK_SPIN_BUTTON(typo_diff_spin);
+
+  for (GtkWidget *spin : {threshold_spin, min_word_spin, min_score_spin,
+                          rollback_spin, typo_diff_spin}) {
+    g_signal_connect(spin, "value-changed", G_CALLBACK(on_any_setting_changed),
+                     ctx);
+  }
+  for (GtkWidget *check : {sticky_check, typo_check}) {
+    g_signal_connect(check, "toggled", G_CALLBACK(on_any_setting_changed),
+                     ctx);
+  }
 
   gtk_notebook_append_page(GTK_NOTEBOOK(notebook), auto_box,
                            gtk_label_new("Автопереключение"));
@@ -657,69 +476,22 @@ bool SettingsDialog::show(GtkWidget *parent) {
   gtk_grid_attach(GTK_GRID(hotkey_grid), make_left_label("Модификатор:"), 0, 0,
                   1, 1);
   GtkWidget *modifier_combo = gtk_combo_box_text_new();
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(modifier_combo), "leftctrl",
-                            "Left Ctrl");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(modifier_combo), "rightctrl",
-                            "Right Ctrl");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(modifier_combo), "leftalt",
-                            "Left Alt");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(modifier_combo), "rightalt",
-                            "Right Alt");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(modifier_combo), "leftshift",
-                            "Left Shift");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(modifier_combo), "rightshift",
-                            "Right Shift");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(modifier_combo), "leftmeta",
-                            "Left Super");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(modifier_combo), "rightmeta",
-                            "Right Super");
-  gtk_combo_box_set_active_id(GTK_COMBO_BOX(modifier_combo),
-                              initial_settings.modifier.c_str());
+  append_combo_options(modifier_combo, kModifierOptions);
   gtk_grid_attach(GTK_GRID(hotkey_grid), modifier_combo, 1, 0, 1, 1);
 
   // Key combo
   gtk_grid_attach(GTK_GRID(hotkey_grid), make_left_label("Клавиша:"), 0, 1, 1,
                   1);
   GtkWidget *key_combo = gtk_combo_box_text_new();
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "grave",
-                            "` (Grave)");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "space", "Space");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "tab", "Tab");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "backslash",
-                            "\\ (Backslash)");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "capslock",
-                            "Caps Lock");
-
-  // Модификаторы тоже могут выступать "второй клавишей" (Alt+Shift, Ctrl+Alt и
-  // т.п.)
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "leftshift",
-                            "Left Shift");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "rightshift",
-                            "Right Shift");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "leftalt",
-                            "Left Alt");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "rightalt",
-                            "Right Alt");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "leftctrl",
-                            "Left Ctrl");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "rightctrl",
-                            "Right Ctrl");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "leftmeta",
-                            "Left Super");
-  gtk_combo_box_text_append(GTK_COMBO_BOX_TEXT(key_combo), "rightmeta",
-                            "Right Super");
-
-  gtk_combo_box_set_active_id(GTK_COMBO_BOX(key_combo),
-                              initial_settings.key.c_str());
+  append_combo_options(key_combo, kKeyOptions);
   gtk_grid_attach(GTK_GRID(hotkey_grid), key_combo, 1, 1, 1, 1);
 
-  ui_ctx.modifier_combo = GTK_COMBO_BOX(modifier_combo);
-  ui_ctx.key_combo = GTK_COMBO_BOX(key_combo);
+  ctx->modifier_combo = GTK_COMBO_BOX(modifier_combo);
+  ctx->key_combo = GTK_COMBO_BOX(key_combo);
 
-  g_signal_connect(modifier_combo, "changed",
-                   G_CALLBACK(on_any_setting_changed), &ui_ctx);
-  g_signal_connect(key_combo, "changed", G_CALLBACK(on_any_setting_changed),
-                   &ui_ctx);
+  for (GtkWidget *combo : {modifier_combo, key_combo}) {
+    g_signal_connect(combo, "changed", G_CALLBACK(on_any_setting_changed), ctx);
+  }
 
   // Подсказка: какие комбинации применимы в GNOME/X11 + применимость выбранного
   // значения.
@@ -728,7 +500,7 @@ bool SettingsDialog::show(GtkWidget *parent) {
   gtk_label_set_line_wrap(GTK_LABEL(hotkey_hint_label), TRUE);
   gtk_widget_set_margin_top(hotkey_hint_label, 8);
   gtk_box_pack_start(GTK_BOX(hotkey_box), hotkey_hint_label, FALSE, FALSE, 0);
-  ui_ctx.hotkey_hint_label = hotkey_hint_label;
+  ctx->hotkey_hint_label = hotkey_hint_label;
 
   GtkWidget *note_label = make_dim_label(
       "Примечание: это хоткей переключения раскладки, который punto "
@@ -738,6 +510,39 @@ bool SettingsDialog::show(GtkWidget *parent) {
   gtk_widget_set_margin_top(note_label, 8);
   gtk_box_pack_start(GTK_BOX(hotkey_box), note_label, FALSE, FALSE, 0);
 
+  // Текущий системный хоткей (информативно; текст обновляется при каждом
+  // открытии, см. populate_settings_dialog)
+  GtkWidget *sys_label = make_left_label("");
+  gtk_label_set_line_wrap(GTK_LABEL(sys_label), TRUE);
+  gtk_widget_set_margin_top(sys_label, 8);
+  gtk_box_pack_start(GTK_BOX(hotkey_box), sys_label, FALSE, FALSE, 0);
+  ctx->sys_label = sys_label;
+
+  gtk_notebook_append_page(GTK_NOTEBOOK(notebook), hotkey_box,
+                           gtk_label_new("Горячие клавиши"));
+
+  return ctx;
+}
+
+/// Заполняет виджеты значениями настроек и текущим системным хоткеем
+void populate_settings_dialog(SettingsDialogUiContext *ctx,
+                              const SettingsData &settings) {
+  ctx->initial = settings;
+  ctx->suppress_updates = true;
+
+  gtk_spin_button_set_value(ctx->threshold_spin, settings.threshold);
+  gtk_spin_button_set_value(ctx->min_word_spin, settings.min_word_len);
+  gtk_spin_button_set_value(ctx->min_score_spin, settings.min_score);
+  gtk_spin_button_set_value(ctx->max_rollback_words_spin,
+                            settings.max_rollback_words);
+  gtk_toggle_button_set_active(ctx->sticky_shift_check,
+                               settings.sticky_shift_correction_enabled);
+  gtk_toggle_button_set_active(ctx->typo_correction_check,
+                               settings.typo_correction_enabled);
+  gtk_spin_button_set_value(ctx->max_typo_diff_spin, settings.max_typo_diff);
+  set_combo_active_id(ctx->modifier_combo, settings.modifier);
+  set_combo_active_id(ctx->key_combo, settings.key);
+
   // Текущий системный хоткей (информативно)
   const auto sys = SystemInputSettings::read_layout_toggle();
   std::string sys_text;
@@ -752,54 +557,351 @@ bool SettingsDialog::show(GtkWidget *parent) {
     sys_text = "Системный хоткей недоступен: " + sys.error;
   }
 
-  GtkWidget *sys_label = make_left_label(sys_text.c_str());
-  gtk_label_set_line_wrap(GTK_LABEL(sys_label), TRUE);
-  gtk_widget_set_margin_top(sys_label, 8);
-  gtk_box_pack_start(GTK_BOX(hotkey_box), sys_label, FALSE, FALSE, 0);
+  gtk_label_set_text(GTK_LABEL(ctx->sys_label), sys_text.c_str());
 
-  gtk_notebook_append_page(GTK_NOTEBOOK(notebook), hotkey_box,
-                           gtk_label_new("Горячие клавиши"));
+  gtk_notebook_set_current_page(ctx->notebook, 0);
+  ctx->suppress_updates = false;
 
   // Первичное состояние кнопки "Сохранить" + подсказки.
-  update_settings_dialog_state(&ui_ctx);
+  update_settings_dialog_state(ctx);
+}
+
+/// Вспомогательная функция trim
+std::string trim(const std::string &str) {
+  size_t start = str.find_first_not_of(" \t\r\n");
+  if (start == std::string::npos)
+    return "";
+  size_t end = str.find_last_not_of(" \t\r\n");
+  return str.substr(start, end - start + 1);
+}
+
+/// Парсит значение после двоеточия
+std::string parse_value(const std::string &line) {
+  auto pos = line.find(':');
+  if (pos == std::string::npos)
+    return "";
+  return trim(line.substr(pos + 1));
+}
+
+/// Извлекает ключ (до первого двоеточия) из строки YAML
+std::string parse_key(const std::string &line) {
+  auto pos = line.find(':');
+  if (pos == std::string::npos)
+    return "";
+  return trim(line.substr(0, pos));
+}
+
+/// Парсит double в независимости от локали (использует C locale)
+bool parse_double_clocale(const std::string &text, double &out) {
+  std::istringstream ss(text);
+  ss.imbue(std::locale::classic());
+  ss >> out;
+  return !ss.fail();
+}
+
+/// Последний разобранный user config (load_settings вызывается и из фонового
+/// потока tray, поэтому под мьютексом)
+struct SettingsCache {
+  std::string path;
+  FileStamp stamp; ///< для инвалидации кэша load_settings()
+  SettingsData settings;
+};
+
+std::mutex g_settings_cache_mutex;
+std::optional<SettingsCache> g_settings_cache;
+
+/// Сериализует все записи user config (GTK-поток диалога и фоновые задания
+/// переключателей меню)
+std::mutex g_settings_write_mutex;
+
+/// Пишет data в path одним буфером и дожидается fsync (для атомарной замены)
+[[nodiscard]] bool write_file_synced(const std::filesystem::path &path,
+                                     std::string_view data) {
+  const int fd = ::open(path.c_str(), O_WRONLY | O_CREAT | O_TRUNC | O_CLOEXEC,
+                        0666);
+  if (fd < 0) {
+    return false;
+  }
+
+  bool ok = true;
+  while (!data.empty()) {
+    const ssize_t n = ::write(fd, data.data(), data.size());
+    if (n < 0) {
+      if (errno == EINTR) {
+        continue;
+      }
+      ok = false;
+      break;
+    }
+    data.remove_prefix(static_cast<std::size_t>(n));
+  }
+
+  if (ok && ::fsync(fd) != 0) {
+    ok = false;
+  }
+  if (::close(fd) != 0) {
+    ok = false;
+  }
+  return ok;
+}
+
+SettingsData parse_settings_file(const std::string &config_path) {
+  SettingsData settings;
+
+  std::ifstream file{config_path};
+  if (!file.is_open()) {
+    return settings;
+  }
+
+  std::string line;
+  std::string section;
+
+  while (std::getline(file, line)) {
+    std::string trimmed = trim(line);
+    if (trimmed.empty() || trimmed[0] == '#')
+      continue;
+
+    // Секции
+    if (trimmed == "hotkey:") {
+      section = "hotkey";
+      continue;
+    }
+    if (trimmed == "auto_switch:") {
+      section = "auto_switch";
+      continue;
+    }
+    if (trimmed == "sound:") {
+      section = "sound";
+      continue;
+    }
+
+    std::string value = parse_value(trimmed);
+    if (value.empty())
+      continue;
+
+    std::string key = parse_key(trimmed);
+    if (key.empty())
+      continue;
+
+    if (section == "hotkey") {
+      if (key == "modifier") {
+        settings.modifier = value;
+      } else if (key == "key") {
+        settings.key = value;
+      }
+    } else if (section == "auto_switch") {
+      if (key == "enabled") {
+        settings.auto_enabled = (value == "true" || value == "1");
+      } else if (key == "threshold") {
+        double v{};
+        if (parse_double_clocale(value, v)) {
+          settings.threshold = v;
+        }
+      } else if (key == "min_word_len") {
+        settings.min_word_len = std::stoi(value);
+      } else if (key == "min_score") {
+        double v{};
+        if (parse_double_clocale(value, v)) {
+          settings.min_score = v;
+        }
+      } else if (key == "max_rollback_words") {
+        settings.max_rollback_words = std::stoi(value);
+      } else if (key == "typo_correction_enabled") {
+        settings.typo_correction_enabled = (value == "true" || value == "1");
+      } else if (key == "max_typo_diff") {
+        settings.max_typo_diff = std::stoi(value);
+      } else if (key == "sticky_shift_correction_enabled") {
+        settings.sticky_shift_correction_enabled =
+            (value == "true" || value == "1");
+      }
+    } else if (section == "sound") {
+      if (key == "enabled") {
+        settings.sound_enabled = (value == "true" || value == "1");
+      }
+    }
+  }
+
+  return settings;
+}
+
+} // namespace
+
+std::string SettingsDialog::get_user_config_path() {
+  const char *home = std::getenv("HOME");
+  if (!home || std::string(home).empty()) {
+    // На всякий случай используем glib, если переменная HOME не прокинута
+    const char *ghome = g_get_home_dir();
+    if (ghome && std::string(ghome).size() > 0) {
+      home = ghome;
+    }
+  }
+
+  if (home) {
+    return std::string(home) + "/" + std::string(kUserConfigRelPath);
+  }
+  return "";
+}
+
+bool SettingsDialog::ensure_user_config() {
+  std::string user_path = get_user_config_path();
+  if (user_path.empty())
+    return false;
+
+  std::ifstream check{user_path};
+  if (check.is_open())
+    return true;
+
+  // Создаём директорию и копируем системный конфиг без запуска mkdir/cp
+  std::error_code ec;
+  const std::filesystem::path user_file{user_path};
+  std::filesystem::create_directories(user_file.parent_path(), ec);
+  if (ec)
+    return false;
+
+  std::filesystem::copy_file(kSystemConfigPath, user_file,
+                             std::filesystem::copy_options::skip_existing, ec);
+  return !ec;
+}
+
+SettingsData SettingsDialog::load_settings() {
+  ensure_user_config();
+  std::string config_path = get_user_config_path();
+  if (config_path.empty()) {
+    return SettingsData{};
+  }
+
+  const auto stamp = stat_file_stamp(config_path);
+  if (!stamp) {
+    return SettingsData{};
+  }
+
+  // Повторные открытия настроек и переключатели меню не перечитывают файл,
+  // пока он не изменился (save_settings пишет через rename → новый inode).
+  std::lock_guard lock{g_settings_cache_mutex};
+  if (g_settings_cache && g_settings_cache->path == config_path &&
+      g_settings_cache->stamp == *stamp) {
+    return g_settings_cache->settings;
+  }
+
+  SettingsData settings = parse_settings_file(config_path);
+  g_settings_cache = SettingsCache{config_path, *stamp, settings};
+  return settings;
+}
+
+bool SettingsDialog::save_settings(const SettingsData &settings) {
+  std::lock_guard<std::mutex> lock(g_settings_write_mutex);
+  return write_settings_file(settings);
+}
+
+bool SettingsDialog::update_settings(
+    const std::function<bool(SettingsData &)> &mutate) {
+  std::lock_guard<std::mutex> lock(g_settings_write_mutex);
+  SettingsData settings = load_settings();
+  if (!mutate(settings)) {
+    return true;
+  }
+  return write_settings_file(settings);
+}
+
+bool SettingsDialog::write_settings_file(const SettingsData &settings) {
+  if (!ensure_user_config()) {
+    return false;
+  }
+
+  std::string config_path_str = get_user_config_path();
+  if (config_path_str.empty()) {
+    return false;
+  }
+
+  std::filesystem::path config_path{config_path_str};
+  std::filesystem::path tmp_path = config_path;
+  // Суффикс PID: два экземпляра tray не пишут в один временный файл.
+  tmp_path += ".tmp." + std::to_string(getpid());
+
+  // Весь конфиг сериализуем в память и пишем одним write() + fsync: на диск
+  // попадает либо старый файл, либо полностью записанный новый.
+  std::ostringstream out;
+  // Гарантируем точку в числах независимо от локали пользователя.
+  out.imbue(std::locale::classic());
+
+  out << "# Punto Switcher Configuration\n";
+  out << "# Автоматически сгенерировано punto-tray\n\n";
+
+  out << "hotkey:\n";
+  out << "  modifier: " << settings.modifier << "\n";
+  out << "  key: " << settings.key << "\n\n";
+
+  out << "auto_switch:\n";
+  out << "  enabled: " << (settings.auto_enabled ? "true" : "false") << "\n";
+  out << "  threshold: " << settings.threshold << "\n";
+  out << "  min_word_len: " << settings.min_word_len << "\n";
+  out << "  min_score: " << settings.min_score << "\n";
+  out << "  max_rollback_words: " << settings.max_rollback_words << "\n";
+  out << "  typo_correction_enabled: "
+      << (settings.typo_correction_enabled ? "true" : "false") << "\n";
+  out << "  max_typo_diff: " << settings.max_typo_diff << "\n";
+  out << "  sticky_shift_correction_enabled: "
+      << (settings.sticky_shift_correction_enabled ? "true" : "false")
+      << "\n\n";
+
+  out << "sound:\n";
+  out << "  enabled: " << (settings.sound_enabled ? "true" : "false") << "\n";
+
+  const std::string blob = out.str();
+
+  if (!write_file_synced(tmp_path, blob)) {
+    std::error_code rm_ec;
+    std::filesystem::remove(tmp_path, rm_ec);
+    return false;
+  }
+
+  // Атомарно заменяем файл (rename в пределах одной ФС атомарен).
+  std::error_code ec;
+  std::filesystem::rename(tmp_path, config_path, ec);
+  if (ec) {
+    // Best-effort cleanup временного файла.
+    std::error_code rm_ec;
+    std::filesystem::remove(tmp_path, rm_ec);
+    return false;
+  }
+
+  return true;
+}
+
+bool SettingsDialog::show(GtkWidget *parent) {
+  // Виджеты создаются при первом открытии и живут до выхода из tray:
+  // повторное открытие только обновляет их значения.
+  static SettingsDialogUiContext *s_ui = nullptr;
+  static bool s_dialog_running = false;
+  if (s_dialog_running) {
+    gtk_window_present(GTK_WINDOW(s_ui->dialog));
+    return false;
+  }
+
+  if (!s_ui) {
+    s_ui = build_settings_dialog();
+  }
+  GtkWidget *dialog = s_ui->dialog;
+
+  // Загружаем текущие настройки
+  const SettingsData initial_settings = load_settings();
+  populate_settings_dialog(s_ui, initial_settings);
+
+  gtk_window_set_transient_for(GTK_WINDOW(dialog),
+                               parent ? GTK_WINDOW(parent) : nullptr);
 
   // Показываем диалог
   gtk_widget_show_all(dialog);
 
+  s_dialog_running = true;
   gint response = gtk_dialog_run(GTK_DIALOG(dialog));
 
   bool saved = false;
   if (response == GTK_RESPONSE_ACCEPT) {
-    SettingsData new_settings = initial_settings;
-
     // Читаем значения из виджетов (без "Звук" и без enable-флага
     // авто-переключения).
-    new_settings.threshold =
-        gtk_spin_button_get_value(GTK_SPIN_BUTTON(threshold_spin));
-    new_settings.min_word_len =
-        gtk_spin_button_get_value_as_int(GTK_SPIN_BUTTON(min_word_spin));
-    new_settings.min_score =
-        gtk_spin_button_get_value(GTK_SPIN_BUTTON(min_score_spin));
-    new_settings.max_rollback_words =
-        gtk_spin_button_get_value_as_int(GTK_SPIN_BUTTON(rollback_spin));
-
-    // Typo correction
-    new_settings.sticky_shift_correction_enabled =
-        gtk_toggle_button_get_active(GTK_TOGGLE_BUTTON(sticky_check));
-    new_settings.typo_correction_enabled =
-        gtk_toggle_button_get_active(GTK_TOGGLE_BUTTON(typo_check));
-    new_settings.max_typo_diff =
-        gtk_spin_button_get_value_as_int(GTK_SPIN_BUTTON(typo_diff_spin));
-
-    const gchar *mod_id =
-        gtk_combo_box_get_active_id(GTK_COMBO_BOX(modifier_combo));
-    const gchar *key_id = gtk_combo_box_get_active_id(GTK_COMBO_BOX(key_combo));
-
-    LayoutToggle selected_hotkey;
-    if (mod_id)
-      selected_hotkey.modifier = mod_id;
-    if (key_id)
-      selected_hotkey.key = key_id;
+    SettingsData new_settings = read_non_hotkey_from_ui(*s_ui);
+    const LayoutToggle selected_hotkey = read_selected_hotkey(*s_ui);
 
     const bool hotkey_changed =
         !selected_hotkey.modifier.empty() && !selected_hotkey.key.empty() &&
@@ -823,7 +925,17 @@ bool SettingsDialog::show(GtkWidget *parent) {
     const bool dirty =
         non_hotkey_changed(new_settings, initial_settings) || save_hotkey;
     if (dirty) {
-      saved = save_settings(new_settings);
+      // Enable-флаги диалог не редактирует: берём их из файла под той же
+      // блокировкой, чтобы не затереть переключение из меню, сделанное пока
+      // диалог был открыт.
+      saved = update_settings([&new_settings](SettingsData &current) {
+        const bool auto_enabled = current.auto_enabled;
+        const bool sound_enabled = current.sound_enabled;
+        current = new_settings;
+        current.auto_enabled = auto_enabled;
+        current.sound_enabled = sound_enabled;
+        return true;
+      });
 
       // Хоткей применяем в систему только если он изменён и применим.
       if (saved && hotkey_changed && backend_known && hotkey_applicable) {
@@ -840,18 +952,17 @@ bool SettingsDialog::show(GtkWidget *parent) {
             msg += res.error;
           }
 
-          GtkWidget *warn = gtk_message_dialog_new(
-              GTK_WINDOW(dialog), GTK_DIALOG_MODAL, GTK_MESSAGE_WARNING,
-              GTK_BUTTONS_OK, "%s", msg.c_str());
-          (void)gtk_dialog_run(GTK_DIALOG(warn));
-          gtk_widget_destroy(warn);
+          // Сам диалог настроек сейчас будет скрыт: предупреждение
+          // привязываем к его родителю.
+          show_message_async(parent ? GTK_WINDOW(parent) : nullptr,
+                             GTK_MESSAGE_WARNING, msg);
         }
       }
     }
   }
 
-  gtk_widget_destroy(dialog);
-  s_dialog_instance = nullptr;
+  gtk_widget_hide(dialog);
+  s_dialog_running = false;
   return saved;
 }
 
@@ -5,9 +5,11 @@
 
 #include "punto/tray_app.hpp"
 #include "punto/settings_dialog.hpp"
+#include "punto/tray_messages.hpp"
 
-#include <cstdlib>
+#include <memory>
 #include <string>
+#include <thread>
 
 #include <glib.h>
 
@@ -39,8 +41,8 @@ gboolean on_about_label_activate_link(GtkLabel *label, gchar *uri,
   return TRUE; // мы обработали ссылку
 }
 
-/// Интервал обновления статуса (мс)
-constexpr guint kStatusUpdateIntervalMs = 2000;
+/// Интервал обновления статуса (с)
+constexpr guint kStatusUpdateIntervalSec = 2;
 
 /// Имена иконок (используем стандартные темы)
 constexpr const char *kIconEnabled = "input-keyboard";
@@ -50,31 +52,93 @@ constexpr const char *kIconUnknown = "dialog-question";
 /// ID приложения для AppIndicator
 constexpr const char *kAppIndicatorId = "punto-switcher";
 
-bool apply_settings_change_with_reload(const SettingsData &old_settings,
-                                       const SettingsData &new_settings) {
-  if (!SettingsDialog::save_settings(new_settings)) {
-    return false;
+/// Выставляет флаг переключателя меню (звук или автопереключение)
+void set_toggle_flag(SettingsData &settings, bool sound_toggle, bool enabled) {
+  if (sound_toggle) {
+    settings.sound_enabled = enabled;
+  } else {
+    settings.auto_enabled = enabled;
   }
+}
 
-  const std::string cfg_path = SettingsDialog::get_user_config_path();
-  if (cfg_path.empty()) {
-    (void)SettingsDialog::save_settings(old_settings);
+/// Сохраняет флаг переключателя и отправляет RELOAD; при ошибке RELOAD
+/// возвращает в конфиге прежнее значение флага. old_settings — настройки до
+/// изменения.
+bool apply_toggle_with_reload(bool sound_toggle, bool enabled,
+                              SettingsData &old_settings) {
+  // Чтение и запись — одна операция под мьютексом записи конфига, поэтому
+  // параллельное сохранение из диалога не теряется.
+  bool changed = false;
+  if (!SettingsDialog::update_settings([&](SettingsData &settings) {
+        old_settings = settings;
+        set_toggle_flag(settings, sound_toggle, enabled);
+        changed = settings != old_settings;
+        return changed;
+      })) {
     return false;
   }
 
-  if (!IpcClient::reload_config(cfg_path)) {
-    (void)SettingsDialog::save_settings(old_settings);
-    return false;
+  // Звук сервис берёт только из конфига: если там уже нужное значение,
+  // RELOAD не нужен. Для автопереключения RELOAD отправляем всегда: он
+  // синхронизирует runtime-статус с конфигом.
+  if (sound_toggle && !changed) {
+    return true;
   }
 
-  return true;
+  const std::string cfg_path = SettingsDialog::get_user_config_path();
+  if (!cfg_path.empty() && IpcClient::reload_config(cfg_path)) {
+    return true;
+  }
+
+  if (changed) {
+    // Откатываем только свой флаг, не трогая остальные поля.
+    const bool previous = sound_toggle ? old_settings.sound_enabled
+                                       : old_settings.auto_enabled;
+    (void)SettingsDialog::update_settings([&](SettingsData &settings) {
+      set_toggle_flag(settings, sound_toggle, previous);
+      return true;
+    });
+  }
+  return false;
 }
 
 } // namespace
 
+/// Задание фонового применения переключателя меню (см. apply_toggle_async)
+struct ToggleApplyJob {
+  bool sound_toggle = false;
+  bool enabled = false;
+
+  // Заполняется рабочим потоком
+  SettingsData old_settings;
+  bool ok = false;
+  ServiceStatus status = ServiceStatus::Unknown;
+};
+
+/// Задание фонового RELOAD после сохранения в диалоге настроек
+struct SettingsReloadJob {
+  // Заполняется рабочим потоком
+  bool ok = false;
+  bool service_available = true; ///< Проверяется только если RELOAD не прошёл
+  ServiceStatus status = ServiceStatus::Unknown;
+  bool sound_enabled = true;
+};
+
 TrayApp::TrayApp() = default;
 
 TrayApp::~TrayApp() {
+  // Выход мог случиться во время фонового задания: дожидаемся его, пока живы
+  // TrayApp и статические кэши настроек/IPC, и снимаем его callback, который
+  // main loop уже не выполнит.
+  if (toggle_worker_.joinable()) {
+    toggle_worker_.join();
+  }
+  if (settings_reload_worker_.joinable()) {
+    settings_reload_worker_.join();
+  }
+  while (g_idle_remove_by_data(this)) {
+  }
+
   if (status_timer_id_ != 0) {
     g_source_remove(status_timer_id_);
   }
@@ -84,11 +148,21 @@ TrayApp::~TrayApp() {
   }
 
   if (indicator_) {
+    // Явно снимаем иконку с трея: хост узнаёт об этом сразу по D-Bus, даже
+    // если на индикатор ещё держит ссылку кто-то, кроме нас.
+    app_indicator_set_status(indicator_, APP_INDICATOR_STATUS_PASSIVE);
     g_object_unref(indicator_);
   }
 }
 
 bool TrayApp::initialize() {
+  // Индикатор, меню и таймер создаются один раз: повторный вызов только
+  // возвращает иконку в трей, не пересоздавая GObject'ы и D-Bus регистрацию.
+  if (indicator_) {
+    app_indicator_set_status(indicator_, APP_INDICATOR_STATUS_ACTIVE);
+    return true;
+  }
+
   // Создаём AppIndicator
   indicator_ = app_indicator_new(kAppIndicatorId, kIconUnknown,
                                  APP_INDICATOR_CATEGORY_APPLICATION_STATUS);
@@ -116,9 +190,11 @@ bool TrayApp::initialize() {
   sound_enabled_ = SettingsDialog::load_settings().sound_enabled;
   update_sound_toggle_state();
 
-  // Запускаем периодическое обновление статуса
+  // Запускаем периодическое обновление статуса. Секундный таймер GLib
+  // выравнивает пробуждения с другими такими источниками main loop (и других
+  // процессов), вместо отдельного пробуждения tray каждые 2000ms.
   status_timer_id_ =
-      g_timeout_add(kStatusUpdateIntervalMs, on_status_update, this);
+      g_timeout_add_seconds(kStatusUpdateIntervalSec, on_status_update, this);
 
   return true;
 }
@@ -186,7 +262,13 @@ void TrayApp::update_icon() {
     break;
   }
 
+  // Меню и пункты создаются один раз; при обновлении трогаем только то,
+  // что реально поменялось (смена иконки — это D-Bus сигнал хосту трея).
+  if (icon_name == applied_icon_) {
+    return;
+  }
   app_indicator_set_icon(indicator_, icon_name);
+  applied_icon_ = icon_name;
 }
 
 void TrayApp::update_auto_toggle_state() {
@@ -231,23 +313,7 @@ void TrayApp::on_auto_toggle_changed(GtkCheckMenuItem *item,
     return;
   }
 
-  const bool enabled = gtk_check_menu_item_get_active(item);
-
-  SettingsData old_settings = SettingsDialog::load_settings();
-  SettingsData new_settings = old_settings;
-  new_settings.auto_enabled = enabled;
-
-  if (!apply_settings_change_with_reload(old_settings, new_settings)) {
-    // Откатываем UI в исходное состояние.
-    app->suppress_menu_signals_ = true;
-    gtk_check_menu_item_set_active(item, old_settings.auto_enabled);
-    app->suppress_menu_signals_ = false;
-    return;
-  }
-
-  app->current_status_ = IpcClient::get_status();
-  app->update_icon();
-  app->update_auto_toggle_state();
+  app->apply_toggle_async(false, gtk_check_menu_item_get_active(item));
 }
 
 void TrayApp::on_sound_toggle_changed(GtkCheckMenuItem *item,
@@ -257,31 +323,77 @@ void TrayApp::on_sound_toggle_changed(GtkCheckMenuItem *item,
     return;
   }
 
-  const bool enabled = gtk_check_menu_item_get_active(item);
+  app->apply_toggle_async(true, gtk_check_menu_item_get_active(item));
+}
+
+void TrayApp::apply_toggle_async(bool sound_toggle, bool enabled) {
+  // Пока идёт сохранение, не даём запустить второе поверх него.
+  gtk_widget_set_sensitive(toggle_item_, FALSE);
+  gtk_widget_set_sensitive(sound_toggle_item_, FALSE);
+
+  if (toggle_job_) {
+    // Предыдущее изменение ещё применяется (пункты меню и так неактивны).
+    return;
+  }
+  if (toggle_worker_.joinable()) {
+    toggle_worker_.join(); // уже завершился: его результат обработан
+  }
 
-  SettingsData old_settings = SettingsDialog::load_settings();
-  SettingsData new_settings = old_settings;
-  new_settings.sound_enabled = enabled;
+  toggle_job_ = std::make_unique<ToggleApplyJob>();
+  ToggleApplyJob *job = toggle_job_.get();
+  job->sound_toggle = sound_toggle;
+  job->enabled = enabled;
 
-  if (!apply_settings_change_with_reload(old_settings, new_settings)) {
+  // Запись конфига и IPC не трогают GTK, поэтому выполняются вне UI-потока.
+  toggle_worker_ = std::thread([this, job] {
+    job->ok = apply_toggle_with_reload(job->sound_toggle, job->enabled,
+                                       job->old_settings);
+    // RELOAD может также синхронизировать статус автопереключения с конфигом.
+    job->status = IpcClient::get_status();
+
+    g_idle_add(&TrayApp::on_toggle_applied, this);
+  });
+}
+
+gboolean TrayApp::on_toggle_applied(gpointer user_data) {
+  auto *app = static_cast<TrayApp *>(user_data);
+  const std::unique_ptr<ToggleApplyJob> job = std::move(app->toggle_job_);
+
+  gtk_widget_set_sensitive(app->toggle_item_, TRUE);
+  gtk_widget_set_sensitive(app->sound_toggle_item_, TRUE);
+
+  if (!job->ok) {
     // Откатываем UI в исходное состояние.
     app->suppress_menu_signals_ = true;
-    gtk_check_menu_item_set_active(item, old_settings.sound_enabled);
+    if (job->sound_toggle) {
+      gtk_check_menu_item_set_active(
+          GTK_CHECK_MENU_ITEM(app->sound_toggle_item_),
+          job->old_settings.sound_enabled);
+    } else {
+      gtk_check_menu_item_set_active(GTK_CHECK_MENU_ITEM(app->toggle_item_),
+                                     job->old_settings.auto_enabled);
+    }
     app->suppress_menu_signals_ = false;
-    return;
+    return G_SOURCE_REMOVE;
   }
 
-  app->sound_enabled_ = new_settings.sound_enabled;
+  if (!job->sound_toggle) {
+    app->current_status_ = job->status;
+    app->update_icon();
+    app->update_auto_toggle_state();
+    return G_SOURCE_REMOVE;
+  }
+
+  app->sound_enabled_ = job->enabled;
   app->update_sound_toggle_state();
 
-  // RELOAD может также синхронизировать статус автопереключения с конфигом.
-  ServiceStatus new_status = IpcClient::get_status();
-  if (new_status != ServiceStatus::Unknown &&
-      new_status != app->current_status_) {
-    app->current_status_ = new_status;
+  if (job->status != ServiceStatus::Unknown &&
+      job->status != app->current_status_) {
+    app->current_status_ = job->status;
     app->update_icon();
     app->update_auto_toggle_state();
   }
+  return G_SOURCE_REMOVE;
 }
 
 void TrayApp::on_settings_clicked(GtkMenuItem *item, gpointer user_data) {
@@ -291,21 +403,76 @@ void TrayApp::on_settings_clicked(GtkMenuItem *item, gpointer user_data) {
   // Показываем диалог настроек
   bool saved = SettingsDialog::show(nullptr);
 
-  if (saved) {
-    // Автоматически применяем настройки после сохранения
+  if (!saved) {
+    return;
+  }
+
+  // Автоматически применяем настройки после сохранения.
+  app->start_settings_reload();
+}
+
+void TrayApp::start_settings_reload() {
+  if (settings_reload_job_) {
+    // Повторный Save во время RELOAD: сервис перечитает конфиг ещё раз,
+    // когда текущий RELOAD завершится, а не параллельно с ним.
+    settings_reload_queued_ = true;
+    return;
+  }
+  if (settings_reload_worker_.joinable()) {
+    settings_reload_worker_.join(); // уже завершился: его результат обработан
+  }
+
+  // RELOAD и запрос статуса идут в фоне: диалог закрывается сразу, без
+  // ожидания сервиса.
+  settings_reload_job_ = std::make_unique<SettingsReloadJob>();
+  SettingsReloadJob *job = settings_reload_job_.get();
+  settings_reload_worker_ = std::thread([this, job] {
     const std::string cfg_path = SettingsDialog::get_user_config_path();
-    bool success = IpcClient::reload_config(cfg_path);
-    if (success) {
-      // Обновляем статус
-      app->current_status_ = IpcClient::get_status();
-      app->update_icon();
-      app->update_auto_toggle_state();
+    job->ok = IpcClient::reload_config(cfg_path);
+    if (job->ok) {
+      job->status = IpcClient::get_status();
+    } else {
+      // Отличаем "сервис не запущен" от "сервис отверг конфиг": достаточно
+      // connect() к сокетам, без отправки команд.
+      job->service_available = IpcClient::is_service_available();
     }
+    job->sound_enabled = SettingsDialog::load_settings().sound_enabled;
+
+    g_idle_add(&TrayApp::on_settings_reloaded, this);
+  });
+}
+
+gboolean TrayApp::on_settings_reloaded(gpointer user_data) {
+  auto *app = static_cast<TrayApp *>(user_data);
+  std::unique_ptr<SettingsReloadJob> job =
+      std::move(app->settings_reload_job_);
+
+  if (job->ok) {
+    // Обновляем статус
+    app->current_status_ = job->status;
+    app->update_icon();
+    app->update_auto_toggle_state();
+  } else if (!app->settings_reload_queued_) {
+    // Настройки уже записаны в файл: сообщаем, что сервис их пока не
+    // применил (вместо молчаливого "успеха").
+    show_message_async(
+        nullptr, GTK_MESSAGE_WARNING,
+        job->service_available
+            ? "Настройки сохранены, но сервис punto не смог их применить.\n"
+              "Подробности — в журнале сервиса (journalctl)."
+            : "Настройки сохранены, но сервис punto не запущен.\n"
+              "Они будут применены при его запуске.");
+  }
+
+  // Обновляем статус звука из конфига (даже если сервис сейчас недоступен)
+  app->sound_enabled_ = job->sound_enabled;
+  app->update_sound_toggle_state();
 
-    // Обновляем статус звука из конфига (даже если сервис сейчас недоступен)
-    app->sound_enabled_ = SettingsDialog::load_settings().sound_enabled;
-    app->update_sound_toggle_state();
+  if (app->settings_reload_queued_) {
+    app->settings_reload_queued_ = false;
+    app->start_settings_reload();
   }
+  return G_SOURCE_REMOVE;
 }
 
 void TrayApp::on_about_clicked(GtkMenuItem *item, gpointer user_data) {
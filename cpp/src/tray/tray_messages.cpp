@@ -0,0 +1,20 @@
+/**
+ * @file tray_messages.cpp
+ * @brief Реализация сообщений пользователю из tray-приложения
+ */
+
+#include "punto/tray_messages.hpp"
+
+namespace punto {
+
+void show_message_async(GtkWindow *parent, GtkMessageType type,
+                        const std::string &text) {
+  GtkWidget *msg = gtk_message_dialog_new(parent, GTK_DIALOG_MODAL, type,
+                                          GTK_BUTTONS_OK, "%s", text.c_str());
+  gtk_window_set_position(GTK_WINDOW(msg), GTK_WIN_POS_CENTER);
+  g_signal_connect_swapped(msg, "response", G_CALLBACK(gtk_widget_destroy),
+                           msg);
+  gtk_widget_show(msg);
+}
+
+} // namespace punto
@@ -8,7 +8,6 @@
 
 #include <algorithm>
 #include <array>
-#include <cstring>
 #include <iostream>
 #include <string_view>
 #include <vector>
@@ -487,14 +486,8 @@ std::vector<KeyEntry> ascii_to_keys(std::string_view ascii, bool preserve_case,
       c = static_cast<char>(c + 32); // К нижнему регистру для поиска scancode
     }
 
-    // Ищем scancode для символа
-    ScanCode code = 0;
-    for (std::size_t sc = 0; sc < kScancodeToChar.size(); ++sc) {
-      if (kScancodeToChar[sc] == c) {
-        code = static_cast<ScanCode>(sc);
-        break;
-      }
-    }
+    // Ищем scancode для символа (обратная constexpr таблица)
+    const ScanCode code = char_to_scancode(c);
 
     if (code != 0) {
       result.emplace_back(code, shifted);
@@ -504,50 +497,6 @@ std::vector<KeyEntry> ascii_to_keys(std::string_view ascii, bool preserve_case,
   return result;
 }
 
-// ===========================================================================
-// Таблица соответствия QWERTY <-> Кириллица
-// ===========================================================================
-
-namespace {
-
-/// Таблица соответствия: QWERTY (ASCII lower) -> UTF-8 кириллица (lower)
-struct QwertyToCyrillic {
-  char qwerty;
-  const char *utf8;
-};
-
-// clang-format off
-constexpr QwertyToCyrillic kQwertyToCyrMap[] = {
-    {'f', "а"}, {',', "б"}, {'d', "в"}, {'u', "г"}, {'l', "д"},
-    {'t', "е"}, {';', "ж"}, {'p', "з"}, {'b', "и"}, {'q', "й"},
-    {'r', "к"}, {'k', "л"}, {'v', "м"}, {'y', "н"}, {'j', "о"},
-    {'g', "п"}, {'h', "р"}, {'c', "с"}, {'n', "т"}, {'e', "у"},
-    {'a', "ф"}, {'[', "х"}, {'w', "ц"}, {'x', "ч"}, {'i', "ш"},
-    {'o', "щ"}, {']', "ъ"}, {'s', "ы"}, {'m', "ь"}, {'\'', "э"},
-    {'.', "ю"}, {'z', "я"}, {'`', "ё"}, {'/', "."},
-};
-// clang-format on
-
-/// Таблица соответствия: UTF-8 кириллица (lower) -> QWERTY (ASCII lower)
-struct CyrillicToQwerty {
-  const char *utf8;
-  char qwerty;
-};
-
-// clang-format off
-constexpr CyrillicToQwerty kCyrToQwertyMap[] = {
-    {"а", 'f'}, {"б", ','}, {"в", 'd'}, {"г", 'u'}, {"д", 'l'},
-    {"е", 't'}, {"ж", ';'}, {"з", 'p'}, {"и", 'b'}, {"й", 'q'},
-    {"к", 'r'}, {"л", 'k'}, {"м", 'v'}, {"н", 'y'}, {"о", 'j'},
-    {"п", 'g'}, {"р", 'h'}, {"с", 'c'}, {"т", 'n'}, {"у", 'e'},
-    {"ф", 'a'}, {"х", '['}, {"ц", 'w'}, {"ч", 'x'}, {"ш", 'i'},
-    {"щ", 'o'}, {"ъ", ']'}, {"ы", 's'}, {"ь", 'm'}, {"э", '\''},
-    {"ю", '.'}, {"я", 'z'}, {"ё", '`'}, {".", '/'},
-};
-// clang-format on
-
-} // anonymous namespace
-
 std::string keys_to_utf8(std::span<const KeyEntry> word, bool is_english) {
   std::string result;
   // UTF-8 кириллица = 2 байта на символ
@@ -574,17 +523,16 @@ std::string keys_to_utf8(std::span<const KeyEntry> word, bool is_english) {
         result += c;
       }
     } else {
-      // Для русского — конвертируем в кириллицу
-      bool found = false;
-      for (const auto &map : kQwertyToCyrMap) {
-        if (map.qwerty == c) {
-          result += map.utf8;
-          found = true;
-          break;
-        }
+      // Для русского — конвертируем в кириллицу по общей таблице раскладки
+      // (если клавиша не даёт букву — пропускаем). Единственная не-буква —
+      // '/' (точка на ЙЦУКЕН).
+      if (c == '/') {
+        result += '.';
+      } else {
+        const std::string_view cyr =
+            kQwertyToCyrLower[static_cast<unsigned char>(c)];
+        result += cyr;
       }
-      // Если не нашли в таблице — пропускаем
-      (void)found;
     }
   }
 
@@ -616,15 +564,15 @@ std::vector<KeyEntry> utf8_to_keys(std::string_view utf8, bool is_english,
     } else {
       // Для русского — ищем UTF-8 кириллицу
       // UTF-8 кириллица = 2 байта (0xD0 или 0xD1 + второй байт)
-      if (i + 1 < utf8.size()) {
-        for (const auto &map : kCyrToQwertyMap) {
-          std::size_t len = std::strlen(map.utf8);
-          if (i + len <= utf8.size() &&
-              std::memcmp(utf8.data() + i, map.utf8, len) == 0) {
-            qwerty_char = map.qwerty;
-            char_len = len;
-            break;
-          }
+      // Единственная не-буква раскладки — точка (клавиша '/').
+      if (utf8[i] == '.') {
+        qwerty_char = '/';
+      } else if (i + 1 < utf8.size()) {
+        const int idx = cyrillic_index(utf8.substr(i, 2));
+        if (idx >= 0 && idx < static_cast<int>(kCyrToQwertyLower.size()) &&
+            kCyrToQwertyLower[static_cast<std::size_t>(idx)] != '\0') {
+          qwerty_char = kCyrToQwertyLower[static_cast<std::size_t>(idx)];
+          char_len = 2;
         }
       }
 
@@ -642,17 +590,7 @@ std::vector<KeyEntry> utf8_to_keys(std::string_view utf8, bool is_english,
 
     if (qwerty_char != '\0') {
       // Ищем scancode для QWERTY символа
-      ScanCode code = 0;
-      for (std::size_t sc = 0; sc < kScancodeToChar.size(); ++sc) {
-        char table_c = kScancodeToChar[sc];
-        if (table_c >= 'A' && table_c <= 'Z') {
-          table_c = static_cast<char>(table_c + 32);
-        }
-        if (table_c == qwerty_char) {
-          code = static_cast<ScanCode>(sc);
-          break;
-        }
-      }
+      const ScanCode code = char_to_scancode(qwerty_char);
 
       if (code != 0) {
         bool shifted = false;
@@ -68,12 +68,12 @@ private:
 }
 
 [[nodiscard]] std::string trim_copy(std::string s) {
-  while (!s.empty() && is_ascii_space(s.front())) {
-    s.erase(s.begin());
-  }
   while (!s.empty() && is_ascii_space(s.back())) {
     s.pop_back();
   }
+  // Ведущие пробелы удаляем одним erase (а не по одному символу с начала)
+  const auto first = std::find_if_not(s.begin(), s.end(), is_ascii_space);
+  s.erase(s.begin(), first);
   return s;
 }
 
@@ -127,7 +127,9 @@ std::string exec_command(const std::string &cmd, int timeout_seconds = 2) {
   std::string timed_cmd =
       "timeout " + std::to_string(timeout_seconds) + "s " + cmd;
 
-  FILE *pipe = popen(timed_cmd.c_str(), "r");
+  // "e" = O_CLOEXEC на нашем конце pipe: параллельные fork/exec (звук)
+  // не должны его наследовать.
+  FILE *pipe = popen(timed_cmd.c_str(), "re");
   if (!pipe)
     return "";
 
@@ -500,6 +502,11 @@ X11Session::find_active_session_loginctl() {
     return std::nullopt;
   }
 
+  std::lock_guard<std::mutex> lock(session_cache_mutex_);
+
+  std::optional<ActiveSession> found;
+  std::unordered_map<std::string, SessionProps> seen;
+
   for (const auto &line : split_lines(out)) {
     std::istringstream iss(line);
     std::string sid;
@@ -518,46 +525,69 @@ X11Session::find_active_session_loginctl() {
       continue;
     }
 
+    // Сессия уже инспектировалась: Greeter/manager сессии не используем и
+    // повторно не опрашиваем; для user-сессий достаточно узнать Active.
+    const auto cached = session_props_cache_.find(sid);
+    const bool known = (cached != session_props_cache_.end());
+    if (known && !cached->second.candidate) {
+      seen.insert(*cached);
+      continue;
+    }
+    if (found) {
+      // Активная уже найдена: остальные сессии только помечаем как живые.
+      if (known) {
+        seen.insert(*cached);
+      }
+      continue;
+    }
+
     const std::string show = exec_command(
         "loginctl show-session " + sid +
-        " -p Active -p Class -p Name -p Leader --no-pager 2>/dev/null");
+        (known ? std::string{" -p Active --no-pager 2>/dev/null"}
+               : std::string{" -p Active -p Class -p Name -p Leader "
+                             "--no-pager 2>/dev/null"}));
     if (show.empty()) {
       continue;
     }
 
     auto kv = parse_key_value_lines(show);
 
-    const auto it_active = kv.find("Active");
-    const auto it_class = kv.find("Class");
-    const auto it_name = kv.find("Name");
-    const auto it_leader = kv.find("Leader");
+    SessionProps props;
+    if (known) {
+      props = cached->second;
+    } else {
+      const auto it_class = kv.find("Class");
+      const auto it_name = kv.find("Name");
+      const auto it_leader = kv.find("Leader");
+
+      const std::string cls = (it_class != kv.end()) ? it_class->second : "";
+      props.name = (it_name != kv.end()) ? it_name->second : user;
+      const std::string leader =
+          (it_leader != kv.end()) ? it_leader->second : "";
+      if (is_digits(leader)) {
+        props.leader_pid = leader;
+      }
+      props.candidate = (cls == "user") && !props.name.empty() &&
+                        !is_greeter_username(props.name);
+    }
+    seen.emplace(sid, props);
 
+    const auto it_active = kv.find("Active");
     const std::string active = (it_active != kv.end()) ? it_active->second : "";
-    const std::string cls = (it_class != kv.end()) ? it_class->second : "";
-    const std::string name = (it_name != kv.end()) ? it_name->second : user;
-    const std::string leader = (it_leader != kv.end()) ? it_leader->second : "";
-
-    if (active != "yes") {
-      continue;
-    }
-    if (cls != "user") {
-      // Greeter/manager сессии не используем.
-      continue;
-    }
-    if (name.empty() || is_greeter_username(name)) {
+    if (active != "yes" || !props.candidate) {
       continue;
     }
 
     ActiveSession s;
     s.session_id = sid;
-    s.username = name;
-    if (is_digits(leader)) {
-      s.leader_pid = leader;
-    }
-    return s;
+    s.username = props.name;
+    s.leader_pid = props.leader_pid;
+    found = std::move(s);
   }
 
-  return std::nullopt;
+  // Исчезнувшие сессии из кеша выбрасываются.
+  session_props_cache_ = std::move(seen);
+  return found;
 }
 
 std::optional<std::string> X11Session::find_active_user_fallback() {
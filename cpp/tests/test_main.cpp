@@ -1,11 +1,16 @@
+#include "punto/concurrent_queue.hpp"
 #include "punto/input_buffer.hpp"
+#include "punto/key_entry_text.hpp"
 #include "punto/ipc_server.hpp"
 #include "punto/history_manager.hpp"
+#include "punto/layout_analyzer.hpp"
 #include "punto/layout_sync_sound.hpp"
 #include "punto/control_plane_state.hpp"
 #include "punto/runtime_tuning.hpp"
+#include "punto/terminal_detection.hpp"
 #include "punto/text_processor.hpp"
 #include "punto/typo_corrector.hpp"
+#include "punto/undo_detector.hpp"
 #include "punto/config.hpp"
 
 #include <sys/socket.h>
@@ -84,10 +89,117 @@ void test_text_processor() {
   expect(utf8_codepoint_count("привет") == 6, "utf8 cyrillic");
   expect(utf8_codepoint_count("aпривет") == 7, "utf8 mixed");
 
+  expect(count_letters("ab привет, 12") == std::pair<std::size_t, std::size_t>{6, 8},
+         "count letters mixed");
   expect(invert_layout("ghbdtn") == "привет", "invert en->ru");
   expect(invert_layout("привет") == "ghbdtn", "invert ru->en");
+  expect(en_to_ru("Ghbdtn, vbh~") == "Приветб мирЁ", "en->ru upper/punct");
+  expect(ru_to_en("Ё№.") == "~#/", "ru->en upper/numero/punct");
   expect(invert_case("AbC") == "aBc", "invert case");
+  expect(invert_case("ПрИвЁт ёЖ, є") == "пРиВёТ Ёж, є",
+         "invert case cyrillic");
   expect(transliterate("привет") == "privet", "transliterate");
+  expect(cyr_to_lat("Щука съела ёжика") == "Shchuka sela yozhika",
+         "transliterate multi-char and hard sign");
+  expect(lat_to_cyr("Shchuka yozhik SHCH") == "Щука ёжик Щ",
+         "reverse transliterate longest match");
+}
+
+void test_key_entry_text() {
+  const std::vector<KeyEntry> entries{{KEY_H, true}, {KEY_I, false},
+                                      {KEY_1, true}, {KEY_SPACE, true},
+                                      {KEY_COMMA, false}};
+  expect(key_entries_to_qwerty(entries) == "Hi! ,", "key entries to qwerty");
+  expect(key_entries_to_visible_text(entries, 1) == "Рш! б",
+         "key entries to visible RU text");
+
+  const std::vector<KeyEntry> unmapped{{KEY_A, false}, {KEY_F1, false}};
+  expect(!key_entries_to_visible_text_checked(unmapped, 0).has_value(),
+         "unmapped scancode fails checked conversion");
+
+  bool tables_match = true;
+  for (std::uint16_t code = 0; code < KEY_CNT; ++code) {
+    for (const bool shifted : {false, true}) {
+      const std::vector<KeyEntry> one{{code, shifted}};
+      const std::string qwerty = key_entries_to_qwerty(one);
+      for (const int layout : {0, 1}) {
+        const auto visible = key_entries_to_visible_text_checked(one, layout);
+        tables_match &=
+            qwerty.empty()
+                ? !visible.has_value()
+                : (visible == qwerty_to_visible_text(qwerty, layout) &&
+                   key_entries_to_visible_text(one, layout) == *visible);
+      }
+    }
+  }
+  expect(tables_match, "visible table matches qwerty + en_to_ru");
+}
+
+void test_terminal_detection() {
+  expect(is_terminal_wm_class("gnome-terminal-server", "Gnome-terminal"),
+         "gnome terminal detected");
+  expect(is_terminal_wm_class("", "org.wezfurlong.WezTerm"),
+         "terminal detected by class only");
+  expect(is_terminal_wm_class("KITTY", ""), "case-insensitive match");
+  expect(!is_terminal_wm_class("navigator", "Firefox"), "browser not terminal");
+  expect(!is_terminal_wm_class("", ""), "empty wm_class not terminal");
+  // Токен не должен находиться на стыке instance/class.
+  expect(!is_terminal_wm_class("bar-ki", "ttyfoo"), "no match across strings");
+  expect(is_terminal_wm_class(std::string(300, 'x') + "Alacritty", "x"),
+         "long wm_class still detected");
+}
+
+void test_modifier_state() {
+  ModifierState mods;
+  mods.set(KEY_LEFTCTRL, true);
+  mods.set(KEY_RIGHTALT, true);
+  expect(mods.any_ctrl() && mods.any_alt() && !mods.any_shift(),
+         "modifier mask any_*");
+  expect(mods.all_of(kModLeftCtrl | kModRightAlt), "modifier mask all_of");
+  expect(!mods.all_of(kModLeftCtrl | kModLeftAlt),
+         "modifier mask all_of needs every bit");
+
+  mods.set(KEY_LEFTCTRL, false);
+  mods.set(KEY_A, true);
+  expect(!mods.any_ctrl() && mods.mask == kModRightAlt,
+         "modifier release and non-modifier keys");
+  expect(is_modifier(KEY_RIGHTMETA) && !is_modifier(KEY_A), "is_modifier");
+
+  expect(is_word_delimiter(KEY_SPACE) && is_word_delimiter(KEY_TAB) &&
+             !is_word_delimiter(KEY_ENTER),
+         "word delimiter mask");
+  expect(is_word_punctuation(KEY_MINUS) && is_word_punctuation(KEY_SLASH) &&
+             !is_word_punctuation(KEY_A) && !is_word_punctuation(KEY_F12),
+         "word punctuation mask");
+}
+
+void test_layout_analyzer() {
+  AutoSwitchConfig cfg;
+  cfg.min_word_len = 2;
+  LayoutAnalyzer analyzer(cfg);
+
+  // "ghbdtn" = "привет" в EN раскладке
+  const std::vector<KeyEntry> privet{{KEY_G, false}, {KEY_H, false},
+                                     {KEY_B, false}, {KEY_D, false},
+                                     {KEY_T, false}, {KEY_N, false}};
+  const std::vector<KeyEntry> the{{KEY_T, false}, {KEY_H, false},
+                                  {KEY_E, false}};
+
+  const AnalysisResult ru = analyzer.analyze(privet);
+  expect(ru.likely_lang == Language::Russian, "ghbdtn analyzed as RU");
+  expect(analyzer.should_switch(privet) == ru.should_switch,
+         "should_switch matches analyze for ghbdtn");
+
+  const AnalysisResult en = analyzer.analyze(the);
+  expect(en.likely_lang == Language::English, "the analyzed as EN");
+  expect(analyzer.should_switch(the) == en.should_switch,
+         "should_switch matches analyze for the");
+
+  std::size_t en_invalid = 0;
+  std::size_t ru_invalid = 0;
+  LayoutAnalyzer::count_invalid_bigrams(privet, en_invalid, ru_invalid);
+  expect(en_invalid == ru.en_invalid_count && ru_invalid == ru.ru_invalid_count,
+         "analyze reports the same invalid bigram counts");
 }
 
 void test_input_buffer_overflow() {
@@ -179,6 +291,18 @@ void test_typo_corrector() {
   for (std::size_t i = 1; i < sticky.corrected.size(); ++i) {
     expect(!sticky.corrected[i].shifted, "remaining corrected letters lower");
   }
+
+  // Перевод клавиш <-> кириллица идёт по общей таблице раскладки.
+  const std::vector<KeyEntry> privet_dot{
+      {KEY_G, false}, {KEY_H, false}, {KEY_B, false}, {KEY_D, false},
+      {KEY_T, false}, {KEY_N, false}, {KEY_SLASH, false}};
+  expect(keys_to_utf8(privet_dot, /*is_english=*/false) == "привет.",
+         "keys to cyrillic uses shared layout table");
+  const std::vector<KeyEntry> keys =
+      utf8_to_keys("привет.", /*is_english=*/false);
+  expect(keys.size() == privet_dot.size() && keys.back().code == KEY_SLASH &&
+             keys.front().code == KEY_G,
+         "cyrillic to keys maps trailing dot to slash");
 }
 
 void test_history_manager() {
@@ -233,6 +357,23 @@ void test_config_logging_level() {
          "config parsed runtime analysis_threads");
   expect(loaded.config.runtime.max_analysis_threads_per_daemon == 2,
          "config parsed runtime max threads per daemon");
+
+  const ConfigLoadOutcome cached = load_config_checked(config_path);
+  expect(cached.result == ConfigResult::Ok &&
+             cached.config.logging.level == LogLevel::Debug,
+         "unchanged config served from cache");
+
+  {
+    FILE *fp = std::fopen(config_path.c_str(), "w");
+    expect(fp != nullptr, "config rewrite fopen failed");
+    std::fputs("hotkey:\n  modifier: leftctrl\n  key: grave\n", fp);
+    std::fputs("logging:\n  level: error\n", fp);
+    std::fclose(fp);
+  }
+  const ConfigLoadOutcome reloaded = load_config_checked(config_path);
+  expect(reloaded.result == ConfigResult::Ok &&
+             reloaded.config.logging.level == LogLevel::Error,
+         "modified config re-read");
   expect(std::filesystem::remove(config_path), "config removed");
   expect(::rmdir(dir) == 0, "config tmp dir removed");
 }
@@ -273,6 +414,29 @@ void test_x11_threading_regression_guards() {
          "main must initialize Xlib threading support");
 }
 
+void test_boundary_layout_sync_gate() {
+  // На SPACE/TAB раскладка синхронизируется с ОС только для слов, уходящих
+  // в анализ; остальные границы обходятся без X11 round-trip.
+  const std::vector<KeyEntry> privet{{KEY_G, false}, {KEY_H, false},
+                                     {KEY_B, false}, {KEY_D, false},
+                                     {KEY_T, false}, {KEY_N, false}};
+  const std::vector<KeyEntry> short_word{{KEY_A, false}};
+  const std::vector<KeyEntry> with_digit{{KEY_A, false}, {KEY_1, false},
+                                         {KEY_B, false}};
+  const std::vector<KeyEntry> empty;
+
+  expect(LayoutAnalyzer::needs_analysis(privet, 2, true),
+         "regular word is analyzed and syncs layout");
+  expect(!LayoutAnalyzer::needs_analysis(privet, 2, false),
+         "disabled auto-switch skips layout sync");
+  expect(!LayoutAnalyzer::needs_analysis(short_word, 2, true),
+         "short word skips layout sync");
+  expect(!LayoutAnalyzer::needs_analysis(with_digit, 2, true),
+         "word with digit skips layout sync");
+  expect(!LayoutAnalyzer::needs_analysis(empty, 0, true),
+         "empty word (double space) skips layout sync");
+}
+
 void test_runtime_thread_budget() {
   AnalysisThreadBudget budget =
       compute_analysis_thread_budget(/*hardware_threads=*/32,
@@ -297,6 +461,42 @@ void test_runtime_thread_budget() {
   expect(budget.manual_override, "manual override mode");
 }
 
+void test_concurrent_queue_replace() {
+  ConcurrentQueue<int> queue;
+  queue.push(1);
+  queue.push(2);
+  queue.replace(3);
+  expect(queue.size() == 1, "replace keeps a single element");
+
+  int value = 0;
+  expect(queue.try_pop(value) && value == 3, "replace keeps the latest value");
+  expect(!queue.try_pop(value), "queue is empty after popping replaced value");
+}
+
+void test_undo_exclusions_case() {
+  bool table_lowercase = true;
+  for (const char c : kScancodeToChar) {
+    table_lowercase &= !(c >= 'A' && c <= 'Z');
+  }
+  expect(table_lowercase, "scancode table yields lowercase exclusion keys");
+
+  char path_template[] = "/tmp/punto-exclusions-XXXXXX";
+  const int fd = ::mkstemp(path_template);
+  expect(fd >= 0, "exclusions mkstemp failed");
+  const std::string entries = "# comment\nGhbdtn\nntcn \n";
+  expect(::write(fd, entries.data(), entries.size()) ==
+             static_cast<ssize_t>(entries.size()),
+         "exclusions file write");
+  ::close(fd);
+
+  const UndoDetector detector{path_template};
+  expect(detector.exclusion_count() == 2, "exclusions loaded");
+  expect(detector.is_excluded("ghbdtn"), "exclusion keys lowercased on load");
+  expect(detector.is_excluded("ntcn"), "exclusion trailing space trimmed");
+
+  expect(::unlink(path_template) == 0, "exclusions file removed");
+}
+
 void test_control_plane_state_round_trip() {
   char dir_template[] = "/tmp/punto-control-XXXXXX";
   char *dir = ::mkdtemp(dir_template);
@@ -324,6 +524,16 @@ void test_control_plane_state_round_trip() {
   expect(output.enabled == input.enabled, "control plane enabled flag");
   expect(output.config_path == input.config_path, "control plane config path");
 
+  const auto stamp = stat_shared_control_plane_state(state_path.string());
+  expect(stamp.has_value(), "control plane state stamp");
+  expect(stat_shared_control_plane_state(state_path.string()) == stamp,
+         "control plane stamp stable without writes");
+  input.status_generation = 10;
+  expect(write_shared_control_plane_state(input, state_path.string()),
+         "control plane state rewrite");
+  expect(stat_shared_control_plane_state(state_path.string()) != stamp,
+         "control plane stamp changes on rewrite");
+
   expect(std::filesystem::remove(state_path), "control plane state removed");
   expect(::rmdir(dir) == 0, "control plane dir removed");
 }
@@ -332,6 +542,10 @@ void test_control_plane_state_round_trip() {
 
 int main() {
   test_text_processor();
+  test_key_entry_text();
+  test_modifier_state();
+  test_terminal_detection();
+  test_layout_analyzer();
   test_input_buffer_overflow();
   test_ipc_server();
   test_typo_corrector();
@@ -339,7 +553,10 @@ int main() {
   test_config_logging_level();
   test_external_layout_sound_state();
   test_x11_threading_regression_guards();
+  test_boundary_layout_sync_gate();
   test_runtime_thread_budget();
+  test_concurrent_queue_replace();
+  test_undo_exclusions_case();
   test_control_plane_state_round_trip();
 
   std::cout << "punto-tests: OK\n";